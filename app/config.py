@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     timezone: str = Field(default="America/New_York", alias="TIMEZONE")
     location_city: str = Field(default="Your City", alias="LOCATION_CITY")
     weather_api_key: str | None = Field(default=None, alias="WEATHER_API_KEY")
+    # Override to point at a stand-in server (load tests)
+    weather_api_base_url: str = Field(default="https://api.openweathermap.org", alias="WEATHER_API_BASE_URL")
     # How often (in minutes) weather should be refreshed proactively / TTL for cache
     weather_refresh_minutes: int = Field(default=60, alias="WEATHER_REFRESH_MINUTES")
     calendar_source: str = Field(default="local_json", alias="CALENDAR_SOURCE")
@@ -24,7 +26,53 @@ class Settings(BaseSettings):
     calendar_refresh_minutes: int = Field(default=30, alias="CALENDAR_REFRESH_MINUTES")
     calendar_cache_dir: str = Field(default="./cache", alias="CALENDAR_CACHE_DIR")
     calendar_ical_sources: str | None = Field(default=None, alias="CALENDAR_ICAL_SOURCES")
+    # Comma-separated CALENDAR_ICAL_SOURCES names; the first source carrying a UID wins when feeds overlap
+    calendar_source_precedence: str | None = Field(default=None, alias="CALENDAR_SOURCE_PRECEDENCE")
+    # Events outside [today - past, now + future] are dropped at ingest; other ranges are fetched on demand
+    # (at most once per CALENDAR_REFRESH_MINUTES)
+    calendar_retention_past_days: int = Field(default=7, alias="CALENDAR_RETENTION_PAST_DAYS")
+    calendar_retention_future_days: int = Field(default=120, alias="CALENDAR_RETENTION_FUTURE_DAYS")
+    # Upper bound on token postings held by the event search index (oldest events dropped first)
+    calendar_search_max_postings: int = Field(default=250_000, alias="CALENDAR_SEARCH_MAX_POSTINGS")
     weather_refresh_minutes: int = Field(default=60, alias="WEATHER_REFRESH_MINUTES")
+    # Optional shared secret for sensitive admin endpoints (profiler); unset = open like /admin
+    admin_token: str | None = Field(default=None, alias="ADMIN_TOKEN")
+    log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    # "text" (key=value) or "json" (one object per line)
+    log_format: str = Field(default="text", alias="LOG_FORMAT")
+    # Attach a Server-Timing header with per-stage durations to / and /api/* responses
+    server_timing_enabled: bool = Field(default=True, alias="SERVER_TIMING_ENABLED")
+    # Per-source budget for the dashboard page; slower sources are served from cache
+    dashboard_source_deadline_ms: int = Field(default=1500, alias="DASHBOARD_SOURCE_DEADLINE_MS")
+    # SQLite file shared by uvicorn workers (WAL); one worker refreshes under a lease, the rest read
+    shared_cache_path: str | None = Field(default=None, alias="SHARED_CACHE_PATH")
+    shared_cache_poll_seconds: float = Field(default=5.0, alias="SHARED_CACHE_POLL_SECONDS")
+    # Worker pools used by the refresh scheduler (calendar/weather/menu jobs)
+    scheduler_thread_workers: int = Field(default=4, alias="SCHEDULER_THREAD_WORKERS")
+    scheduler_process_workers: int = Field(default=1, alias="SCHEDULER_PROCESS_WORKERS")
+    # Household allergen profiles for menu flags / filtering, e.g. "Emma:Milk,Peanuts;Noah:Wheat,Gluten"
+    allergen_profiles: str | None = Field(default=None, alias="ALLERGEN_PROFILES")
+    # In-app menu scraping: scripts/scrape_weekly_menu.py in a subprocess (replaces the cron container)
+    menu_scrape_enabled: bool = Field(default=False, alias="MENU_SCRAPE_ENABLED")
+    menu_scrape_interval_minutes: int = Field(default=1440, alias="MENU_SCRAPE_INTERVAL_MINUTES")
+    menu_scrape_timeout_seconds: int = Field(default=600, alias="MENU_SCRAPE_TIMEOUT_SECONDS")
+    menu_scrape_memory_mb: int = Field(default=1024, alias="MENU_SCRAPE_MEMORY_MB")
+    menu_scrape_args: str = Field(default="", alias="MENU_SCRAPE_ARGS")
+    # Radar proxy (/radar/maps.json, /radar/tiles/...): upstreams and the memory + disk tile cache
+    radar_api_base_url: str = Field(default="https://api.rainviewer.com", alias="RADAR_API_BASE_URL")
+    radar_tile_base_url: str = Field(default="https://tilecache.rainviewer.com", alias="RADAR_TILE_BASE_URL")
+    radar_basemap_url: str = Field(default="https://tile.openstreetmap.org", alias="RADAR_BASEMAP_URL")
+    radar_cache_dir: str = Field(default="./cache/radar", alias="RADAR_CACHE_DIR")
+    radar_cache_memory_mb: int = Field(default=32, alias="RADAR_CACHE_MEMORY_MB")
+    radar_cache_disk_mb: int = Field(default=256, alias="RADAR_CACHE_DISK_MB")
+    radar_maps_ttl_seconds: int = Field(default=120, alias="RADAR_MAPS_TTL_SECONDS")
+    # Radar tiles are kept until this long after their frame timestamp (RainViewer serves ~2h of frames)
+    radar_frame_ttl_seconds: int = Field(default=3 * 3600, alias="RADAR_FRAME_TTL_SECONDS")
+    radar_basemap_ttl_seconds: int = Field(default=7 * 86400, alias="RADAR_BASEMAP_TTL_SECONDS")
+    # Event-loop lag monitor: logs the loop thread's stack when a callback blocks past the threshold
+    loop_monitor_enabled: bool = Field(default=False, alias="LOOP_MONITOR_ENABLED")
+    loop_monitor_interval_ms: int = Field(default=100, alias="LOOP_MONITOR_INTERVAL_MS")
+    loop_block_threshold_ms: int = Field(default=250, alias="LOOP_BLOCK_THRESHOLD_MS")
 
 
 @lru_cache
@@ -0,0 +1,110 @@
+"""Structured logging helpers shared by the app and the scraper scripts.
+
+``configure_logging`` installs a single stdout handler that writes either
+``key=value`` text or one JSON object per line. Fields passed with
+``extra={...}`` become structured fields. ``log_sampled`` rate-limits
+per-request messages, and ``redact_url`` strips paths and query strings that
+carry private calendar tokens. This module only depends on the standard
+library so the scraper can import it outside the app container.
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Attributes present on every LogRecord; anything else came from ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _fields(record: logging.LogRecord) -> Dict[str, object]:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED and not k.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload.update(_fields(record))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s", "%Y-%m-%dT%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text") -> None:
+    """Install the stdout handler on the ``app`` and ``scraper`` logger trees (idempotent)."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else KeyValueFormatter())
+    handler.set_name("homebrain")
+    for name in ("app", "scraper"):
+        logger = logging.getLogger(name)
+        logger.handlers = [h for h in logger.handlers if h.get_name() != "homebrain"]
+        logger.addHandler(handler)
+        logger.setLevel(level.upper())
+        logger.propagate = False
+
+
+def redact_url(url: Optional[str]) -> str:
+    """Reduce a URL to scheme and host; ICS paths embed private access tokens."""
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return "<redacted>"
+    if not parts.netloc:
+        return "<redacted>"
+    return f"{parts.scheme}://{parts.netloc}/<redacted>"
+
+
+_SAMPLE_LOCK = threading.Lock()
+_SAMPLE_STATE: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+
+def log_sampled(
+    logger: logging.Logger,
+    level: int,
+    key: str,
+    msg: str,
+    *args,
+    interval: float = 60.0,
+    extra: Optional[dict] = None,
+) -> None:
+    """Emit at most one message per ``key`` every ``interval`` seconds.
+
+    The level check comes first, so a disabled level costs one comparison.
+    Emitted records carry a ``suppressed`` count of messages dropped since the
+    previous one.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    now = time.monotonic()
+    state_key = (logger.name, key)
+    with _SAMPLE_LOCK:
+        last, suppressed = _SAMPLE_STATE.get(state_key, (0.0, 0))
+        if last and now - last < interval:
+            _SAMPLE_STATE[state_key] = (last, suppressed + 1)
+            return
+        _SAMPLE_STATE[state_key] = (now, 0)
+    fields = dict(extra or {})
+    if suppressed:
+        fields["suppressed"] = suppressed
+    logger.log(level, msg, *args, extra=fields)
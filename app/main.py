@@ -1,17 +1,26 @@
+import logging
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 
 from app.config import get_settings
+from app.log import configure_logging
 from app.routers.dashboard import router as dashboard_router
 from app.routers.api import router as api_router
 from app.routers.admin import router as admin_router
-from app.services import calendar_service, weather_service
+from app.routers.metrics import router as metrics_router
+from app.routers.radar import router as radar_router
+from app.services import (
+    calendar_service, loop_monitor, menu_refresh, menu_service, profiler, scheduler, timing, weather_service,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
+    configure_logging(settings.log_level, settings.log_format)
     app = FastAPI(title="HomeBrain Dashboard", version="0.1.0")
 
     static_dir = Path(__file__).parent / "static"
@@ -20,19 +29,41 @@ def create_app() -> FastAPI:
     app.include_router(dashboard_router)
     app.include_router(api_router, prefix="/api", tags=["api"])
     app.include_router(admin_router, tags=["admin"])
+    app.include_router(metrics_router, tags=["metrics"])
+    app.include_router(radar_router, prefix="/radar", tags=["radar"])
+    app.add_middleware(profiler.RequestCounterMiddleware)
+
+    if settings.server_timing_enabled:
+
+        @app.middleware("http")
+        async def _server_timing(request: Request, call_next):
+            path = request.url.path
+            if path != "/" and not path.startswith("/api/"):
+                return await call_next(request)
+            token = timing.begin()
+            try:
+                response = await call_next(request)
+            finally:
+                rec = timing.end(token)
+            response.headers["Server-Timing"] = rec.header_value()
+            return response
 
     @app.on_event("startup")
     async def _startup_refresh():
-        # Kick off background refresh of calendar events (Google ICS if configured)
-        try:
-            calendar_service.start_background_refresh()
-        except Exception:
-            pass
-        # Kick off background refresh of weather data
-        try:
-            weather_service.start_background_refresh()
-        except Exception:
-            pass
+        loop_monitor.start()
+        # Periodic calendar (Google ICS if configured), weather and menu refreshes, plus the
+        # menu scraper when MENU_SCRAPE_ENABLED is set
+        for service in (calendar_service, weather_service, menu_service, menu_refresh):
+            try:
+                service.start_background_refresh()
+            except Exception:
+                logger.exception("Unable to register refresh job", extra={"service": service.__name__})
+        scheduler.start()
+
+    @app.on_event("shutdown")
+    async def _shutdown():
+        await scheduler.stop()
+        await loop_monitor.stop()
 
     return app
 
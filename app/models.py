@@ -1,7 +1,7 @@
 from datetime import datetime, date, time
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Event(BaseModel):
@@ -11,6 +11,8 @@ class Event(BaseModel):
     location: Optional[str] = None
     category: Optional[str] = None
     is_all_day: bool = False
+    uid: Optional[str] = None
+    recurrence_id: Optional[str] = None
 
 
 class RecurringEvent(BaseModel):
@@ -47,3 +49,7 @@ class LunchMenuItem(BaseModel):
     name: str
     calories: str
     allergens: list[str] = []
+    # Bitmask of ``allergens`` (app/services/allergens.py), computed when the menu is loaded
+    allergen_mask: int = Field(default=0, exclude=True)
+    # Household members (ALLERGEN_PROFILES) who should avoid this item
+    unsafe_for: list[str] = []
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Depends, Request, Form, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from datetime import time as dt_time, date as dt_date
 from typing import Optional
 
-from app.services import recurring_events_service
+from app.config import get_settings
+from app.services import menu_refresh, profiler, recurring_events_service, scheduler
 from app.models import RecurringEvent
 
 router = APIRouter()
@@ -35,7 +39,14 @@ async def admin_panel(request: Request):
     
     return templates.TemplateResponse(
         "admin.html",
-        {"request": request, "recurring_events": events_with_day_names}
+        {
+            "request": request,
+            "recurring_events": events_with_day_names,
+            "jobs": [job.status() for job in scheduler.jobs()],
+            "menu_scrape": menu_refresh.status() if get_settings().menu_scrape_enabled else None,
+            # Carried into the job/profile links so they work after opening /admin?token=...
+            "admin_token": request.query_params.get("token"),
+        }
     )
 
 
@@ -156,3 +167,60 @@ async def delete_recurring_event(event_id: int):
     """Delete a recurring event"""
     recurring_events_service.delete_recurring_event(event_id)
     return RedirectResponse(url="/admin", status_code=303)
+
+
+def _require_admin(request: Request) -> None:
+    """Require ADMIN_TOKEN (header X-Admin-Token or ?token=); denied outright when none is configured"""
+    expected = get_settings().admin_token
+    if not expected:
+        raise HTTPException(status_code=403, detail="set ADMIN_TOKEN to enable admin actions")
+    supplied = request.headers.get("x-admin-token") or request.query_params.get("token") or ""
+    if not hmac.compare_digest(supplied, expected):
+        raise HTTPException(status_code=403, detail="admin token required")
+
+
+@router.get("/admin/profile", dependencies=[Depends(_require_admin)])
+async def profile_app(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=300),
+    requests: Optional[int] = Query(None, ge=1, le=10000),
+    timeout: float = Query(120.0, gt=0, le=600),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+):
+    """Sample all threads for N seconds (or the next N requests) and return the profile"""
+    interval = interval_ms / 1000.0
+    try:
+        if requests:
+            prof = await asyncio.to_thread(profiler.profile_requests, requests, timeout, interval)
+        else:
+            prof = await asyncio.to_thread(profiler.profile_for, seconds, interval)
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="a profile is already running")
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            prof.collapsed_text(),
+            headers={"Content-Disposition": 'attachment; filename="homebrain-profile.folded"'},
+        )
+    return JSONResponse(prof.report())
+
+
+@router.get("/admin/jobs")
+async def list_jobs():
+    """Status of the scheduled refresh jobs"""
+    return [job.status() for job in scheduler.jobs()]
+
+
+@router.post("/admin/jobs/{name}/run", dependencies=[Depends(_require_admin)])
+async def run_job(request: Request, name: str):
+    """Run a refresh job now (skipped if it is already running)"""
+    try:
+        started = scheduler.run_now(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Scheduler is not running")
+    if "application/json" in request.headers.get("accept", ""):
+        return JSONResponse({"job": name, "started": started}, status_code=202 if started else 409)
+    return RedirectResponse(url="/admin", status_code=303)
@@ -1,11 +1,22 @@
-from fastapi import APIRouter
+from datetime import date, datetime, timedelta
+from typing import Optional
 
-from app.services import calendar_service, tasks_service, weather_service
+from fastapi import APIRouter, Query
+
+from app.services import allergens, availability_service, calendar_service, menu_service, tasks_service, weather_service
 
 
 router = APIRouter()
 
 
+def _localize(value: Optional[datetime], default: datetime) -> datetime:
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        return value.replace(tzinfo=calendar_service.get_tzinfo())
+    return value
+
+
 @router.get("/health")
 def health():
     return {"status": "ok"}
@@ -16,11 +27,75 @@ def api_events_today():
     return [e.model_dump() for e in calendar_service.events_today()]
 
 
+@router.get("/events")
+def api_events(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    now = datetime.now(calendar_service.get_tzinfo())
+    range_start = _localize(start, now)
+    range_end = _localize(end, range_start + timedelta(days=7))
+    return [e.model_dump() for e in calendar_service.events_in_range(range_start, range_end)]
+
+
+@router.get("/events/search")
+def api_events_search(q: str = Query(..., min_length=1), limit: int = Query(50, ge=1, le=500)):
+    return [e.model_dump() for e in calendar_service.search_events(q, limit=limit)]
+
+
+@router.get("/freebusy")
+def api_freebusy(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category: Optional[str] = None,
+    include_all_day: bool = False,
+):
+    now = datetime.now(calendar_service.get_tzinfo())
+    range_start = _localize(start, now)
+    range_end = _localize(end, range_start + timedelta(days=1))
+    return availability_service.free_busy(range_start, range_end, category, include_all_day)
+
+
+@router.get("/conflicts")
+def api_conflicts(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category: Optional[str] = None,
+):
+    now = datetime.now(calendar_service.get_tzinfo())
+    range_start = _localize(start, now)
+    range_end = _localize(end, range_start + timedelta(days=7))
+    return availability_service.conflicts(range_start, range_end, category)
+
+
 @router.get("/tasks/today")
 def api_tasks_today():
     return [t.model_dump() for t in tasks_service.tasks_due_today()]
 
 
+@router.get("/tasks")
+def api_tasks(start: Optional[date] = None, end: Optional[date] = None, importance: Optional[str] = None):
+    """Tasks due between ``start`` (default today) and ``end`` (default a week later), inclusive.
+    ``importance`` is a comma-separated list, e.g. ``high,med``."""
+    range_start = start or datetime.now(calendar_service.get_tzinfo()).date()
+    range_end = end or range_start + timedelta(days=7)
+    levels = [level.strip() for level in importance.split(",") if level.strip()] if importance else None
+    return [t.model_dump() for t in tasks_service.tasks_between(range_start, range_end, levels)]
+
+
+@router.get("/menu")
+def api_menu(day: Optional[date] = Query(None, alias="date"), safe_for: Optional[str] = None):
+    """Menu for ``date`` (default today). ``safe_for`` (household members or allergen names,
+    comma-separated) drops items containing any of their allergens."""
+    target = day or datetime.now(calendar_service.get_tzinfo()).date()
+    menu = menu_service.get_menu_for_date(target)
+    if menu is not None and safe_for:
+        avoid = allergens.profile_mask(safe_for)
+        menu = {category: [item for item in items if not item.allergen_mask & avoid] for category, items in menu.items()}
+    return {
+        "date": target.isoformat(),
+        "safe_for": [name.strip() for name in safe_for.split(",") if name.strip()] if safe_for else [],
+        "menu": {category: [item.model_dump() for item in items] for category, items in menu.items()} if menu else None,
+    }
+
+
 @router.get("/weather")
 def api_weather():
     info = weather_service.get_weather()
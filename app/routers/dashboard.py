@@ -1,50 +1,98 @@
+import asyncio
+import logging
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, TypeVar
 
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 
 from app.config import get_settings
-from app.services import calendar_service, weather_service, menu_service
+from app.log import log_sampled
+from app.services import calendar_service, metrics, timing, weather_service, menu_service, tasks_service
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent.parent / "templates"))
 
+DASHBOARD_RENDER_SECONDS = metrics.histogram(
+    "homebrain_dashboard_render_seconds", "Time to gather data for and render the dashboard page"
+)
+DASHBOARD_DEGRADED = metrics.counter(
+    "homebrain_dashboard_degraded_total",
+    "Dashboard sources served from cache after missing their deadline or failing",
+    ("source", "reason"),
+)
+
+T = TypeVar("T")
+
 
 @router.get("/")
-def home(request: Request):
+async def home(request: Request):
+    with DASHBOARD_RENDER_SECONDS.time():
+        return await _render_home(request)
+
+
+async def _with_deadline(source: str, coro, fallback: Callable[[], T], deadline: float) -> T:
+    """Await ``coro`` for at most ``deadline`` seconds, else serve ``fallback()`` (cached data)"""
+    try:
+        return await asyncio.wait_for(coro, timeout=deadline)
+    except asyncio.TimeoutError:
+        log_sampled(
+            logger,
+            logging.WARNING,
+            f"dashboard_deadline:{source}",
+            "Dashboard source missed its deadline; serving cached data",
+            extra={"source": source, "deadline_ms": round(deadline * 1000)},
+        )
+        DASHBOARD_DEGRADED.inc(source=source, reason="timeout")
+    except Exception:
+        logger.exception("Dashboard source failed; serving cached data", extra={"source": source})
+        DASHBOARD_DEGRADED.inc(source=source, reason="error")
+    return fallback()
+
+
+async def _render_home(request: Request):
     settings = get_settings()
+    deadline = max(0.05, settings.dashboard_source_deadline_ms / 1000.0)
 
     now = datetime.now(calendar_service.get_tzinfo(settings.timezone))
-    today_events = calendar_service.events_today(now)
-    tomorrow_events = calendar_service.events_tomorrow(now)
-    week_events = calendar_service.events_this_week(now)
-
-    weather = weather_service.get_weather(settings.location_city)
-    weekly_menu = menu_service.get_weekly_menu()
-    today_menu = menu_service.get_today_menu(now)
-    tomorrow_menu = menu_service.get_tomorrow_menu(now)
-    today_menu_full = menu_service.get_today_menu_full()
-    tomorrow_menu_full = menu_service.get_tomorrow_menu_full()
-
-    return templates.TemplateResponse(
-        request,
-        "dashboard.html",
-        {
-            "city": settings.location_city,
-            "now": now,
-            "today_events": today_events,
-            "tomorrow_events": tomorrow_events,
-            "week_events": week_events,
-            "weather": weather,
-            "weather_lat": settings.weather_lat or 29.8,
-            "weather_lon": settings.weather_lon or -95.6,
-            "weekly_menu": weekly_menu,
-            "today_menu": today_menu,
-            "tomorrow_menu": tomorrow_menu,
-            "today_menu_full": today_menu_full,
-            "tomorrow_menu_full": tomorrow_menu_full,
-        },
+    city = settings.location_city
+    # Sources are gathered concurrently in worker threads; a slow one degrades
+    # to its cached value instead of holding up the whole page.
+    events, weather, menu = await asyncio.gather(
+        _with_deadline(
+            "calendar", calendar_service.day_views_async(now),
+            lambda: calendar_service.cached_day_views(now), deadline,
+        ),
+        _with_deadline(
+            "weather", weather_service.get_weather_async(city),
+            lambda: weather_service.cached_weather(city), deadline,
+        ),
+        _with_deadline(
+            "menu", menu_service.dashboard_menu_async(now),
+            lambda: menu_service.cached_dashboard_menu(now), deadline,
+        ),
     )
+    # Tasks come from an in-memory snapshot (re-read only when the file changes), so no deadline
+    tasks = tasks_service.dashboard_tasks(now.date())
+
+    with timing.stage("render"):
+        return templates.TemplateResponse(
+            request,
+            "dashboard.html",
+            {
+                "city": city,
+                "now": now,
+                "today_events": events["today"],
+                "tomorrow_events": events["tomorrow"],
+                "week_events": events["week"],
+                "weather": weather,
+                "weather_lat": settings.weather_lat or 29.8,
+                "weather_lon": settings.weather_lon or -95.6,
+                **menu,
+                **tasks,
+            },
+        )
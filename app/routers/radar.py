@@ -0,0 +1,32 @@
+import time
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, Response
+
+from app.services import radar_service
+
+
+router = APIRouter()
+
+
+@router.get("/maps.json")
+async def radar_maps():
+    """RainViewer frame list; ``host`` points at ``/radar/tiles``"""
+    try:
+        data = await radar_service.get_maps()
+    except radar_service.RadarUpstreamError as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+    return JSONResponse(data, headers={"Cache-Control": "public, max-age=60"})
+
+
+@router.get("/tiles/{path:path}")
+async def radar_tile(path: str):
+    """Radar (``v2/radar/...``) or base-map (``osm/{z}/{x}/{y}.png``) tile"""
+    if radar_service.tile_url(path) is None:
+        raise HTTPException(status_code=404, detail="Unknown tile")
+    try:
+        entry = await radar_service.get_tile(path)
+    except radar_service.RadarUpstreamError as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+    max_age = max(0, int(entry.expires - time.time()))
+    return Response(entry.body, media_type=entry.content_type, headers={"Cache-Control": f"public, max-age={max_age}"})
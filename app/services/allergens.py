@@ -0,0 +1,69 @@
+"""Household allergen profiles and per-item allergen bitmasks.
+
+Every allergen name gets a bit the first time it is seen. A menu item's mask
+is computed once, when the menu is loaded, and each household member's
+profile (ALLERGEN_PROFILES, e.g. ``Emma:Milk,Peanuts;Noah:Wheat``) is a mask
+too. "Is this safe for Emma" is then ``item_mask & profile_mask == 0``.
+"""
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from app.config import get_settings
+
+_BITS: Dict[str, int] = {}
+_LOCK = threading.Lock()
+
+
+def _key(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def bit_for(name: str) -> int:
+    key = _key(name)
+    bit = _BITS.get(key)
+    if bit is None:
+        with _LOCK:
+            bit = _BITS.setdefault(key, 1 << len(_BITS))
+    return bit
+
+
+def mask_of(names: Iterable[str]) -> int:
+    mask = 0
+    for name in names:
+        if name and name.strip():
+            mask |= bit_for(name)
+    return mask
+
+
+@lru_cache(maxsize=4)
+def _parse_profiles(raw: str) -> Dict[str, int]:
+    profiles: Dict[str, int] = {}
+    for part in raw.split(";"):
+        member, _, allergens = part.partition(":")
+        if member.strip():
+            profiles[member.strip()] = mask_of(allergens.split(","))
+    return profiles
+
+
+def profiles() -> Dict[str, int]:
+    """``{member: mask}`` from ALLERGEN_PROFILES"""
+    return _parse_profiles(get_settings().allergen_profiles or "")
+
+
+def profile_mask(safe_for: str) -> int:
+    """Mask for a comma-separated ``safe_for`` list of members; other tokens count as allergen names"""
+    known = {name.lower(): mask for name, mask in profiles().items()}
+    mask = 0
+    for token in safe_for.split(","):
+        token = token.strip()
+        if token:
+            mask |= known.get(token.lower(), 0) or bit_for(token)
+    return mask
+
+
+def unsafe_members(mask: int) -> List[str]:
+    """Members with an allergen in ``mask``"""
+    if not mask:
+        return []
+    return [name for name, profile in profiles().items() if profile & mask]
@@ -0,0 +1,102 @@
+"""Free/busy and double-booking detection over calendar + recurring events.
+
+Both computations run a single sweep over events already ordered by start
+(as returned by the calendar interval index), so cost is O(n log n + k)
+rather than comparing every pair of events.
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from app.models import Event
+from app.services import calendar_service
+from app.services.event_index import event_bounds
+
+
+def _candidates(
+    start: datetime, end: datetime, category: Optional[str], include_all_day: bool
+) -> List[Event]:
+    events = calendar_service.events_in_range(start, end)
+    return [
+        e
+        for e in events
+        if (include_all_day or not e.is_all_day) and (category is None or e.category == category)
+    ]
+
+
+def merge_busy(
+    events: List[Event], start: datetime, end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """Merge start-ordered events into disjoint busy intervals clipped to ``[start, end)``."""
+    tz = start.tzinfo
+    lo, hi = start.timestamp(), end.timestamp()
+    merged: List[List[float]] = []
+    for e in events:
+        s, f = event_bounds(e)
+        s, f = max(s, lo), min(f, hi)
+        if s >= f:
+            continue
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], f)
+        else:
+            merged.append([s, f])
+    return [(datetime.fromtimestamp(s, tz), datetime.fromtimestamp(f, tz)) for s, f in merged]
+
+
+def find_conflicts(events: List[Event]) -> List[Tuple[Event, Event]]:
+    """Return every pair of overlapping events from a start-ordered list."""
+    active: List[Tuple[float, int, Event]] = []
+    pairs: List[Tuple[Event, Event]] = []
+    for seq, e in enumerate(events):
+        s, f = event_bounds(e)
+        while active and active[0][0] <= s:
+            heapq.heappop(active)
+        for _, _, other in active:
+            pairs.append((other, e))
+        heapq.heappush(active, (f, seq, e))
+    return pairs
+
+
+def free_busy(
+    start: datetime,
+    end: datetime,
+    category: Optional[str] = None,
+    include_all_day: bool = False,
+) -> dict:
+    busy = merge_busy(_candidates(start, end, category, include_all_day), start, end)
+    free: List[Tuple[datetime, datetime]] = []
+    cursor = start
+    for s, f in busy:
+        if s > cursor:
+            free.append((cursor, s))
+        cursor = max(cursor, f)
+    if cursor < end:
+        free.append((cursor, end))
+    return {
+        "start": start,
+        "end": end,
+        "busy": [{"start": s, "end": f} for s, f in busy],
+        "free": [{"start": s, "end": f} for s, f in free],
+    }
+
+
+def conflicts(
+    start: datetime,
+    end: Optional[datetime] = None,
+    category: Optional[str] = None,
+) -> List[dict]:
+    """Overlapping timed events in ``[start, end)`` (defaults to the next 7 days)."""
+    end = end or start + timedelta(days=7)
+    tz = start.tzinfo
+    out: List[dict] = []
+    for a, b in find_conflicts(_candidates(start, end, category, include_all_day=False)):
+        a_start, a_end = event_bounds(a)
+        b_start, b_end = event_bounds(b)
+        out.append(
+            {
+                "start": datetime.fromtimestamp(max(a_start, b_start), tz),
+                "end": datetime.fromtimestamp(min(a_end, b_end), tz),
+                "events": [a.model_dump(), b.model_dump()],
+            }
+        )
+    return out
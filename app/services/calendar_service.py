@@ -1,23 +1,55 @@
-import json
 import asyncio
+import json
+import heapq
+import logging
+import sqlite3
+import threading
+import time as _time
 from datetime import datetime, timedelta, time
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import httpx
 from zoneinfo import ZoneInfo
 from ics import Calendar
 
 from app.config import get_settings
+from app.log import log_sampled, redact_url
 from app.models import Event
-from app.services import recurring_events_service
+from app.services import metrics, recurring_events_service, scheduler, shared_cache, timing
+from app.services.event_index import IntervalIndex, event_bounds, overlaps
+from app.services.event_merge import EventMerger, event_key
+from app.services.event_search import SearchIndex
+
+logger = logging.getLogger(__name__)
 
 DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "sample_events.json"
 
 _CACHE: List[Event] = []
+_INDEX: IntervalIndex = IntervalIndex([])
+_SEARCH: SearchIndex = SearchIndex(get_settings().calendar_search_max_postings)
+_MERGER: EventMerger = EventMerger()
+# Per-source fetch bookkeeping for metrics: label -> {"fetched_at", "events", "ok"}
+_SOURCE_STATS: dict[str, dict] = {}
+
+ICS_FETCH_SECONDS = metrics.histogram(
+    "homebrain_calendar_ics_fetch_seconds", "Time spent downloading an ICS feed", ("source",)
+)
+ICS_PARSE_SECONDS = metrics.histogram(
+    "homebrain_calendar_ics_parse_seconds", "Time spent parsing an ICS feed into events", ("source",)
+)
+ICS_FETCH_ERRORS = metrics.counter(
+    "homebrain_calendar_ics_fetch_errors_total", "Failed ICS downloads", ("source",)
+)
 _LAST_REFRESH: datetime | None = None
-_REFRESH_TASK: asyncio.Task | None = None
 _CACHE_LOADED_FROM_DISK: bool = False
+_REFRESH_LOCK = threading.Lock()
+# Shared cache (multi-worker): version of the published calendar held in memory, last poll
+_SHARED_VERSION: int | None = None
+_SHARED_SYNCED_AT: float = 0.0
+# Events outside the retention horizon, fetched on demand at most once per refresh interval
+_HISTORY: tuple[datetime, IntervalIndex] | None = None
+_HISTORY_LOCK = threading.Lock()
 
 
 def get_tzinfo(tz_name: Optional[str] = None) -> ZoneInfo:
@@ -48,15 +80,28 @@ def _load_local_events() -> List[Event]:
     return [_parse_local_event(item) for item in data]
 
 
-def _fetch_google_ics(url: str) -> List[Event]:
+def _fetch_google_ics(url: str, source: str = "default") -> List[Event]:
     try:
-        with httpx.Client(timeout=10) as client:
-            resp = client.get(url)
-            if resp.status_code != 200:
-                return []
-            cal = Calendar(resp.text)
-    except Exception:
+        with ICS_FETCH_SECONDS.time(source=source):
+            with httpx.Client(timeout=10) as client:
+                resp = client.get(url)
+        if resp.status_code != 200:
+            ICS_FETCH_ERRORS.inc(source=source)
+            logger.warning("ICS fetch failed", extra={"feed": source, "status": resp.status_code})
+            return []
+    except Exception as exc:
+        ICS_FETCH_ERRORS.inc(source=source)
+        logger.warning("ICS fetch failed", extra={"feed": source, "error": type(exc).__name__})
         return []
+    with ICS_PARSE_SECONDS.time(source=source):
+        try:
+            cal = Calendar(resp.text)
+        except Exception:
+            return []
+        return _convert_ics_events(cal)
+
+
+def _convert_ics_events(cal: Calendar) -> List[Event]:
     tz = get_tzinfo()
     events: List[Event] = []
     for e in cal.events:
@@ -85,6 +130,9 @@ def _fetch_google_ics(url: str) -> List[Event]:
                         end_dt = end_dt.replace(tzinfo=tz)
                     else:
                         end_dt = end_dt.astimezone(tz)
+            recurrence_id = next(
+                (line.value for line in e.extra if line.name == "RECURRENCE-ID"), None
+            )
             events.append(
                 Event(
                     title=e.name or "Untitled",
@@ -93,6 +141,8 @@ def _fetch_google_ics(url: str) -> List[Event]:
                     location=e.location,
                     category="google",
                     is_all_day=is_all_day,
+                    uid=e.uid,
+                    recurrence_id=recurrence_id,
                 )
             )
         except Exception:
@@ -112,15 +162,29 @@ def _parse_sources_json(raw: str) -> list[tuple[str | None, str]]:
     return []
 
 
-def _fetch_multi_ics(urls: list[tuple[str | None, str]]) -> List[Event]:
-    all_events: List[Event] = []
-    for name, url in urls:
-        evts = _fetch_google_ics(url)
+def _fetch_sources(urls: list[tuple[str | None, str]], record: bool = True) -> dict[str, List[Event]]:
+    """Fetch each ICS source, keyed by its configured name (or URL when unnamed).
+
+    ``record=False`` (on-demand history fetches) leaves the per-source refresh stats alone.
+    """
+    sources: dict[str, List[Event]] = {}
+    for idx, (name, url) in enumerate(urls):
+        # URLs embed private tokens, so metrics only ever see the name or position
+        label = name or f"source{idx}"
+        evts = _fetch_google_ics(url, source=label)
         if name:
             for e in evts:
                 e.category = name
-        all_events.extend(evts)
-    return all_events
+        sources.setdefault(name or url, []).extend(evts)
+        if not record:
+            continue
+        stats = _SOURCE_STATS.setdefault(label, {"fetched_at": None, "events": 0, "ok": False})
+        stats["ok"] = bool(evts)
+        # A failing feed reports no events; fetched_at keeps the last success so its age keeps growing
+        stats["events"] = len(evts)
+        if evts:
+            stats["fetched_at"] = _time.time()
+    return sources
 
 
 def _cache_file() -> Path:
@@ -145,6 +209,9 @@ def _serialize_events(events: List[Event]) -> list[dict]:
                 "end": e.end.isoformat() if e.end else None,
                 "location": e.location,
                 "category": e.category,
+                "is_all_day": e.is_all_day,
+                "uid": e.uid,
+                "recurrence_id": e.recurrence_id,
             }
         )
     return out
@@ -164,6 +231,9 @@ def _deserialize_events(items: list[dict]) -> List[Event]:
                     end=end,
                     location=raw.get("location"),
                     category=raw.get("category"),
+                    is_all_day=bool(raw.get("is_all_day", False)),
+                    uid=raw.get("uid"),
+                    recurrence_id=raw.get("recurrence_id"),
                 )
             )
         except Exception:
@@ -171,72 +241,207 @@ def _deserialize_events(items: list[dict]) -> List[Event]:
     return evts
 
 
+def _set_cache(events: List[Event], presorted: bool = False) -> None:
+    """Replace the cached events and rebuild the interval index over them."""
+    global _CACHE, _INDEX
+    _CACHE = events if presorted else sorted(events, key=lambda e: e.start)
+    _INDEX = IntervalIndex(_CACHE, presorted=True)
+
+
+def _source_precedence() -> list[str]:
+    raw = get_settings().calendar_source_precedence or ""
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+def _merge_sources(sources: dict[str, List[Event]]) -> bool:
+    """Apply per-source diffs to the merger; returns True if the merged view changed."""
+    _MERGER.set_precedence(_source_precedence())
+    changed = False
+    for key in _MERGER.sources:
+        if key not in sources:
+            changed |= bool(_MERGER.remove_source(key))
+    for key, evts in sources.items():
+        changed |= bool(_MERGER.apply_source(key, evts))
+    return changed
+
+
 def _should_refresh(now: datetime, interval_minutes: int) -> bool:
     if _LAST_REFRESH is None:
         return True
     return (now - _LAST_REFRESH) >= timedelta(minutes=interval_minutes)
 
 
-def refresh_events(force: bool = False) -> None:
+def _collect_sources(record: bool = True) -> dict[str, List[Event]]:
+    """Load events from the configured calendar source, grouped by feed.
+
+    ``record=False`` is for history fetches: no refresh logs or per-source stats.
+    """
     settings = get_settings()
-    now = datetime.now(get_tzinfo())
-    if not force and not _should_refresh(now, settings.calendar_refresh_minutes):
-        return
     source = settings.calendar_source
-    print(f"[Calendar] Refreshing from source: {source}")
-    events: List[Event]
+    level = logging.INFO if record else logging.DEBUG
+    logger.log(level, "Refreshing calendar", extra={"calendar_source": source})
     if source == "google_ics":
         urls: list[tuple[str | None, str]] = []
         if settings.calendar_ical_sources:
-            print(f"[Calendar] Parsing CALENDAR_ICAL_SOURCES: {settings.calendar_ical_sources[:100]}...")
             urls.extend(_parse_sources_json(settings.calendar_ical_sources))
         if settings.google_calendar_ical_url:
-            print(f"[Calendar] Adding GOOGLE_CALENDAR_ICAL_URL")
             urls.append((None, settings.google_calendar_ical_url))
-        print(f"[Calendar] Fetching from {len(urls)} ICS source(s)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Configured ICS sources",
+                extra={"feeds": [f"{name or 'default'}={redact_url(url)}" for name, url in urls]},
+            )
         if urls:
-            events = _fetch_multi_ics(urls)
-            print(f"[Calendar] Fetched {len(events)} events from ICS")
-            
-            # Debug: Check for dance/hip hop events
-            dance_events = [e for e in events if 'dance' in e.title.lower() or 'hip hop' in e.title.lower()]
-            if dance_events:
-                print(f"[Calendar] Found {len(dance_events)} dance/hip-hop events:")
-                for de in dance_events[:10]:  # Show first 10
-                    print(f"[Calendar]   - {de.start.strftime('%Y-%m-%d %H:%M')} {de.title}")
-        else:
-            events = []
-        if not events:
-            # fallback to local if google empty
-            print(f"[Calendar] No ICS events, falling back to local JSON")
-            events = _load_local_events()
-    else:
-        events = _load_local_events()
-    global _CACHE, _LAST_REFRESH
-    _CACHE = sorted(events, key=lambda e: e.start)
+            sources = _fetch_sources(urls, record=record)
+            total = sum(len(evts) for evts in sources.values())
+            logger.log(
+                level,
+                "Fetched ICS events",
+                extra={"feeds": len(urls), "events": total},
+            )
+            if total:
+                return sources
+        logger.warning("No ICS events, falling back to local JSON")
+    return {"local": _load_local_events()}
+
+
+def _retention_window(now: datetime) -> tuple[datetime, datetime]:
+    settings = get_settings()
+    start = datetime.combine(
+        (now - timedelta(days=settings.calendar_retention_past_days)).date(), time.min, tzinfo=now.tzinfo
+    )
+    return start, now + timedelta(days=settings.calendar_retention_future_days)
+
+
+def _retain(events: List[Event], window: tuple[datetime, datetime]) -> List[Event]:
+    start, end = window
+    return [e for e in events if overlaps(e, start, end)]
+
+
+def refresh_events(force: bool = False) -> None:
+    settings = get_settings()
+    now = datetime.now(get_tzinfo())
+    shared = shared_cache.enabled()
+    if shared:
+        _sync_shared(now)
+    if not force and not _should_refresh(now, settings.calendar_refresh_minutes):
+        metrics.CACHE_REQUESTS.inc(cache="calendar", result="hit")
+        return
+    # With several workers only the lease holder fetches; the rest pick up
+    # what it publishes in _sync_shared().
+    if shared and not shared_cache.acquire_lease("calendar", _lease_ttl()):
+        return
+    # While another thread refreshes, readers keep serving the current cache;
+    # they only wait when there is nothing to serve yet.
+    if not _REFRESH_LOCK.acquire(blocking=force or not _CACHE):
+        return
+    try:
+        if not force and not _should_refresh(now, settings.calendar_refresh_minutes):
+            return
+        if not force:
+            metrics.CACHE_REQUESTS.inc(cache="calendar", result="miss")
+        changed = _refresh(now)
+        if shared:
+            _publish_shared(changed)
+    finally:
+        _REFRESH_LOCK.release()
+
+
+def _refresh(now: datetime) -> bool:
+    """Fetch, retain and merge all sources; returns True if the merged view changed."""
+    # Only events inside the retention horizon are kept in memory and on disk;
+    # older/further ranges are served on demand by events_in_range().
+    window = _retention_window(now)
+    sources = {key: _retain(evts, window) for key, evts in _collect_sources().items()}
+    global _LAST_REFRESH
     _LAST_REFRESH = now
+    # Events shared between feeds (same UID + RECURRENCE-ID) are kept once
+    if not _merge_sources(sources) and _CACHE:
+        return False
+    _set_cache(_MERGER.events(), presorted=True)
+    _SEARCH.sync(sources)
     # persist to disk
     try:
         cache_file = _cache_file()
         cache_file.write_text(json.dumps(_serialize_events(_CACHE)), encoding="utf-8")
     except Exception:
         pass
+    return True
 
 
-def get_events() -> List[Event]:
-    global _CACHE, _CACHE_LOADED_FROM_DISK
+def _lease_ttl() -> float:
+    # Renewed on every refresh; a leader that stops refreshing is replaced after this long
+    return max(60.0, get_settings().calendar_refresh_minutes * 90.0)
+
+
+def _publish_shared(changed: bool) -> None:
+    """Leader: write the merged calendar to the shared cache (or just mark it fresh)."""
+    global _SHARED_VERSION
+    try:
+        if changed or _SHARED_VERSION is None:
+            rows = [
+                (event_key(e), *event_bounds(e), json.dumps(item))
+                for e, item in zip(_CACHE, _serialize_events(_CACHE))
+            ]
+            _SHARED_VERSION = shared_cache.replace_events(rows)
+        else:
+            shared_cache.touch_snapshot("calendar")
+    except sqlite3.Error:
+        logger.exception("Unable to publish calendar to shared cache")
+
+
+def _sync_shared(now: datetime) -> None:
+    """Follower: load the leader's calendar when its version changes (polled every few seconds)."""
+    global _SHARED_VERSION, _SHARED_SYNCED_AT, _LAST_REFRESH
+    settings = get_settings()
+    mono = _time.monotonic()
+    if mono - _SHARED_SYNCED_AT < settings.shared_cache_poll_seconds:
+        return
+    _SHARED_SYNCED_AT = mono
+    try:
+        meta = shared_cache.snapshot_meta("calendar")
+        if meta is None:
+            return
+        version, updated_at = meta
+        if version != _SHARED_VERSION:
+            start, end = _retention_window(now)
+            rows = shared_cache.events_overlapping(start.timestamp(), end.timestamp())
+            published = {"shared": _deserialize_events([json.loads(r) for r in rows])}
+            with _REFRESH_LOCK:
+                _merge_sources(published)
+                _set_cache(_MERGER.events(), presorted=True)
+                _SEARCH.sync(published)
+                _SHARED_VERSION = version
+    except sqlite3.Error:
+        logger.exception("Unable to read calendar from shared cache")
+        return
+    published_at = datetime.fromtimestamp(updated_at, get_tzinfo())
+    if _LAST_REFRESH is None or published_at > _LAST_REFRESH:
+        _LAST_REFRESH = published_at
+
+
+def _ensure_loaded() -> None:
+    global _CACHE_LOADED_FROM_DISK
     if not _CACHE and not _CACHE_LOADED_FROM_DISK:
         # try load from disk cache first
         try:
             cache_file = _cache_file()
             if cache_file.exists():
                 data = json.loads(cache_file.read_text(encoding="utf-8"))
-                _CACHE = sorted(_deserialize_events(data), key=lambda e: e.start)
+                window = _retention_window(datetime.now(get_tzinfo()))
+                disk = {"disk": _retain(_deserialize_events(data), window)}
+                _merge_sources(disk)
+                _set_cache(_MERGER.events(), presorted=True)
+                _SEARCH.sync(disk)
                 _CACHE_LOADED_FROM_DISK = True
         except Exception:
             _CACHE_LOADED_FROM_DISK = True
     refresh_events()
-    
+
+
+def get_events() -> List[Event]:
+    _ensure_loaded()
+
     # Merge with recurring events for the next 90 days
     now = datetime.now(get_tzinfo())
     end_date = (now + timedelta(days=90)).date()
@@ -244,29 +449,113 @@ def get_events() -> List[Event]:
         now.date(), end_date
     )
     
-    # Combine and sort all events
-    all_events = _CACHE + recurring_instances
-    return sorted(all_events, key=lambda e: e.start)
+    # Both inputs are already ordered by start
+    return list(heapq.merge(_CACHE, recurring_instances, key=lambda e: e.start))
 
 
 def _now(now: Optional[datetime] = None) -> datetime:
     return now or datetime.now(get_tzinfo())
 
 
+def _recurring_between(start: datetime, end: datetime) -> List[Event]:
+    return [
+        e
+        for e in recurring_events_service.get_recurring_instances_for_range(
+            (start - timedelta(days=1)).date(), end.date()
+        )
+        if overlaps(e, start, end)
+    ]
+
+
+def events_between(start: datetime, end: datetime, refresh: bool = True) -> List[Event]:
+    """Return cached and recurring events overlapping ``[start, end)``.
+
+    Multi-day events and events that began before ``start`` are included for
+    every range they span. With ``refresh=False`` only what is already in
+    memory is consulted (no disk load or ICS fetch).
+    """
+    with timing.stage("calendar"):
+        if refresh:
+            _ensure_loaded()
+        cached = _INDEX.overlapping(start, end)
+    with timing.stage("recurring"):
+        recurring = _recurring_between(start, end)
+    if not recurring:
+        return cached
+    return sorted(cached + recurring, key=lambda e: e.start)
+
+
+def _history_index(now: datetime) -> IntervalIndex:
+    """Events outside the retention horizon, re-fetched at most once per refresh interval.
+
+    Feeds are merged the same way as the live view, so a UID shared between
+    feeds is kept once. Events near the horizon edges are kept in both places
+    (the horizon moves between fetches); callers dedupe by event key.
+    """
+    global _HISTORY
+    interval = timedelta(minutes=get_settings().calendar_refresh_minutes)
+    hit = _HISTORY
+    if hit is not None and now - hit[0] < interval:
+        metrics.CACHE_REQUESTS.inc(cache="calendar_history", result="hit")
+        return hit[1]
+    with _HISTORY_LOCK:
+        hit = _HISTORY
+        if hit is not None and now - hit[0] < interval:
+            return hit[1]
+        metrics.CACHE_REQUESTS.inc(cache="calendar_history", result="miss")
+        horizon_start, horizon_end = _retention_window(now)
+        margin = interval + timedelta(days=1)
+        inner = (horizon_start + margin, horizon_end - margin)
+        merger = EventMerger(_source_precedence())
+        for source, evts in _collect_sources(record=False).items():
+            merger.apply_source(source, [e for e in evts if not overlaps(e, *inner)])
+        index = IntervalIndex(merger.events(), presorted=True)
+        _HISTORY = (now, index)
+        return index
+
+
+def events_in_range(start: datetime, end: datetime) -> List[Event]:
+    """Like events_between(), but ranges outside the retention horizon are
+    served from the on-demand history instead of returning nothing."""
+    now = datetime.now(get_tzinfo())
+    horizon_start, horizon_end = _retention_window(now)
+    if start >= horizon_start and end <= horizon_end:
+        return events_between(start, end)
+    with timing.stage("calendar"):
+        _ensure_loaded()
+        live = _INDEX.overlapping(start, end)
+        seen = {event_key(e) for e in live}
+        cached = live + [e for e in _history_index(now).overlapping(start, end) if event_key(e) not in seen]
+    with timing.stage("recurring"):
+        recurring = _recurring_between(start, end)
+    return sorted(cached + recurring, key=lambda e: e.start)
+
+
+def search_events(query: str, limit: int = 50) -> List[Event]:
+    """Full-text search over cached event titles and locations (prefix match)."""
+    with timing.stage("calendar"):
+        _ensure_loaded()
+        return _SEARCH.search(query, limit=limit)
+
+
+def _day_bounds(day) -> tuple[datetime, datetime]:
+    tz = get_tzinfo()
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    return start, datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+
+
 def events_today(now: Optional[datetime] = None) -> List[Event]:
     cur = _now(now)
-    start_day = datetime.combine(cur.date(), time.min, tzinfo=cur.tzinfo)
-    end_day = datetime.combine(cur.date(), time.max, tzinfo=cur.tzinfo)
-    all_events = get_events()
-    today_events = [e for e in all_events if start_day <= e.start <= end_day]
+    start_day, end_day = _day_bounds(cur.date())
+    today_events = events_between(start_day, end_day)
     
-    # Debug logging
-    print(f"[Calendar] Filtering for today: {cur.date()}")
-    print(f"[Calendar]   Range: {start_day} to {end_day}")
-    print(f"[Calendar]   Total events in cache: {len(all_events)}")
-    print(f"[Calendar]   Events today: {len(today_events)}")
-    for evt in today_events:
-        print(f"[Calendar]     - {evt.start.strftime('%H:%M')} {evt.title}")
+    log_sampled(
+        logger,
+        logging.DEBUG,
+        "events_today",
+        "Filtered events for today",
+        extra={"day": cur.date().isoformat(), "cached": len(_CACHE), "today": len(today_events)},
+    )
     
     return today_events
 
@@ -277,35 +566,66 @@ def events_tonight(now: Optional[datetime] = None) -> List[Event]:
     This is a simple helper used by tests and the dashboard UI.
     """
     cur = _now(now)
-    end_day = datetime.combine(cur.date(), time.max, tzinfo=cur.tzinfo)
-    return [e for e in get_events() if cur <= e.start <= end_day]
+    _, end_day = _day_bounds(cur.date())
+    return events_between(cur, end_day)
 
 
 def events_tomorrow(now: Optional[datetime] = None) -> List[Event]:
     cur = _now(now)
-    tomorrow = cur.date() + timedelta(days=1)
-    start_tomorrow = datetime.combine(tomorrow, time.min, tzinfo=cur.tzinfo)
-    end_tomorrow = datetime.combine(tomorrow, time.max, tzinfo=cur.tzinfo)
-    return [e for e in get_events() if start_tomorrow <= e.start <= end_tomorrow]
+    start_tomorrow, end_tomorrow = _day_bounds(cur.date() + timedelta(days=1))
+    return events_between(start_tomorrow, end_tomorrow)
 
 
 def events_this_week(now: Optional[datetime] = None) -> List[Event]:
     cur = _now(now)
-    end = cur + timedelta(days=7)
-    return [e for e in get_events() if cur <= e.start <= end]
+    return events_between(cur, cur + timedelta(days=7))
 
 
-async def _background_refresh():
-    while True:
-        try:
-            refresh_events(force=True)
-        except Exception:
-            pass
-        interval = max(5, get_settings().calendar_refresh_minutes)
-        await asyncio.sleep(interval * 60)
+def day_views(now: Optional[datetime] = None, refresh: bool = True) -> Dict[str, List[Event]]:
+    """Today / tomorrow / next-7-days event lists shown on the dashboard."""
+    cur = _now(now)
+    return {
+        "today": events_between(*_day_bounds(cur.date()), refresh=refresh),
+        "tomorrow": events_between(*_day_bounds(cur.date() + timedelta(days=1)), refresh=refresh),
+        "week": events_between(cur, cur + timedelta(days=7), refresh=refresh),
+    }
+
+
+async def day_views_async(now: Optional[datetime] = None) -> Dict[str, List[Event]]:
+    return await asyncio.to_thread(day_views, now)
+
+
+def cached_day_views(now: Optional[datetime] = None) -> Dict[str, List[Event]]:
+    """day_views() from memory only; the fallback when a refresh is too slow."""
+    return day_views(now, refresh=False)
+
+
+def _collect_metrics():
+    now = _time.time()
+    if _LAST_REFRESH is not None:
+        yield ("homebrain_data_age_seconds", {"source": "calendar"}, now - _LAST_REFRESH.timestamp())
+    for label, stats in list(_SOURCE_STATS.items()):
+        if stats["fetched_at"] is not None:
+            yield ("homebrain_data_age_seconds", {"source": f"ics:{label}"}, now - stats["fetched_at"])
+        yield ("homebrain_calendar_source_events", {"source": label}, stats["events"])
+        yield ("homebrain_calendar_source_up", {"source": label}, 1 if stats["ok"] else 0)
+    yield ("homebrain_calendar_events", {"store": "cache"}, len(_CACHE))
+    yield ("homebrain_calendar_events", {"store": "search_index"}, len(_SEARCH))
+    yield ("homebrain_calendar_search_postings", {}, _SEARCH.posting_count)
+    yield ("homebrain_calendar_history_events", {}, len(_HISTORY[1]) if _HISTORY else 0)
+
+
+metrics.register_collector(_collect_metrics)
 
 
 def start_background_refresh():
-    global _REFRESH_TASK
-    if _REFRESH_TASK is None:
-        _REFRESH_TASK = asyncio.create_task(_background_refresh())
+    """Register the periodic forced calendar refresh with the shared scheduler (idempotent)."""
+    scheduler.register(
+        "calendar",
+        refresh_events,
+        args=(True,),
+        interval=lambda: max(5, get_settings().calendar_refresh_minutes) * 60,
+        jitter=30,
+        timeout=120,
+        priority=0,
+    )
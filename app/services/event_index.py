@@ -0,0 +1,80 @@
+"""Interval index over calendar events.
+
+Events are kept sorted by start time in flat arrays and viewed as an implicit
+balanced binary tree (the middle element of every slice is the node). Each node
+stores the maximum end time of its subtree, so "which events overlap [a, b)"
+prunes every subtree that either ends before ``a`` or starts after ``b`` and
+answers in O(log n + k).
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+from app.models import Event
+
+# Events without a usable end still occupy their start instant
+_POINT_DURATION = timedelta(seconds=1)
+_ALL_DAY_DURATION = timedelta(days=1)
+
+
+def event_bounds(event: Event) -> Tuple[float, float]:
+    """Return the half-open ``(start, end)`` of an event as POSIX timestamps."""
+    start = event.start
+    end = event.end
+    if end is None or end <= start:
+        end = start + (_ALL_DAY_DURATION if event.is_all_day else _POINT_DURATION)
+    return start.timestamp(), end.timestamp()
+
+
+def overlaps(event: Event, start: datetime, end: datetime) -> bool:
+    """True when ``event`` overlaps the half-open range ``[start, end)``."""
+    s, e = event_bounds(event)
+    return s < end.timestamp() and e > start.timestamp()
+
+
+class IntervalIndex:
+    """Static interval index built from a list of events."""
+
+    def __init__(self, events: Iterable[Event], presorted: bool = False):
+        items = list(events)
+        if not presorted:
+            items.sort(key=lambda e: e.start)
+        self._events: List[Event] = items
+        bounds = [event_bounds(e) for e in items]
+        self._starts: List[float] = [b[0] for b in bounds]
+        self._ends: List[float] = [b[1] for b in bounds]
+        self._max_end: List[float] = [0.0] * len(items)
+        self._build(0, len(items))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def events(self) -> List[Event]:
+        return self._events
+
+    def _build(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        best = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        self._max_end[mid] = best
+        return best
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Event]:
+        """Return events overlapping ``[start, end)`` ordered by start time."""
+        out: List[int] = []
+        self._query(0, len(self._events), start.timestamp(), end.timestamp(), out)
+        return [self._events[i] for i in out]
+
+    def _query(self, lo: int, hi: int, a: float, b: float, out: List[int]) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] <= a:
+            return
+        self._query(lo, mid, a, b, out)
+        if self._starts[mid] >= b:
+            return
+        if self._ends[mid] > a:
+            out.append(mid)
+        self._query(mid + 1, hi, a, b, out)
@@ -0,0 +1,130 @@
+"""Cross-source merge of calendar events keyed by UID + RECURRENCE-ID.
+
+The same event often shows up in several shared calendars. Every source's
+events are tracked separately and each key resolves to a single winner by
+source precedence. Refreshes apply per-source diffs (added / changed /
+removed) and only the touched keys are re-resolved. Winners live in a list
+kept sorted by start, so the merged view never needs a full re-sort.
+"""
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models import Event
+
+
+def event_key(event: Event) -> str:
+    """Identity of an event across feeds."""
+    if event.uid:
+        return f"{event.uid}|{event.recurrence_id or ''}"
+    # Feeds without UIDs (local JSON) fall back to title + start
+    return f"{event.title}|{event.start.isoformat()}"
+
+
+def _content(event: Event) -> tuple:
+    return (
+        event.title,
+        event.start,
+        event.end,
+        event.location,
+        event.category,
+        event.is_all_day,
+    )
+
+
+@dataclass
+class SourceDiff:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class EventMerger:
+    """Deduplicated, start-ordered view over events from several sources."""
+
+    def __init__(self, precedence: Iterable[str] = ()):
+        self._precedence: List[str] = list(precedence)
+        self._seen: List[str] = []
+        self._by_source: Dict[str, Dict[str, Event]] = {}
+        self._winners: Dict[str, Tuple[str, Event]] = {}
+        self._order: List[Tuple[datetime, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._winners)
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._by_source)
+
+    def set_precedence(self, precedence: Iterable[str]) -> None:
+        precedence = list(precedence)
+        if precedence == self._precedence:
+            return
+        self._precedence = precedence
+        self._resolve_keys(list(self._winners))
+
+    def _rank(self, source: str) -> Tuple[int, int]:
+        if source in self._precedence:
+            return (0, self._precedence.index(source))
+        return (1, self._seen.index(source))
+
+    def apply_source(self, source: str, events: Iterable[Event]) -> SourceDiff:
+        """Replace ``source``'s events and return what changed."""
+        if source not in self._seen:
+            self._seen.append(source)
+        old = self._by_source.get(source, {})
+        new: Dict[str, Event] = {event_key(e): e for e in events}
+        diff = SourceDiff()
+        for key, e in new.items():
+            prev = old.get(key)
+            if prev is None:
+                diff.added.append(key)
+            elif _content(prev) != _content(e):
+                diff.changed.append(key)
+        diff.removed = [key for key in old if key not in new]
+        self._by_source[source] = new
+        self._resolve_keys(diff.added + diff.changed + diff.removed)
+        return diff
+
+    def remove_source(self, source: str) -> SourceDiff:
+        old = self._by_source.pop(source, {})
+        self._resolve_keys(list(old))
+        return SourceDiff(removed=list(old))
+
+    def _resolve_keys(self, keys: List[str]) -> None:
+        # Small diffs patch the ordered list in place; bulk loads re-sort once
+        bulk = len(keys) > 64 and len(keys) > len(self._order) // 8
+        ranked = sorted(self._by_source, key=self._rank)
+        for key in keys:
+            self._resolve(key, ranked, update_order=not bulk)
+        if bulk:
+            self._order = sorted((e.start, k) for k, (_, e) in self._winners.items())
+
+    def _resolve(self, key: str, ranked: List[str], update_order: bool = True) -> None:
+        best: Optional[Tuple[str, Event]] = None
+        for source in ranked:
+            e = self._by_source[source].get(key)
+            if e is not None:
+                best = (source, e)
+                break
+        current = self._winners.get(key)
+        if current is not None and best is not None and current[1] is best[1]:
+            return
+        if current is not None:
+            if update_order:
+                pos = bisect_left(self._order, (current[1].start, key))
+                if pos < len(self._order) and self._order[pos][1] == key:
+                    del self._order[pos]
+            del self._winners[key]
+        if best is not None:
+            self._winners[key] = best
+            if update_order:
+                insort(self._order, (best[1].start, key))
+
+    def events(self) -> List[Event]:
+        """Winning events ordered by start time."""
+        return [self._winners[key][1] for _, key in self._order]
@@ -0,0 +1,165 @@
+"""Inverted index for full-text search over event titles and locations.
+
+Events are grouped by the source they came from. Each source carries a
+fingerprint of its content so a refresh only re-tokenizes sources whose events
+actually changed. The token vocabulary is kept sorted for prefix lookups and
+the total number of postings is capped; once the cap is hit the oldest events
+are dropped from the index first.
+"""
+import hashlib
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.models import Event
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _fingerprint(events: List[Event]) -> str:
+    h = hashlib.sha1()
+    for e in events:
+        h.update(
+            f"{e.title}\x1f{e.start.isoformat()}\x1f{e.end.isoformat() if e.end else ''}"
+            f"\x1f{e.location or ''}\x1f{e.category or ''}\x1e".encode("utf-8")
+        )
+    return h.hexdigest()
+
+
+class SearchIndex:
+    """Token -> event id postings, updated one source at a time."""
+
+    def __init__(self, max_postings: int = 250_000):
+        self.max_postings = max_postings
+        self._docs: Dict[int, Event] = {}
+        self._doc_tokens: Dict[int, Set[str]] = {}
+        self._doc_source: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._sources: Dict[str, str] = {}
+        self._source_docs: Dict[str, Set[int]] = {}
+        self._vocab: Optional[List[str]] = None
+        self._posting_count = 0
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def posting_count(self) -> int:
+        return self._posting_count
+
+    def sync(self, sources: Dict[str, List[Event]]) -> List[str]:
+        """Bring the index in line with ``sources``.
+
+        Sources missing from ``sources`` are dropped. Returns the keys of the
+        sources that were (re)indexed or removed.
+        """
+        changed = [key for key in list(self._sources) if key not in sources]
+        for key in changed:
+            self.remove_source(key)
+        for key, events in sources.items():
+            if self.update_source(key, events):
+                changed.append(key)
+        return changed
+
+    def update_source(self, key: str, events: List[Event]) -> bool:
+        """Re-index a single source; returns False when its content is unchanged."""
+        fp = _fingerprint(events)
+        if self._sources.get(key) == fp:
+            return False
+        self.remove_source(key)
+        self._sources[key] = fp
+        ids = self._source_docs.setdefault(key, set())
+        for e in events:
+            tokens = set(tokenize(e.title)) | set(tokenize(e.location))
+            if not tokens:
+                continue
+            doc_id = self._next_id
+            self._next_id += 1
+            self._docs[doc_id] = e
+            self._doc_tokens[doc_id] = tokens
+            self._doc_source[doc_id] = key
+            ids.add(doc_id)
+            for tok in tokens:
+                bucket = self._postings.get(tok)
+                if bucket is None:
+                    self._postings[tok] = {doc_id}
+                    self._vocab = None
+                else:
+                    bucket.add(doc_id)
+            self._posting_count += len(tokens)
+        self._enforce_budget()
+        return True
+
+    def remove_source(self, key: str) -> None:
+        self._sources.pop(key, None)
+        for doc_id in self._source_docs.pop(key, set()):
+            self._remove_doc(doc_id, detach=False)
+
+    def _remove_doc(self, doc_id: int, detach: bool = True) -> None:
+        self._docs.pop(doc_id, None)
+        tokens = self._doc_tokens.pop(doc_id, set())
+        source = self._doc_source.pop(doc_id, None)
+        if detach and source is not None:
+            self._source_docs.get(source, set()).discard(doc_id)
+        for tok in tokens:
+            bucket = self._postings.get(tok)
+            if bucket is None:
+                continue
+            bucket.discard(doc_id)
+            if not bucket:
+                del self._postings[tok]
+                self._vocab = None
+        self._posting_count -= len(tokens)
+
+    def _enforce_budget(self) -> None:
+        if self._posting_count <= self.max_postings:
+            return
+        oldest_first = sorted(self._docs, key=lambda i: self._docs[i].start)
+        for doc_id in oldest_first:
+            if self._posting_count <= self.max_postings:
+                break
+            self._remove_doc(doc_id)
+
+    def _matching(self, prefix: str) -> Set[int]:
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        vocab = self._vocab
+        out: Set[int] = set()
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            out |= self._postings[vocab[i]]
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 50) -> List[Event]:
+        """Return events matching every query token as a word prefix."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        hits: Optional[Set[int]] = None
+        # Narrow with the most selective (longest) terms first
+        for term in sorted(set(terms), key=len, reverse=True):
+            ids = self._matching(term)
+            hits = ids if hits is None else hits & ids
+            if not hits:
+                return []
+        return _dedupe(sorted((self._docs[i] for i in hits), key=lambda e: e.start))[:limit]
+
+
+def _dedupe(events: Iterable[Event]) -> List[Event]:
+    seen = set()
+    out: List[Event] = []
+    for e in events:
+        key = (e.title, e.start, e.location)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(e)
+    return out
@@ -0,0 +1,118 @@
+"""Opt-in event-loop lag monitor.
+
+A heartbeat coroutine sleeps for a fixed interval and records how late it was
+woken up. That delay is the scheduling lag every other coroutine also sees.
+A watchdog thread checks the heartbeat. When the loop has not ticked for
+longer than the threshold, it snapshots the loop thread's current stack and
+logs it, which names the callback that is blocking. Lag is exported through
+``/metrics`` as a histogram and as max/avg gauges over a rolling window.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Optional
+
+from app.config import get_settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "homebrain_event_loop_lag_seconds",
+    "Delay between a scheduled wake-up and the event loop running it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_BLOCKS = metrics.counter(
+    "homebrain_event_loop_blocks_total", "Times the event loop was blocked longer than the threshold"
+)
+
+_WINDOW: Deque[float] = deque(maxlen=600)
+_LAST_BEAT: float = 0.0
+_LOOP_THREAD: Optional[int] = None
+_TASK: Optional[asyncio.Task] = None
+_WATCHDOG: Optional[threading.Thread] = None
+_STOP = threading.Event()
+
+
+async def _heartbeat(interval: float) -> None:
+    global _LAST_BEAT, _LOOP_THREAD
+    loop = asyncio.get_running_loop()
+    _LOOP_THREAD = threading.get_ident()
+    while True:
+        _LAST_BEAT = time.monotonic()
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - scheduled)
+        _WINDOW.append(lag)
+        LOOP_LAG_SECONDS.observe(lag)
+
+
+def _watchdog(threshold: float, poll: float) -> None:
+    reported_beat = 0.0
+    while not _STOP.wait(poll):
+        beat = _LAST_BEAT
+        if not beat or _LOOP_THREAD is None or beat == reported_beat:
+            continue
+        blocked = time.monotonic() - beat
+        # The heartbeat itself sleeps for one interval; anything beyond threshold is blocking
+        if blocked < threshold + poll:
+            continue
+        frame = sys._current_frames().get(_LOOP_THREAD)
+        if frame is None:
+            continue
+        reported_beat = beat
+        LOOP_BLOCKS.inc()
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(
+            "Event loop blocked",
+            extra={"blocked_ms": round(blocked * 1000), "threshold_ms": round(threshold * 1000), "stack": stack},
+        )
+
+
+def _collect_metrics():
+    if not _WINDOW:
+        return
+    window = list(_WINDOW)
+    yield ("homebrain_event_loop_lag_max_seconds", {}, max(window))
+    yield ("homebrain_event_loop_lag_avg_seconds", {}, sum(window) / len(window))
+
+
+def start() -> bool:
+    """Start the monitor on the running loop if LOOP_MONITOR_ENABLED (idempotent)."""
+    global _TASK, _WATCHDOG
+    settings = get_settings()
+    if not settings.loop_monitor_enabled or _TASK is not None:
+        return False
+    interval = max(0.01, settings.loop_monitor_interval_ms / 1000.0)
+    threshold = max(interval, settings.loop_block_threshold_ms / 1000.0)
+    _STOP.clear()
+    _TASK = asyncio.get_running_loop().create_task(_heartbeat(interval))
+    _WATCHDOG = threading.Thread(
+        target=_watchdog, args=(threshold, interval), name="homebrain-loop-watchdog", daemon=True
+    )
+    _WATCHDOG.start()
+    metrics.register_collector(_collect_metrics)
+    logger.info(
+        "Started event loop monitor",
+        extra={"interval_ms": round(interval * 1000), "threshold_ms": round(threshold * 1000)},
+    )
+    return True
+
+
+async def stop() -> None:
+    global _TASK, _WATCHDOG, _LAST_BEAT
+    _STOP.set()
+    if _TASK is not None:
+        _TASK.cancel()
+        try:
+            await _TASK
+        except asyncio.CancelledError:
+            pass
+    if _WATCHDOG is not None:
+        _WATCHDOG.join(timeout=1)
+    _TASK = _WATCHDOG = None
+    _LAST_BEAT = 0.0
@@ -0,0 +1,180 @@
+"""In-app menu scraping.
+
+With ``MENU_SCRAPE_ENABLED`` the scheduler runs ``scripts/scrape_weekly_menu.py``
+in a child process (its own session, so a timeout kills Chrome too) with a
+wall-clock timeout and, when Chrome runs remotely, an address-space limit.
+The child logs JSON lines; they are read as they arrive to report progress on
+``/admin``. On success the menu cache is reloaded right away instead of on the
+next ``menu`` tick.
+"""
+import json
+import logging
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+from app.services import menu_service, metrics, scheduler, shared_cache
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+SCRAPER_SCRIPT = ROOT / "scripts" / "scrape_weekly_menu.py"
+LEASE = "menu-scrape"
+
+SCRAPE_RUNS = metrics.counter("homebrain_menu_scrape_runs_total", "Menu scraper runs by outcome", ("status",))
+
+_LOCK = threading.Lock()
+_STATUS: Dict[str, Any] = {
+    "state": "idle",
+    "started_at": None,
+    "finished_at": None,
+    "duration_s": None,
+    "progress": None,
+    "days": 0,
+    "returncode": None,
+    "last_error": None,
+    "last_success": None,
+}
+
+
+def status() -> Dict[str, Any]:
+    with _LOCK:
+        return dict(_STATUS)
+
+
+def _update(**fields: Any) -> None:
+    with _LOCK:
+        _STATUS.update(fields)
+
+
+def command() -> List[str]:
+    return [sys.executable, str(SCRAPER_SCRIPT), *shlex.split(get_settings().menu_scrape_args)]
+
+
+def _environment() -> Dict[str, str]:
+    settings = get_settings()
+    env = dict(os.environ)
+    env.update(
+        {
+            "SCRAPER_OUTPUT": str(menu_service.MENU_FILE),
+            "SCRAPER_STORE_DIR": str(menu_service.MENU_FILE.parent / "menus"),
+            "SCRAPER_TIMEOUT": str(settings.menu_scrape_timeout_seconds),
+            "SCRAPER_MEMORY_MB": str(settings.menu_scrape_memory_mb),
+            "LOG_FORMAT": "json",
+            "PYTHONUNBUFFERED": "1",
+        }
+    )
+    return env
+
+
+def _read_output(stream, tail: deque) -> None:
+    """Follow the child's log lines, recording progress and keeping the last few for errors"""
+    for raw in stream:
+        line = raw.rstrip()
+        if not line:
+            continue
+        tail.append(line)
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        msg = record.get("msg")
+        if msg == "Extracted day":
+            with _LOCK:
+                _STATUS["days"] += 1
+                _STATUS["progress"] = f"{record.get('day')}: {record.get('entrees')} entrees"
+        elif msg in ("Loading menu page", "Saved menu data", "Merged menu store"):
+            _update(progress=msg)
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def run_scrape() -> bool:
+    """Run the scraper once; True on success, False if another worker holds the lease.
+
+    Raises RuntimeError when the scraper fails or times out, so the scheduler
+    records the run as failed as well.
+    """
+    settings = get_settings()
+    timeout = settings.menu_scrape_timeout_seconds
+    if shared_cache.enabled() and not shared_cache.acquire_lease(LEASE, ttl=timeout + 60):
+        _update(state="skipped", progress="another worker is scraping")
+        SCRAPE_RUNS.inc(status="skipped")
+        return False
+    started = time.monotonic()
+    _update(
+        state="running", started_at=datetime.now().isoformat(timespec="seconds"), finished_at=None,
+        duration_s=None, progress="starting", days=0, returncode=None,
+    )
+    tail: deque = deque(maxlen=20)
+    try:
+        proc = subprocess.Popen(
+            command(), cwd=str(ROOT), env=_environment(), stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, start_new_session=True,
+        )
+        reader = threading.Thread(target=_read_output, args=(proc.stdout, tail), daemon=True)
+        reader.start()
+        try:
+            returncode: Optional[int] = proc.wait(timeout=timeout)
+            state = "ok" if returncode == 0 else "error"
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            returncode = proc.wait()
+            state = "timeout"
+        reader.join(timeout=5)
+    finally:
+        if shared_cache.enabled():
+            shared_cache.release_lease(LEASE)
+
+    duration = time.monotonic() - started
+    finished = datetime.now().isoformat(timespec="seconds")
+    SCRAPE_RUNS.inc(status=state)
+    if state == "ok":
+        # Pick up the new menu now rather than on the next reload tick
+        menu_service.refresh_menu()
+        _update(state=state, finished_at=finished, duration_s=round(duration, 1), returncode=returncode,
+                progress="done", last_error=None, last_success=finished)
+        logger.info("Menu scrape finished", extra={"seconds": round(duration, 1), "days": status()["days"]})
+        return True
+    error = f"exceeded {timeout}s" if state == "timeout" else f"exit code {returncode}"
+    detail = "\n".join(tail)
+    _update(state=state, finished_at=finished, duration_s=round(duration, 1), returncode=returncode,
+            last_error=f"{error}\n{detail}".strip())
+    logger.warning("Menu scrape failed", extra={"status": state, "error": error})
+    raise RuntimeError(f"menu scrape {error}")
+
+
+def start_background_refresh() -> None:
+    """Register the scrape job with the shared scheduler when MENU_SCRAPE_ENABLED is set."""
+    settings = get_settings()
+    if not settings.menu_scrape_enabled:
+        return
+    scheduler.register(
+        "menu-scrape",
+        run_scrape,
+        interval=settings.menu_scrape_interval_minutes * 60,
+        jitter=60,
+        # The child is killed at its own timeout; leave room to reap it
+        timeout=settings.menu_scrape_timeout_seconds + 30,
+        priority=3,
+        initial_delay=5 if not menu_service.MENU_FILE.exists() else 60,
+    )
@@ -1,13 +1,150 @@
 """School menu service"""
+import asyncio
 import json
+import logging
 import os
+import time
+from functools import lru_cache
 from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from app.models import LunchMenuItem
+from app.services import allergens, metrics, scheduler, timing
 
+logger = logging.getLogger(__name__)
 
+MENU_FILE = Path(__file__).resolve().parent.parent.parent / "cache" / "weekly_menu_data.json"
+# Written by the scraper after each change to MENU_FILE (see scripts/menu_store.py)
+MANIFEST_FILE = MENU_FILE.with_name("menu_manifest.json")
+# Append-only history of every scraped week: <week>.jsonl segments plus index.json (date -> segment, offset, length)
+HISTORY_DIR = MENU_FILE.with_name("menu_history")
+
+_MENU_DATA: Optional[dict] = None
+_MENU_MTIME: Optional[float] = None
+# Manifest version of _MENU_DATA, and ((mtime_ns, size), version) of the manifest when last read
+_MENU_VERSION: Optional[int] = None
+_MANIFEST: Optional[tuple] = None
+# History index: {iso_date: (segment, offset, length)} and the index file's (mtime_ns, size)
+_HISTORY_INDEX: Dict[str, tuple] = {}
+_HISTORY_STAT: Optional[tuple] = None
+# Last dashboard bundle: (day, view), served when a reload is too slow
+_LAST_VIEW: Optional[tuple] = None
+
+MENU_RELOAD_SECONDS = metrics.histogram(
+    "homebrain_menu_reload_seconds", "Time to load the scraped menu cache from disk"
+)
+
+
+def _manifest_version() -> Optional[int]:
+    """Version in MANIFEST_FILE, re-read only when the manifest itself changes; None without one"""
+    global _MANIFEST
+    try:
+        st = MANIFEST_FILE.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _MANIFEST is not None and _MANIFEST[0] == stamp:
+        return _MANIFEST[1]
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            version = int(json.load(f)["version"])
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning("Unreadable menu manifest", extra={"path": str(MANIFEST_FILE)})
+        return None
+    _MANIFEST = (stamp, version)
+    return version
+
+
+def _load_menu_data() -> Optional[dict]:
+    """Return the parsed menu cache, re-reading the file only when its manifest version
+    changes (or, for caches written without a manifest, when the file's mtime changes)"""
+    global _MENU_DATA, _MENU_MTIME, _MENU_VERSION
+    version = _manifest_version()
+    if _MENU_DATA is not None and version is not None and version == _MENU_VERSION:
+        metrics.CACHE_REQUESTS.inc(cache="menu", result="hit")
+        return _MENU_DATA
+    try:
+        mtime = MENU_FILE.stat().st_mtime
+    except OSError:
+        return None
+    if _MENU_DATA is not None and version is None and mtime == _MENU_MTIME:
+        metrics.CACHE_REQUESTS.inc(cache="menu", result="hit")
+        return _MENU_DATA
+    metrics.CACHE_REQUESTS.inc(cache="menu", result="miss")
+    with MENU_RELOAD_SECONDS.time():
+        with open(MENU_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for menu in data.get("weekly_menus", {}).values():
+            _index_allergens(menu)
+    _MENU_DATA, _MENU_MTIME, _MENU_VERSION = data, mtime, version
+    return data
+
+
+def _index_allergens(menu: dict) -> dict:
+    """Store each item's allergen bitmask on it, so renders only do bitwise checks"""
+    for items in menu.values():
+        if isinstance(items, list):
+            for item in items:
+                item["allergen_mask"] = allergens.mask_of(item.get("allergens", []))
+    return menu
+
+
+def _menu_items(items: List[dict]) -> List[LunchMenuItem]:
+    return [
+        LunchMenuItem(**item, unsafe_for=allergens.unsafe_members(item.get("allergen_mask", 0)))
+        for item in items
+    ]
+
+
+def _history_index() -> Dict[str, tuple]:
+    """The history's date index, re-read only when index.json changes"""
+    global _HISTORY_INDEX, _HISTORY_STAT
+    path = HISTORY_DIR / "index.json"
+    try:
+        st = path.stat()
+    except OSError:
+        _HISTORY_INDEX, _HISTORY_STAT = {}, None
+        return _HISTORY_INDEX
+    stamp = (st.st_mtime_ns, st.st_size)
+    if stamp != _HISTORY_STAT:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                days = json.load(f).get("days", {})
+            _HISTORY_INDEX = {day: tuple(loc) for day, loc in days.items()}
+        except (OSError, ValueError, AttributeError):
+            logger.warning("Unreadable menu history index", extra={"path": str(path)})
+            return _HISTORY_INDEX
+        _HISTORY_STAT = stamp
+    return _HISTORY_INDEX
+
+
+@lru_cache(maxsize=64)
+def _read_history_record(path: str, offset: int, length: int) -> dict:
+    # Segments are append-only, so a (path, offset, length) record never changes
+    with open(path, "rb") as f:
+        f.seek(offset)
+        record = json.loads(f.read(length))
+    _index_allergens(record.get("menu") or {})
+    return record
+
+
+def _history_menu(target_date: date) -> Optional[dict]:
+    """Menu for ``target_date`` from the history: one index lookup and one read"""
+    loc = _history_index().get(target_date.isoformat())
+    if loc is None:
+        metrics.CACHE_REQUESTS.inc(cache="menu_history", result="miss")
+        return None
+    metrics.CACHE_REQUESTS.inc(cache="menu_history", result="hit")
+    try:
+        segment, offset, length = loc
+        return _read_history_record(str(HISTORY_DIR / segment), offset, length).get("menu")
+    except (OSError, ValueError):
+        logger.warning("Unreadable menu history record", extra={"date": target_date.isoformat()})
+        return None
+
+
+@timing.timed("menu")
 def get_weekly_menu() -> Dict[str, List[str]]:
     """
     Get the weekly school lunch menu
@@ -15,14 +152,10 @@ def get_weekly_menu() -> Dict[str, List[str]]:
     Returns:
         Dictionary with day names as keys and list of entrees as values
     """
-    cache_file = Path(__file__).resolve().parent.parent.parent / "cache" / "weekly_menu_data.json"
-    
-    if not cache_file.exists():
-        return {}
-    
     try:
-        with open(cache_file, 'r') as f:
-            data = json.load(f)
+        data = _load_menu_data()
+        if data is None:
+            return {}
         
         # Extract just the entrees for each day
         weekly_menus = data.get('weekly_menus', {})
@@ -44,21 +177,49 @@ def get_weekly_menu() -> Dict[str, List[str]]:
                 menu_by_day[day_key] = entrees
         
         return menu_by_day
-    except Exception as e:
-        print(f"Error loading menu: {e}")
+    except Exception:
+        logger.exception("Error loading menu cache", extra={"path": str(MENU_FILE)})
+        return {}
+
+
+@timing.timed("menu")
+def get_weekly_menu_flags() -> Dict[str, List[List[str]]]:
+    """
+    Household members to warn for each weekly entree, aligned with get_weekly_menu()
+    
+    Returns:
+        {"Mon 10": [[], ["Emma"], ...]} (empty when no ALLERGEN_PROFILES are set)
+    """
+    if not allergens.profiles():
+        return {}
+    data = _load_menu_data()
+    if data is None:
         return {}
+    flags = {}
+    for day_label, menu_data in data.get("weekly_menus", {}).items():
+        parts = day_label.split()
+        if len(parts) >= 3:
+            flags[f"{parts[0]} {parts[1]}"] = [
+                allergens.unsafe_members(item.get("allergen_mask", 0)) for item in menu_data.get("entrees", [])
+            ]
+    return flags
 
 
 def refresh_menu():
     """
-    Trigger a refresh of the menu data by running the scraper
-    This should be called periodically (e.g., nightly) to keep menu up to date
+    Pick up a newly scraped menu cache so requests never pay for the reload.
+    Scraping itself runs in the menu-scrape job (app/services/menu_refresh.py)
+    or the optional scraper container (see SCRAPER_README.md)
     """
-    # This would run the scraper - for now, just a placeholder
-    # In production, you'd want to run this as a background task
-    pass
+    _load_menu_data()
+
+
+def start_background_refresh():
+    """Register the periodic menu reload with the shared scheduler (idempotent)."""
+    scheduler.register("menu", refresh_menu, interval=15 * 60, jitter=30, timeout=30, priority=2)
 
 
+@timing.timed("menu")
 def get_today_menu(now: datetime) -> Optional[List[str]]:
     """
     Get today's lunch menu entrees
@@ -84,6 +245,7 @@ def get_today_menu(now: datetime) -> Optional[List[str]]:
     return weekly_menu.get(today_key)
 
 
+@timing.timed("menu")
 def get_tomorrow_menu(now: datetime) -> Optional[List[str]]:
     """
     Get tomorrow's lunch menu entrees
@@ -112,9 +274,11 @@ def get_tomorrow_menu(now: datetime) -> Optional[List[str]]:
     return weekly_menu.get(tomorrow_key)
 
 
+@timing.timed("menu")
 def get_menu_for_date(target_date: date) -> Optional[Dict[str, List[LunchMenuItem]]]:
     """
-    Get lunch menu for a specific date from the cached weekly menu data
+    Get lunch menu for a specific date from the cached weekly menu data, or
+    from the menu history for any other scraped week
     
     Args:
         target_date: The date to get the menu for
@@ -122,54 +286,93 @@ def get_menu_for_date(target_date: date) -> Optional[Dict[str, List[LunchMenuIte
     Returns:
         Dictionary with menu categories (entrees, vegetables, fruits, etc.) or None if not found
     """
-    cache_file = Path(__file__).resolve().parent.parent.parent / "cache" / "weekly_menu_data.json"
-    
-    if not cache_file.exists():
-        return None
-    
     try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        menu_data = None
+        data = _load_menu_data()
+        if data is not None:
+            weekly_menus = data.get("weekly_menus", {})
+            
+            # Convert target_date to the format used in the menu keys
+            # Format: "Mon 01 DEC"
+            day_abbr = target_date.strftime("%a")  # Mon, Tue, etc.
+            day_num = target_date.strftime("%d")   # 01, 02, etc.
+            month_abbr = target_date.strftime("%b").upper()  # DEC, JAN, etc.
+            
+            # Try different key formats
+            key_formats = [
+                f"{day_abbr} {day_num} {month_abbr}",
+                f"{day_abbr} {int(day_num)} {month_abbr}",  # Without leading zero
+            ]
+            menu_data = next((weekly_menus[key] for key in key_formats if key in weekly_menus), None)
         
-        weekly_menus = data.get("weekly_menus", {})
+        if menu_data is None:
+            # Outside the current week: any other scraped day is in the history
+            menu_data = _history_menu(target_date)
+        if menu_data is None:
+            return None
         
-        # Convert target_date to the format used in the menu keys
-        # Format: "Mon 01 DEC"
-        day_abbr = target_date.strftime("%a")  # Mon, Tue, etc.
-        day_num = target_date.strftime("%d")   # 01, 02, etc.
-        month_abbr = target_date.strftime("%b").upper()  # DEC, JAN, etc.
-        
-        # Try different key formats
-        key_formats = [
-            f"{day_abbr} {day_num} {month_abbr}",
-            f"{day_abbr} {int(day_num)} {month_abbr}",  # Without leading zero
-        ]
-        
-        for key in key_formats:
-            if key in weekly_menus:
-                menu_data = weekly_menus[key]
-                
-                # Convert to LunchMenuItem objects
-                result = {}
-                for category in ["entrees", "vegetables", "fruits", "milk", "condiments"]:
-                    if category in menu_data:
-                        result[category] = [
-                            LunchMenuItem(**item) for item in menu_data[category]
-                        ]
-                
-                return result
+        # Convert to LunchMenuItem objects
+        result = {}
+        for category in ["entrees", "vegetables", "fruits", "milk", "condiments"]:
+            if category in menu_data:
+                result[category] = _menu_items(menu_data[category])
         
-        return None
-    except Exception as e:
-        print(f"[Menu] Error reading menu cache: {e}")
+        return result
+    except Exception:
+        logger.exception("Error reading menu cache", extra={"path": str(MENU_FILE)})
         return None
 
 
+@timing.timed("menu")
 def get_today_menu_full() -> Optional[Dict[str, List[LunchMenuItem]]]:
     """Get full lunch menu for today"""
     return get_menu_for_date(date.today())
 
 
+@timing.timed("menu")
 def get_tomorrow_menu_full() -> Optional[Dict[str, List[LunchMenuItem]]]:
     """Get full lunch menu for tomorrow"""
     return get_menu_for_date(date.today() + timedelta(days=1))
+
+
+def dashboard_menu(now: datetime) -> Dict[str, object]:
+    """Weekly, today and tomorrow menus shown on the dashboard"""
+    global _LAST_VIEW
+    view = {
+        "weekly_menu": get_weekly_menu(),
+        "weekly_menu_flags": get_weekly_menu_flags(),
+        "today_menu": get_today_menu(now),
+        "tomorrow_menu": get_tomorrow_menu(now),
+        "today_menu_full": get_today_menu_full(),
+        "tomorrow_menu_full": get_tomorrow_menu_full(),
+    }
+    _LAST_VIEW = (now.date(), view)
+    return view
+
+
+async def dashboard_menu_async(now: datetime) -> Dict[str, object]:
+    return await asyncio.to_thread(dashboard_menu, now)
+
+
+def cached_dashboard_menu(now: datetime) -> Dict[str, object]:
+    """Last dashboard_menu() result for the same day, or an empty menu"""
+    if _LAST_VIEW is not None and _LAST_VIEW[0] == now.date():
+        return _LAST_VIEW[1]
+    return {
+        "weekly_menu": {},
+        "weekly_menu_flags": {},
+        "today_menu": None,
+        "tomorrow_menu": None,
+        "today_menu_full": None,
+        "tomorrow_menu_full": None,
+    }
+
+
+def _collect_metrics():
+    if _MENU_DATA is None or _MENU_MTIME is None:
+        return
+    yield ("homebrain_data_age_seconds", {"source": "menu"}, time.time() - _MENU_MTIME)
+    yield ("homebrain_menu_days", {}, len(_MENU_DATA.get("weekly_menus", {})))
+
+
+metrics.register_collector(_collect_metrics)
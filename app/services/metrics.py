@@ -0,0 +1,210 @@
+"""Minimal in-process Prometheus metrics.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock,
+so recording a sample costs a dict lookup and a few additions, which is cheap
+enough to leave on permanently. ``render()`` produces the Prometheus text
+exposition format served by ``/metrics``. Values that are only meaningful at
+scrape time (data age, cache sizes) are supplied by registered collectors.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+_LOCK = threading.Lock()
+_METRICS: Dict[str, "_Metric"] = {}
+_COLLECTORS: List[Callable[[], Iterable[Sample]]] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with _LOCK:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with _LOCK:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, self._labels(k), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with _LOCK:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][idx] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[Sample]:
+        out: List[Sample] = []
+        for key, (counts, total) in self._values.items():
+            labels = self._labels(key)
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                out.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, running))
+            out.append((f"{self.name}_count", labels, running))
+            out.append((f"{self.name}_sum", labels, total[0]))
+        return out
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _LOCK:
+        existing = _METRICS.get(metric.name)
+        if existing is not None:
+            return existing
+        _METRICS[metric.name] = metric
+    return metric
+
+
+def counter(name: str, doc: str, labelnames: Iterable[str] = ()) -> Counter:
+    return _register(Counter(name, doc, labelnames))  # type: ignore[return-value]
+
+
+def gauge(name: str, doc: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return _register(Gauge(name, doc, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str,
+    doc: str,
+    labelnames: Iterable[str] = (),
+    buckets: Optional[Iterable[float]] = None,
+) -> Histogram:
+    return _register(Histogram(name, doc, labelnames, buckets or DEFAULT_BUCKETS))  # type: ignore[return-value]
+
+
+def register_collector(fn: Callable[[], Iterable[Sample]]) -> None:
+    """Register a callable returning ``(name, labels, value)`` gauge samples at scrape time."""
+    if fn not in _COLLECTORS:
+        _COLLECTORS.append(fn)
+
+
+def render() -> str:
+    lines: List[str] = []
+    with _LOCK:
+        metrics = list(_METRICS.values())
+        snapshot = [(m, m.samples()) for m in metrics]
+    for m, samples in snapshot:
+        lines.append(f"# HELP {m.name} {m.doc}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        for name, labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    collected: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    for fn in list(_COLLECTORS):
+        try:
+            for name, labels, value in fn():
+                collected.setdefault(name, []).append((labels, value))
+        except Exception:
+            continue
+    for name, samples in collected.items():
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Shared instruments used across services
+CACHE_REQUESTS = counter(
+    "homebrain_cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result")
+)
@@ -0,0 +1,177 @@
+"""On-demand sampling profiler for the admin panel.
+
+A background thread snapshots every Python thread's stack with
+``sys._current_frames()`` at a fixed interval. Each sample is folded into a
+collapsed stack (``root;caller;leaf count``, the format read by flamegraph.pl
+and speedscope). It is also tallied into self / inclusive function tables and
+attributed to the innermost frame from one of the data services, so calendar,
+weather and menu fetch/parse time is reported separately. A profile runs
+either for a fixed number of seconds or until the next N HTTP requests have
+completed. Only one profile can run at a time.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+SERVICE_MODULES = {
+    "app.services.calendar_service": "calendar",
+    "app.services.weather_service": "weather",
+    "app.services.menu_service": "menu",
+    "app.services.recurring_events_service": "recurring",
+    "app.services.tasks_service": "tasks",
+}
+
+_LOCK = threading.Lock()
+_ACTIVE: Optional["SamplingProfiler"] = None
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another is running."""
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, requests: Optional[int] = None):
+        self.interval = max(0.001, interval)
+        self.requests_target = requests
+        self.requests_seen = 0
+        self.samples = 0
+        self.collapsed: Counter = Counter()
+        self.self_counts: Counter = Counter()
+        self.inclusive_counts: Counter = Counter()
+        self.by_service: Counter = Counter()
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- lifecycle ---------------------------------------------------------
+    def start(self) -> "SamplingProfiler":
+        global _ACTIVE
+        with _LOCK:
+            if _ACTIVE is not None:
+                raise ProfilerBusy("a profile is already running")
+            _ACTIVE = self
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="homebrain-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        global _ACTIVE
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        with _LOCK:
+            if _ACTIVE is self:
+                _ACTIVE = None
+        return self
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the request target is met (or ``timeout``); True if met."""
+        return self._stop.wait(timeout)
+
+    def request_finished(self) -> None:
+        if self.requests_target is None:
+            return
+        self.requests_seen += 1
+        if self.requests_seen >= self.requests_target:
+            self._stop.set()
+
+    # -- sampling ----------------------------------------------------------
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                self._record(frame)
+
+    def _record(self, frame) -> None:
+        stack: List[str] = []
+        service: Optional[str] = None
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            if service is None:
+                service = SERVICE_MODULES.get(frame.f_globals.get("__name__", ""))
+            frame = frame.f_back
+        if not stack:
+            return
+        # Idle worker/loop threads parked in waits are noise, not work
+        leaf = stack[0]
+        if leaf.startswith(("threading:wait", "selectors:select", "queue:get")) or leaf.endswith(":_worker"):
+            return
+        self.samples += 1
+        self.self_counts[leaf] += 1
+        for label in set(stack):
+            self.inclusive_counts[label] += 1
+        self.collapsed[";".join(reversed(stack))] += 1
+        self.by_service[service or "other"] += 1
+
+    # -- reporting ---------------------------------------------------------
+    def collapsed_text(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.collapsed.most_common())
+
+    def report(self, top: int = 25) -> Dict[str, object]:
+        total = self.samples or 1
+
+        def table(counter: Counter) -> List[Dict[str, object]]:
+            return [
+                {"function": fn, "samples": n, "percent": round(100.0 * n / total, 2)}
+                for fn, n in counter.most_common(top)
+            ]
+
+        return {
+            "samples": self.samples,
+            "interval_s": self.interval,
+            "duration_s": round(self.duration, 3),
+            "requests": self.requests_seen if self.requests_target is not None else None,
+            "by_service": {
+                name: {"samples": n, "percent": round(100.0 * n / total, 2)}
+                for name, n in self.by_service.most_common()
+            },
+            "top_self": table(self.self_counts),
+            "top_inclusive": table(self.inclusive_counts),
+            "collapsed": self.collapsed_text(),
+        }
+
+
+def profile_for(seconds: float, interval: float = 0.005) -> SamplingProfiler:
+    """Sample all threads for ``seconds`` (blocking) and return the finished profiler."""
+    prof = SamplingProfiler(interval=interval).start()
+    try:
+        prof.wait(seconds)
+    finally:
+        prof.stop()
+    return prof
+
+
+def profile_requests(count: int, timeout: float, interval: float = 0.005) -> SamplingProfiler:
+    """Sample until ``count`` more HTTP requests complete or ``timeout`` elapses (blocking)."""
+    prof = SamplingProfiler(interval=interval, requests=count).start()
+    try:
+        prof.wait(timeout)
+    finally:
+        prof.stop()
+    return prof
+
+
+class RequestCounterMiddleware:
+    """ASGI middleware feeding completed HTTP requests to a request-bounded profile."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        if scope["type"] == "http":
+            prof = _ACTIVE
+            if prof is not None:
+                prof.request_finished()
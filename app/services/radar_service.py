@@ -0,0 +1,298 @@
+"""Cached proxy for RainViewer radar metadata and map tiles.
+
+Displays load ``/radar/maps.json`` and ``/radar/tiles/...`` from the app
+instead of the internet. Tiles are kept in a size-bounded LRU in memory and on
+disk. A radar tile never changes once its frame is published, so it lives
+until the frame ages out of ``weather-maps.json`` (``RADAR_FRAME_TTL_SECONDS``
+after the frame timestamp); base-map tiles get ``RADAR_BASEMAP_TTL_SECONDS``.
+Concurrent misses for the same URL share one upstream fetch, so N displays
+cost one request per frame tile.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+import httpx
+
+from app.config import get_settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+RADAR_REQUEST_SECONDS = metrics.histogram(
+    "homebrain_radar_request_seconds", "Upstream radar/base-map request latency", ("endpoint",)
+)
+
+# v2/radar/<frame>/<size>/<z>/<x>/<y>/<color>/<options>.png; <frame> is a timestamp or "nowcast_<id>"
+RADAR_TILE = re.compile(r"^v2/radar/(\w+)/(256|512)/\d{1,2}/\d{1,7}/\d{1,7}/\d{1,2}/\d_\d\.png$")
+BASEMAP_TILE = re.compile(r"^osm/(\d{1,2})/(\d{1,7})/(\d{1,7})\.png$")
+# Lower bound on a tile's lifetime, so an already-expired frame is not refetched on every request
+MIN_TTL = 60.0
+USER_AGENT = "HomeBrain-Dashboard/0.1 (+radar proxy)"
+
+
+class RadarUpstreamError(RuntimeError):
+    pass
+
+
+class Entry(NamedTuple):
+    body: bytes
+    content_type: str
+    expires: float
+
+
+class TileCache:
+    """LRU of tile bodies: a small memory tier in front of a larger directory on disk.
+
+    Entries are returned even when expired so callers can serve a stale tile if
+    the upstream is down. A disk file's mtime is its expiry time, which lets the
+    index be rebuilt from the directory after a restart.
+    """
+
+    def __init__(self, directory: Path, memory_bytes: int, disk_bytes: int):
+        self.directory = Path(directory)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, Entry]" = OrderedDict()
+        self._memory_size = 0
+        # file stem -> (size, expires), least recently used first
+        self._disk: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def _scan(self) -> None:
+        if not self.directory.is_dir():
+            return
+        files = []
+        for path in self.directory.glob("*.png"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, path.stem, st.st_size))
+        # Without access times, the soonest-expiring files are the first to go
+        for expires, name, size in sorted(files):
+            self._disk[name] = (size, expires)
+            self._disk_size += size
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            name = self._path(key).stem
+            meta = self._disk.get(name)
+            if meta is None:
+                return None
+            self._disk.move_to_end(name)
+        try:
+            body = self._path(key).read_bytes()
+        except OSError:
+            with self._lock:
+                self._forget_disk(name)
+            return None
+        entry = Entry(body, "image/png", meta[1])
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._remember(key, entry)
+        if len(entry.body) > self.disk_bytes:
+            return
+        path = self._path(key)
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.directory), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry.body)
+            os.utime(tmp, (entry.expires, entry.expires))
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Unable to write radar tile to disk", exc_info=True)
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        with self._lock:
+            self._forget_disk(path.stem)
+            self._disk[path.stem] = (len(entry.body), entry.expires)
+            self._disk_size += len(entry.body)
+            while self._disk_size > self.disk_bytes and self._disk:
+                name, (size, _) = self._disk.popitem(last=False)
+                self._disk_size -= size
+                try:
+                    (self.directory / (name + ".png")).unlink()
+                except OSError:
+                    pass
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old.body)
+        if len(entry.body) > self.memory_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_size += len(entry.body)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.body)
+
+    def _forget_disk(self, name: str) -> None:
+        meta = self._disk.pop(name, None)
+        if meta is not None:
+            self._disk_size -= meta[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+
+_CACHE: Optional[TileCache] = None
+_CACHE_LOCK = threading.Lock()
+# (expires, weather-maps.json)
+_MAPS: Optional[Tuple[float, Dict[str, Any]]] = None
+# url -> task fetching it; concurrent misses await the same task
+_INFLIGHT: Dict[str, asyncio.Task] = {}
+
+
+def cache() -> TileCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                settings = get_settings()
+                _CACHE = TileCache(
+                    Path(settings.radar_cache_dir),
+                    settings.radar_cache_memory_mb * 1024 * 1024,
+                    settings.radar_cache_disk_mb * 1024 * 1024,
+                )
+    return _CACHE
+
+
+def tile_url(path: str) -> Optional[str]:
+    """Upstream URL for a ``/radar/tiles/<path>``, or None if the path is not a known tile"""
+    settings = get_settings()
+    match = BASEMAP_TILE.match(path)
+    if match:
+        z, x, y = match.groups()
+        return f"{settings.radar_basemap_url.rstrip('/')}/{z}/{x}/{y}.png"
+    if RADAR_TILE.match(path):
+        return f"{settings.radar_tile_base_url.rstrip('/')}/{path}"
+    return None
+
+
+def tile_expiry(path: str, now: Optional[float] = None) -> float:
+    settings = get_settings()
+    now = time.time() if now is None else now
+    match = RADAR_TILE.match(path)
+    if match is None:
+        return now + settings.radar_basemap_ttl_seconds
+    frame = match.group(1)
+    if not frame.isdigit():  # nowcast frames are replaced on the next metadata refresh
+        return now + settings.radar_maps_ttl_seconds
+    return max(int(frame) + settings.radar_frame_ttl_seconds, now + MIN_TTL)
+
+
+async def _download(url: str, endpoint: str) -> bytes:
+    try:
+        async with httpx.AsyncClient(timeout=10, headers={"User-Agent": USER_AGENT}) as client:
+            with RADAR_REQUEST_SECONDS.time(endpoint=endpoint):
+                resp = await client.get(url)
+    except httpx.HTTPError as exc:
+        raise RadarUpstreamError(f"{url}: {exc}") from exc
+    if resp.status_code != 200:
+        raise RadarUpstreamError(f"{url}: HTTP {resp.status_code}")
+    return resp.content
+
+
+async def _coalesced(url: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    task = _INFLIGHT.get(url)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _INFLIGHT[url] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(url, None))
+    else:
+        metrics.CACHE_REQUESTS.inc(cache="radar", result="coalesced")
+    # shield: one display disconnecting must not cancel the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+
+async def get_tile(path: str) -> Entry:
+    """Tile at ``path`` (validated with ``tile_url``) from cache or upstream.
+
+    Raises RadarUpstreamError when the upstream fails and nothing is cached.
+    """
+    url = tile_url(path)
+    if url is None:
+        raise ValueError(f"not a radar or base-map tile: {path}")
+    tiles = cache()
+    entry = await asyncio.to_thread(tiles.get, url)
+    if entry is not None and entry.expires > time.time():
+        metrics.CACHE_REQUESTS.inc(cache="radar", result="hit")
+        return entry
+    metrics.CACHE_REQUESTS.inc(cache="radar", result="miss")
+
+    async def fetch() -> Entry:
+        body = await _download(url, "basemap" if path.startswith("osm/") else "tile")
+        fresh = Entry(body, "image/png", tile_expiry(path))
+        await asyncio.to_thread(tiles.put, url, fresh)
+        return fresh
+
+    try:
+        return await _coalesced(url, fetch)
+    except RadarUpstreamError:
+        if entry is None:
+            raise
+        logger.warning("Serving stale radar tile", extra={"path": path})
+        return entry
+
+
+async def get_maps() -> Dict[str, Any]:
+    """RainViewer ``weather-maps.json`` with ``host`` pointing at this proxy"""
+    settings = get_settings()
+    cached = _MAPS
+    if cached is not None and cached[0] > time.time():
+        metrics.CACHE_REQUESTS.inc(cache="radar_maps", result="hit")
+        return cached[1]
+    metrics.CACHE_REQUESTS.inc(cache="radar_maps", result="miss")
+    url = f"{settings.radar_api_base_url.rstrip('/')}/public/weather-maps.json"
+
+    async def fetch() -> Dict[str, Any]:
+        global _MAPS
+        body = await _download(url, "maps")
+        try:
+            data = json.loads(body)
+        except ValueError as exc:
+            raise RadarUpstreamError(f"{url}: invalid JSON") from exc
+        data["host"] = "/radar/tiles"
+        _MAPS = (time.time() + settings.radar_maps_ttl_seconds, data)
+        return data
+
+    try:
+        return await _coalesced(url, fetch)
+    except RadarUpstreamError:
+        if cached is None:
+            raise
+        logger.warning("Serving stale radar metadata")
+        return cached[1]
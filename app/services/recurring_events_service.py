@@ -5,9 +5,14 @@ from typing import List, Optional
 from zoneinfo import ZoneInfo
 
 from app.models import Event, RecurringEvent
+from app.services import metrics
 
 DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "recurring_events.json"
 
+RECURRING_EXPANSION_SECONDS = metrics.histogram(
+    "homebrain_recurring_expansion_seconds", "Time to expand recurring events into instances"
+)
+
 
 def _ensure_data_file():
     """Ensure the recurring events data file exists"""
@@ -144,11 +149,12 @@ def generate_instances(recurring_event: RecurringEvent, start_date: date, end_da
 
 def get_recurring_instances_for_range(start_date: date, end_date: date) -> List[Event]:
     """Get all instances of recurring events within a date range"""
-    recurring_events = load_recurring_events()
-    all_instances = []
-    
-    for recurring_event in recurring_events:
-        instances = generate_instances(recurring_event, start_date, end_date)
-        all_instances.extend(instances)
-    
-    return sorted(all_instances, key=lambda e: e.start)
+    with RECURRING_EXPANSION_SECONDS.time():
+        recurring_events = load_recurring_events()
+        all_instances = []
+        
+        for recurring_event in recurring_events:
+            instances = generate_instances(recurring_event, start_date, end_date)
+            all_instances.extend(instances)
+        
+        return sorted(all_instances, key=lambda e: e.start)
@@ -0,0 +1,262 @@
+"""Shared scheduler for periodic refresh jobs.
+
+Services register jobs with an interval, jitter, timeout, priority and an
+executor ("thread" or "process"). A single asyncio task wakes when the next job
+is due and hands the job to a thread pool or process pool, so blocking fetches
+and parsing never run on the event loop. A job never overlaps itself. If a run
+is still in flight when the job comes due again (or when a manual run is
+requested), that tick is skipped. A timed-out run is reported as "timeout".
+The job stays marked as running until the worker actually returns, because
+executor threads cannot be interrupted. Jobs due at the same moment are
+submitted in priority order (lower first).
+"""
+import asyncio
+import heapq
+import logging
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from app.config import get_settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("thread", "process")
+
+JOB_SECONDS = metrics.histogram(
+    "homebrain_job_duration_seconds", "Wall time of scheduled refresh jobs", ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+JOB_RUNS = metrics.counter(
+    "homebrain_job_runs_total", "Scheduled job runs by outcome", ("job", "status")
+)
+
+Interval = Union[float, Callable[[], float]]
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        interval: Interval,
+        args: Tuple = (),
+        jitter: float = 0.0,
+        timeout: Optional[float] = None,
+        priority: int = 0,
+        executor: str = "thread",
+        initial_delay: float = 0.0,
+    ):
+        if executor not in EXECUTORS:
+            raise ValueError(f"unknown executor {executor!r}")
+        self.name = name
+        self.func = func
+        self.args = args
+        self._interval = interval
+        self.jitter = max(0.0, jitter)
+        self.timeout = timeout
+        self.priority = priority
+        self.executor = executor
+        self.initial_delay = initial_delay
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_started: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.next_run: float = 0.0
+
+    @property
+    def interval(self) -> float:
+        value = self._interval() if callable(self._interval) else self._interval
+        return max(1.0, float(value))
+
+    def delay(self) -> float:
+        """Seconds until the next run: interval plus up to ``jitter`` seconds"""
+        return self.interval + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "executor": self.executor,
+            "priority": self.priority,
+            "interval_s": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_started": self.last_started.isoformat(timespec="seconds") if self.last_started else None,
+            "last_duration_s": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "next_run_in_s": round(max(0.0, self.next_run - time.monotonic()), 1) if self.next_run else None,
+        }
+
+
+_JOBS: Dict[str, Job] = {}
+_HEAP: List[Tuple[float, int, int, str]] = []
+_SEQ = 0
+_TASK: Optional[asyncio.Task] = None
+_WAKE: Optional[asyncio.Event] = None
+_THREADS: Optional[ThreadPoolExecutor] = None
+_PROCESSES: Optional[ProcessPoolExecutor] = None
+_INFLIGHT: set = set()
+
+
+def _push(job: Job, at: float) -> None:
+    global _SEQ
+    _SEQ += 1
+    job.next_run = at
+    heapq.heappush(_HEAP, (at, job.priority, _SEQ, job.name))
+    if _WAKE is not None:
+        _WAKE.set()
+
+
+def register(name: str, func: Callable[..., Any], interval: Interval, **options: Any) -> Job:
+    """Add (or replace) a job; it first runs ``initial_delay`` seconds after the scheduler starts"""
+    job = Job(name, func, interval, **options)
+    _JOBS[name] = job
+    if _TASK is not None:
+        _push(job, time.monotonic() + job.initial_delay)
+    return job
+
+
+def unregister(name: str) -> None:
+    # Stale heap entries are discarded when they surface
+    _JOBS.pop(name, None)
+
+
+def jobs() -> List[Job]:
+    return sorted(_JOBS.values(), key=lambda j: (j.priority, j.name))
+
+
+def _executor(kind: str) -> Executor:
+    global _THREADS, _PROCESSES
+    if kind == "process":
+        if _PROCESSES is None:
+            _PROCESSES = ProcessPoolExecutor(max_workers=max(1, get_settings().scheduler_process_workers))
+        return _PROCESSES
+    if _THREADS is None:
+        _THREADS = ThreadPoolExecutor(
+            max_workers=max(1, get_settings().scheduler_thread_workers), thread_name_prefix="homebrain-job"
+        )
+    return _THREADS
+
+
+async def _run(job: Job) -> None:
+    loop = asyncio.get_running_loop()
+    job.running = True
+    job.last_started = datetime.now()
+    started = time.perf_counter()
+    future = loop.run_in_executor(_executor(job.executor), job.func, *job.args)
+
+    def _finished(_fut) -> None:
+        job.running = False
+
+    future.add_done_callback(_finished)
+    try:
+        await asyncio.wait_for(asyncio.shield(future), timeout=job.timeout)
+        status, error = "ok", None
+    except asyncio.TimeoutError:
+        status, error = "timeout", f"exceeded {job.timeout:g}s"
+        logger.warning("Scheduled job timed out", extra={"job": job.name, "timeout_s": job.timeout})
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        status, error = "error", f"{type(exc).__name__}: {exc}"
+        logger.exception("Scheduled job failed", extra={"job": job.name})
+    job.last_duration = time.perf_counter() - started
+    job.last_status, job.last_error = status, error
+    job.runs += 1
+    if status != "ok":
+        job.failures += 1
+    JOB_SECONDS.observe(job.last_duration, job=job.name)
+    JOB_RUNS.inc(job=job.name, status=status)
+
+
+def _dispatch(job: Job) -> bool:
+    if job.running:
+        job.skipped += 1
+        JOB_RUNS.inc(job=job.name, status="skipped")
+        return False
+    task = asyncio.get_running_loop().create_task(_run(job))
+    _INFLIGHT.add(task)
+    task.add_done_callback(_INFLIGHT.discard)
+    return True
+
+
+async def _loop() -> None:
+    assert _WAKE is not None
+    while True:
+        now = time.monotonic()
+        due: List[Job] = []
+        while _HEAP and _HEAP[0][0] <= now:
+            at, _, _, name = heapq.heappop(_HEAP)
+            job = _JOBS.get(name)
+            if job is None or job.next_run != at:
+                continue
+            due.append(job)
+        for job in sorted(due, key=lambda j: j.priority):
+            _dispatch(job)
+            _push(job, now + job.delay())
+        _WAKE.clear()
+        timeout = max(0.0, _HEAP[0][0] - time.monotonic()) if _HEAP else None
+        try:
+            await asyncio.wait_for(_WAKE.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+def run_now(name: str) -> bool:
+    """Start ``name`` immediately; False if it is already running. KeyError if unknown."""
+    job = _JOBS[name]
+    if _TASK is None:
+        raise RuntimeError("scheduler is not running")
+    return _dispatch(job)
+
+
+def start() -> None:
+    """Start the scheduler loop on the running event loop (idempotent)."""
+    global _TASK, _WAKE
+    if _TASK is not None:
+        return
+    _WAKE = asyncio.Event()
+    now = time.monotonic()
+    _HEAP.clear()
+    for job in _JOBS.values():
+        _push(job, now + job.initial_delay)
+    _TASK = asyncio.get_running_loop().create_task(_loop())
+    logger.info("Started scheduler", extra={"jobs": ",".join(sorted(_JOBS))})
+
+
+async def stop() -> None:
+    global _TASK, _WAKE, _THREADS, _PROCESSES
+    if _TASK is not None:
+        _TASK.cancel()
+        try:
+            await _TASK
+        except asyncio.CancelledError:
+            pass
+    for task in list(_INFLIGHT):
+        task.cancel()
+    _TASK = _WAKE = None
+    _HEAP.clear()
+    for pool in (_THREADS, _PROCESSES):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _THREADS = _PROCESSES = None
+
+
+def _collect_metrics():
+    for job in _JOBS.values():
+        yield ("homebrain_job_running", {"job": job.name}, 1 if job.running else 0)
+        if job.last_duration is not None:
+            yield ("homebrain_job_last_duration_seconds", {"job": job.name}, job.last_duration)
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,191 @@
+"""Optional SQLite (WAL) cache shared by uvicorn workers on one host.
+
+With ``SHARED_CACHE_PATH`` set, every worker opens the same database:
+
+* ``events``: the merged calendar, one row per event, with ``start_ts``
+  indexed so range queries only touch the rows in the window.
+* ``snapshots``: named, versioned blobs (calendar metadata, weather per city).
+* ``leases``: leader election. The worker holding ``leases[name]`` refreshes
+  that data from upstream; the others only read what it publishes. A lease
+  that is not renewed before it expires can be taken over by another worker.
+
+WAL mode lets readers proceed while the leader writes. Connections are
+per-thread because sqlite3 connections must not be shared across threads.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT PRIMARY KEY,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_start ON events (start_ts);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_LOCAL = threading.local()
+_INIT_LOCK = threading.Lock()
+_INITIALIZED: set = set()
+# name -> monotonic time until which a lost lease is not retried
+_LEASE_BACKOFF: dict = {}
+
+
+def enabled() -> bool:
+    return bool(get_settings().shared_cache_path)
+
+
+def _connect() -> sqlite3.Connection:
+    path = get_settings().shared_cache_path
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is not None and getattr(_LOCAL, "path", None) == path:
+        return conn
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _INIT_LOCK:
+        if path not in _INITIALIZED:
+            conn.executescript(_SCHEMA)
+            _INITIALIZED.add(path)
+    _LOCAL.conn, _LOCAL.path = conn, path
+    return conn
+
+
+class _Write:
+    """``BEGIN IMMEDIATE`` … ``COMMIT`` (rollback on error)."""
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn = _connect()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, *exc) -> bool:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# -- leases ----------------------------------------------------------------
+def acquire_lease(name: str, ttl: float, owner: str = OWNER) -> bool:
+    """Take or renew the lease ``name`` for ``ttl`` seconds; False if another worker holds it.
+
+    After losing, the database is not asked again for a few seconds
+    (SHARED_CACHE_POLL_SECONDS), so followers can call this on every request.
+    """
+    backoff_key = (name, owner)
+    if _LEASE_BACKOFF.get(backoff_key, 0.0) > time.monotonic():
+        return False
+    now = time.time()
+    try:
+        with _Write() as conn:
+            conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (name, owner, now + ttl, now),
+            )
+            row = conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+    except sqlite3.Error:
+        logger.exception("Shared cache lease failed", extra={"lease": name})
+        return False
+    won = bool(row and row[0] == owner)
+    if not won:
+        _LEASE_BACKOFF[backoff_key] = time.monotonic() + get_settings().shared_cache_poll_seconds
+    return won
+
+
+def release_lease(name: str, owner: str = OWNER) -> None:
+    with _Write() as conn:
+        conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+# -- snapshots -------------------------------------------------------------
+def put_snapshot(name: str, data: Any, conn: Optional[sqlite3.Connection] = None) -> int:
+    """Store ``data`` (JSON-serializable) under ``name`` and return its new version."""
+    payload = json.dumps(data)
+
+    def write(c: sqlite3.Connection) -> int:
+        c.execute(
+            "INSERT INTO snapshots (name, version, updated_at, data) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET version = snapshots.version + 1, "
+            "updated_at = excluded.updated_at, data = excluded.data",
+            (name, time.time(), payload),
+        )
+        return c.execute("SELECT version FROM snapshots WHERE name = ?", (name,)).fetchone()[0]
+
+    if conn is not None:
+        return write(conn)
+    with _Write() as c:
+        return write(c)
+
+
+def touch_snapshot(name: str) -> None:
+    """Mark ``name`` as fresh without changing its data or version."""
+    with _Write() as conn:
+        conn.execute("UPDATE snapshots SET updated_at = ? WHERE name = ?", (time.time(), name))
+
+
+def snapshot_meta(name: str) -> Optional[Tuple[int, float]]:
+    """(version, updated_at) of ``name`` without reading its data."""
+    row = _connect().execute("SELECT version, updated_at FROM snapshots WHERE name = ?", (name,)).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def get_snapshot(name: str) -> Optional[Tuple[int, float, Any]]:
+    """(version, updated_at, data) of ``name``, or None."""
+    row = _connect().execute(
+        "SELECT version, updated_at, data FROM snapshots WHERE name = ?", (name,)
+    ).fetchone()
+    if row is None:
+        return None
+    return row[0], row[1], json.loads(row[2]) if row[2] is not None else None
+
+
+# -- events ----------------------------------------------------------------
+def replace_events(rows: Iterable[Tuple[str, float, float, str]], snapshot: str = "calendar") -> int:
+    """Atomically replace the events table with ``(key, start_ts, end_ts, data)`` rows.
+
+    The longest event span is recorded in the ``snapshot`` row so range queries
+    can bound their scan on ``start_ts`` from both sides. Returns the new version.
+    """
+    rows = list(rows)
+    max_span = max((end - start for _, start, end, _ in rows), default=0.0)
+    with _Write() as conn:
+        conn.execute("DELETE FROM events")
+        conn.executemany("INSERT OR REPLACE INTO events (key, start_ts, end_ts, data) VALUES (?, ?, ?, ?)", rows)
+        return put_snapshot(snapshot, {"count": len(rows), "max_span": max_span}, conn=conn)
+
+
+def events_overlapping(start_ts: float, end_ts: float, snapshot: str = "calendar") -> List[str]:
+    """``data`` of events overlapping ``[start_ts, end_ts)`` ordered by start (uses the start index)."""
+    snap = get_snapshot(snapshot)
+    max_span = float((snap[2] or {}).get("max_span", 0.0)) if snap else 0.0
+    rows = _connect().execute(
+        "SELECT data FROM events WHERE start_ts >= ? AND start_ts < ? AND end_ts > ? ORDER BY start_ts",
+        (start_ts - max_span, end_ts, start_ts),
+    ).fetchall()
+    return [r[0] for r in rows]
@@ -1,14 +1,40 @@
 import json
+import logging
+import threading
+from bisect import bisect_left, bisect_right
 from datetime import date, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional
 
 from app.models import Task
+from app.services import metrics, timing
 
+logger = logging.getLogger(__name__)
 
 DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "sample_tasks.json"
 
 
+class TaskSnapshot(NamedTuple):
+    """Tasks sorted by due date, with the parallel list of due dates used for bisecting"""
+
+    tasks: List[Task]
+    due: List[date]
+
+    def between(self, start: date, end: date) -> List[Task]:
+        """Tasks due in ``[start, end]`` (inclusive)"""
+        return self.tasks[bisect_left(self.due, start):bisect_right(self.due, end)]
+
+    def before(self, day: date) -> List[Task]:
+        return self.tasks[:bisect_left(self.due, day)]
+
+
+_EMPTY = TaskSnapshot([], [])
+_SNAPSHOT: TaskSnapshot = _EMPTY
+# (path, mtime_ns, size) of the file _SNAPSHOT was built from
+_STAMP: Optional[tuple] = None
+_LOCK = threading.Lock()
+
+
 def _parse_task(raw: dict) -> Task:
     return Task(
         title=raw["title"],
@@ -18,25 +44,68 @@ def _parse_task(raw: dict) -> Task:
     )
 
 
+def snapshot() -> TaskSnapshot:
+    """The current tasks, re-read and re-sorted only when DATA_FILE changes on disk"""
+    global _SNAPSHOT, _STAMP
+    try:
+        st = DATA_FILE.stat()
+    except OSError:
+        _SNAPSHOT, _STAMP = _EMPTY, None
+        return _EMPTY
+    stamp = (str(DATA_FILE), st.st_mtime_ns, st.st_size)
+    if stamp == _STAMP:
+        metrics.CACHE_REQUESTS.inc(cache="tasks", result="hit")
+        return _SNAPSHOT
+    with _LOCK:
+        if stamp != _STAMP:
+            metrics.CACHE_REQUESTS.inc(cache="tasks", result="miss")
+            with open(DATA_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            tasks = sorted((_parse_task(item) for item in data), key=lambda t: t.due_date)
+            # Published as one tuple so readers never mix old tasks with new dates
+            _SNAPSHOT = TaskSnapshot(tasks, [t.due_date for t in tasks])
+            _STAMP = stamp
+            logger.debug("Loaded tasks", extra={"count": len(tasks)})
+    return _SNAPSHOT
+
+
 def load_tasks() -> List[Task]:
-    if not DATA_FILE.exists():
-        return []
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return [_parse_task(item) for item in data]
+    return list(snapshot().tasks)
+
+
+def filter_importance(tasks: Iterable[Task], importance: Optional[Iterable[str]]) -> List[Task]:
+    if not importance:
+        return list(tasks)
+    wanted = {i.lower() for i in importance}
+    return [t for t in tasks if (t.importance or "").lower() in wanted]
+
+
+@timing.timed("tasks")
+def tasks_between(start: date, end: date, importance: Optional[Iterable[str]] = None) -> List[Task]:
+    return filter_importance(snapshot().between(start, end), importance)
 
 
 def tasks_due_today(today: Optional[date] = None) -> List[Task]:
     d = today or date.today()
-    return [t for t in load_tasks() if t.due_date == d]
+    return snapshot().between(d, d)
 
 
 def tasks_overdue(today: Optional[date] = None) -> List[Task]:
     d = today or date.today()
-    return [t for t in load_tasks() if t.due_date < d]
+    return snapshot().before(d)
 
 
 def tasks_this_week(today: Optional[date] = None) -> List[Task]:
     d = today or date.today()
-    end = d + timedelta(days=7)
-    return [t for t in load_tasks() if d <= t.due_date <= end]
+    return snapshot().between(d, d + timedelta(days=7))
+
+
+@timing.timed("tasks")
+def dashboard_tasks(today: date) -> Dict[str, List[Task]]:
+    """Overdue, due-today and this-week tasks, all from one snapshot"""
+    snap = snapshot()
+    return {
+        "overdue_tasks": snap.before(today),
+        "today_tasks": snap.between(today, today),
+        "week_tasks": snap.between(today + timedelta(days=1), today + timedelta(days=7)),
+    }
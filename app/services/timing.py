@@ -0,0 +1,107 @@
+"""Request-scoped stage timing for the ``Server-Timing`` response header.
+
+The middleware in ``app.main`` opens a timing record for each request. Service
+code wraps its work in ``stage("name")`` or decorates functions with
+``timed("name")``, and durations are summed per stage. Outside a request, or
+when the header is disabled, ``stage()`` returns a shared no-op context
+manager and records nothing. Stages of one request may run in several worker
+threads at once (the dashboard gathers its sources concurrently), so updates
+to a record are made under its lock.
+"""
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Callable, Dict, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+_NOOP = nullcontext()
+
+
+class Timings:
+    """Accumulated stage durations (seconds) for one request."""
+
+    __slots__ = ("durations", "_active", "_lock", "started")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self._active: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def header_value(self) -> str:
+        with self._lock:
+            durations = list(self.durations.items())
+        parts = [f"{name};dur={secs * 1000:.1f}" for name, secs in durations]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_CURRENT: ContextVar[Optional[Timings]] = ContextVar("server_timing", default=None)
+
+
+class _Stage:
+    __slots__ = ("_rec", "_name", "_start", "_outer")
+
+    def __init__(self, rec: Timings, name: str):
+        self._rec = rec
+        self._name = name
+
+    def __enter__(self):
+        rec = self._rec
+        with rec._lock:
+            # Nested stages of the same name (e.g. menu helpers calling each other) count once
+            count = rec._active.get(self._name, 0)
+            self._outer = count == 0
+            rec._active[self._name] = count + 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        rec = self._rec
+        with rec._lock:
+            rec._active[self._name] -= 1
+            if self._outer:
+                rec.durations[self._name] = rec.durations.get(self._name, 0.0) + elapsed
+        return False
+
+
+def begin() -> Token:
+    return _CURRENT.set(Timings())
+
+
+def end(token: Token) -> Optional[Timings]:
+    rec = _CURRENT.get()
+    _CURRENT.reset(token)
+    return rec
+
+
+def current() -> Optional[Timings]:
+    return _CURRENT.get()
+
+
+def stage(name: str):
+    rec = _CURRENT.get()
+    if rec is None:
+        return _NOOP
+    return _Stage(rec, name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator recording every call of the wrapped function under ``name``."""
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            rec = _CURRENT.get()
+            if rec is None:
+                return fn(*args, **kwargs)
+            with _Stage(rec, name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -1,15 +1,20 @@
+import asyncio
 import httpx
 import logging
-import asyncio
+import sqlite3
 from datetime import datetime, timedelta
 from app.models import WeatherInfo
 from app.config import get_settings
+from app.services import metrics, scheduler, shared_cache, timing
 
 logger = logging.getLogger(__name__)
 
+WEATHER_REQUEST_SECONDS = metrics.histogram(
+    "homebrain_weather_request_seconds", "OpenWeather request latency", ("endpoint",)
+)
+
 _CACHE: dict[str, dict] = {}
 _FAILED: set[str] = set()
-_REFRESH_TASK: asyncio.Task | None = None
 
 
 def _get_cache_ttl() -> timedelta:
@@ -25,11 +30,15 @@ def _get_cache_ttl() -> timedelta:
     return timedelta(minutes=minutes)
 
 
+def _api_base() -> str:
+    return (get_settings().weather_api_base_url or "https://api.openweathermap.org").rstrip("/")
+
+
 def _fetch_openweather(city: str, api_key: str) -> WeatherInfo | None:
-    url = "https://api.openweathermap.org/data/2.5/weather"
+    url = f"{_api_base()}/data/2.5/weather"
     params = {"q": city, "appid": api_key, "units": "imperial"}
     try:
-        with httpx.Client(timeout=5) as client:
+        with httpx.Client(timeout=5) as client, WEATHER_REQUEST_SECONDS.time(endpoint="current"):
             resp = client.get(url, params=params)
             if resp.status_code != 200:
                 # log non-200 responses for debugging (include body when available)
@@ -97,25 +106,34 @@ def get_weather_stub(city: str) -> WeatherInfo:
     )
 
 
-def get_weather(city: str | None = None) -> WeatherInfo:
+@timing.timed("weather")
+def get_weather(city: str | None = None, force: bool = False) -> WeatherInfo:
+    """Weather for ``city``; ``force`` ignores the TTL. The cached entry stays in place until replaced."""
     settings = get_settings()
     c = city or settings.location_city or "Your City"
     api_key = settings.weather_api_key
 
     # Return cached successful value quickly if not expired
-    if c in _CACHE:
+    if c in _CACHE and not force:
         entry = _CACHE[c]
         # Backwards-compat: some entries may be the raw WeatherInfo (older runs)
         if isinstance(entry, WeatherInfo):
+            metrics.CACHE_REQUESTS.inc(cache="weather", result="hit")
             return entry
         value = entry.get("value")
         fetched_at = entry.get("fetched_at")
         if fetched_at and (datetime.now() - fetched_at) < _get_cache_ttl():
+            metrics.CACHE_REQUESTS.inc(cache="weather", result="hit")
             return value
         # otherwise fall through and refresh
+    metrics.CACHE_REQUESTS.inc(cache="weather", result="miss")
 
     # Avoid hammering API if it failed previously in this run
     if c in _FAILED or not api_key:
+        previous = _CACHE.get(c)
+        if isinstance(previous, dict) and previous.get("value") is not None:
+            # Keep serving the last reading (live or stub) until a refresh replaces it
+            return previous["value"]
         if not api_key:
             logger.info("No WEATHER_API_KEY set; using stub weather for %s", c)
         else:
@@ -124,10 +142,25 @@ def get_weather(city: str | None = None) -> WeatherInfo:
         _CACHE.setdefault(c, {"value": info, "fetched_at": datetime.now()})  # Cache stub for consistency
         return info
 
+    if shared_cache.enabled():
+        shared = _shared_weather(c)
+        if shared and (datetime.now() - shared[1]) < _get_cache_ttl():
+            _CACHE[c] = {"value": shared[0], "fetched_at": shared[1]}
+            return shared[0]
+        lease_ttl = _get_cache_ttl().total_seconds() * 1.5
+        if not shared_cache.acquire_lease(f"weather:{c}", lease_ttl):
+            # Another worker is fetching; serve its last value and re-check on the next request
+            return shared[0] if shared else get_weather_stub(c)
+
     live = _fetch_openweather(c, api_key)
     if live is None:
-        logger.warning("Current weather fetch failed for %s; falling back to stub", c)
         _FAILED.add(c)
+        previous = _CACHE.get(c)
+        if isinstance(previous, dict) and previous.get("value") is not None:
+            # Keep serving the last reading rather than replacing it with the stub
+            logger.warning("Current weather fetch failed for %s; keeping last value", c)
+            return previous["value"]
+        logger.warning("Current weather fetch failed for %s; falling back to stub", c)
         stub = get_weather_stub(c)
         _CACHE[c] = {"value": stub, "fetched_at": datetime.now()}
         return stub
@@ -138,7 +171,7 @@ def get_weather(city: str | None = None) -> WeatherInfo:
     lon = settings.weather_lon
     if lat is not None and lon is not None:
         try:
-            url = "https://api.openweathermap.org/data/3.0/onecall"
+            url = f"{_api_base()}/data/3.0/onecall"
             params = {
                 "lat": lat,
                 "lon": lon,
@@ -147,7 +180,8 @@ def get_weather(city: str | None = None) -> WeatherInfo:
                 "appid": api_key,
             }
             with httpx.Client(timeout=5) as client:
-                resp = client.get(url, params=params)
+                with WEATHER_REQUEST_SECONDS.time(endpoint="onecall"):
+                    resp = client.get(url, params=params)
                 if resp.status_code == 200:
                     odata = resp.json()
                     hourly = []
@@ -185,93 +219,89 @@ def get_weather(city: str | None = None) -> WeatherInfo:
             live.hourly = None
 
     _CACHE[c] = {"value": live, "fetched_at": datetime.now()}
+    if shared_cache.enabled():
+        try:
+            shared_cache.put_snapshot(f"weather:{c}", live.model_dump())
+        except sqlite3.Error:
+            logger.exception("Unable to publish weather for %s to shared cache", c)
     return live
 
 
-async def _background_refresh():
-    """Background task to proactively refresh cached weather entries.
+def _shared_weather(city: str) -> tuple[WeatherInfo, datetime] | None:
+    """Weather for ``city`` published by any worker, with its fetch time."""
+    try:
+        snap = shared_cache.get_snapshot(f"weather:{city}")
+    except sqlite3.Error:
+        logger.exception("Unable to read weather for %s from shared cache", city)
+        return None
+    if not snap or not snap[2]:
+        return None
+    return WeatherInfo(**snap[2]), datetime.fromtimestamp(snap[1])
 
-    This wakes every _CACHE_TTL and forces a refresh of cached cities plus the
-    configured default location. Refresh is performed lazily by removing the
-    cache entry and calling get_weather() which will re-populate it.
-    """
-    while True:
-        try:
-            # snapshot keys to avoid mutation during iteration
-            cities = list(_CACHE.keys())
-            settings = get_settings()
-            default_city = settings.location_city
-            if default_city and default_city not in cities:
-                cities.append(default_city)
-
-            for c in cities:
-                try:
-                    # Clear previous failure marks so we attempt a real fetch
-                    _FAILED.discard(c)
-                    _CACHE.pop(c, None)
-                    # synchronous call will repopulate cache
-                    get_weather(c)
-                except Exception:
-                    logger.exception("Background weather refresh failed for %s", c)
-        except Exception:
-            logger.exception("Unexpected error in weather background refresher")
 
-        # Sleep until next refresh interval
-        await asyncio.sleep(max(60, int(_get_cache_ttl().total_seconds())))
+async def get_weather_async(city: str | None = None) -> WeatherInfo:
+    """get_weather() run in a worker thread so slow upstream calls never block the loop."""
+    return await asyncio.to_thread(get_weather, city)
 
 
-def start_background_refresh():
-    """Start the background refresh task (idempotent)."""
-    global _REFRESH_TASK
-    if _REFRESH_TASK is None:
-        try:
-            _REFRESH_TASK = asyncio.create_task(_background_refresh())
-            # Log configured interval
-            try:
-                minutes = int(get_settings().weather_refresh_minutes or 60)
-            except Exception:
-                minutes = 60
-            logger.info("Started weather background refresher (interval: %d minutes)", minutes)
-        except Exception:
-            # In some contexts (no running event loop), creating a task will fail.
-            logger.exception("Unable to start weather background refresh task")
+def cached_weather(city: str | None = None) -> WeatherInfo:
+    """Last fetched weather for ``city`` regardless of age (stub if never fetched), without any I/O."""
+    c = city or get_settings().location_city or "Your City"
+    entry = _CACHE.get(c)
+    if isinstance(entry, WeatherInfo):
+        return entry
+    if entry and entry.get("value") is not None:
+        return entry["value"]
+    return get_weather_stub(c)
 
 
-def stop_background_refresh():
-    """Cancel the background refresh task synchronously (best-effort).
+def _collect_metrics():
+    now = datetime.now()
+    for city, entry in list(_CACHE.items()):
+        if isinstance(entry, dict) and entry.get("fetched_at"):
+            age = (now - entry["fetched_at"]).total_seconds()
+            yield ("homebrain_data_age_seconds", {"source": f"weather:{city}"}, age)
+    yield ("homebrain_weather_failed_cities", {}, len(_FAILED))
 
-    This is a best-effort synchronous cancel. In async contexts prefer
-    `stop_background_refresh_async()` which awaits task completion.
-    """
-    global _REFRESH_TASK
-    if _REFRESH_TASK is None:
-        return
-    try:
-        logger.info("Cancelling weather background refresher")
-        _REFRESH_TASK.cancel()
-    except Exception:
-        logger.exception("Exception while cancelling weather background refresher")
-    finally:
-        _REFRESH_TASK = None
+
+metrics.register_collector(_collect_metrics)
 
 
-async def stop_background_refresh_async():
-    """Asynchronously cancel and await the background refresh task.
+def refresh_all() -> None:
+    """Refresh cached cities plus the configured default location.
 
-    Use this from shutdown handlers to ensure the task is cleaned up.
+    Runs as the scheduler's "weather" job (in a worker thread). Each city is
+    re-fetched with ``get_weather(force=True)``; the old entry keeps serving
+    ``cached_weather()`` and concurrent requests until the new value lands.
     """
-    global _REFRESH_TASK
-    if _REFRESH_TASK is None:
-        return
-    try:
-        logger.info("Stopping weather background refresher (async)")
-        _REFRESH_TASK.cancel()
+    # snapshot keys to avoid mutation during iteration
+    cities = list(_CACHE.keys())
+    default_city = get_settings().location_city
+    if default_city and default_city not in cities:
+        cities.append(default_city)
+
+    for c in cities:
         try:
-            await _REFRESH_TASK
-        except asyncio.CancelledError:
-            pass
-    except Exception:
-        logger.exception("Exception while stopping weather background refresher")
-    finally:
-        _REFRESH_TASK = None
+            # Clear previous failure marks so we attempt a real fetch
+            _FAILED.discard(c)
+            get_weather(c, force=True)
+        except Exception:
+            logger.exception("Background weather refresh failed for %s", c)
+
+
+def start_background_refresh():
+    """Register the periodic weather refresh with the shared scheduler (idempotent)."""
+    scheduler.register(
+        "weather",
+        refresh_all,
+        interval=lambda: max(60, int(_get_cache_ttl().total_seconds())),
+        jitter=30,
+        timeout=60,
+        priority=1,
+    )
+    logger.info("Scheduled weather refresh (interval: %d minutes)", int(_get_cache_ttl().total_seconds() // 60))
 
+
+def stop_background_refresh():
+    """Remove the weather job from the scheduler."""
+    scheduler.unregister("weather")
@@ -8,7 +8,7 @@ document.addEventListener('DOMContentLoaded', () => {
   initGeolocation();
 });
 
-// Initialize the weather radar map using Leaflet and RainViewer
+// Initialize the weather radar map using Leaflet and RainViewer (via the app's cached /radar proxy)
 function initRadarMap() {
   const radarEl = document.getElementById('radar-map');
   if (!radarEl) return;
@@ -18,8 +18,8 @@ function initRadarMap() {
 
   radarMap = L.map('radar-map').setView([lat, lon], 7);
 
-  // Base tile layer (OpenStreetMap)
-  L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+  // Base tile layer (OpenStreetMap, proxied)
+  L.tileLayer('/radar/tiles/osm/{z}/{x}/{y}.png', {
     attribution: '&copy; OpenStreetMap contributors'
   }).addTo(radarMap);
 
@@ -32,19 +32,23 @@ function initRadarMap() {
   fetchRadarLayer(radarMap);
 }
 
-// Fetch radar data from RainViewer API
+// Radar tile URL for a RainViewer frame, served by the app's tile cache
+function radarTileUrl(frame) {
+  return `/radar/tiles${frame.path}/256/{z}/{x}/{y}/2/1_1.png`;
+}
+
+// Fetch radar frames (RainViewer metadata, cached server-side)
 async function fetchRadarLayer(map) {
   try {
-    const response = await fetch('https://api.rainviewer.com/public/weather-maps.json');
+    const response = await fetch('/radar/maps.json');
     const data = await response.json();
     
     if (data.radar && data.radar.past && data.radar.past.length > 0) {
       // Get the most recent radar frame
       const latestFrame = data.radar.past[data.radar.past.length - 1];
-      const radarPath = latestFrame.path;
-      
+
       // Add radar tile layer
-      const radarLayer = L.tileLayer(`https://tilecache.rainviewer.com${radarPath}/256/{z}/{x}/{y}/2/1_1.png`, {
+      const radarLayer = L.tileLayer(radarTileUrl(latestFrame), {
         opacity: 0.6,
         attribution: '&copy; RainViewer'
       });
@@ -64,11 +68,11 @@ async function fetchRadarLayer(map) {
           return;
         }
         try {
-          const newResponse = await fetch('https://api.rainviewer.com/public/weather-maps.json');
+          const newResponse = await fetch('/radar/maps.json');
           const newData = await newResponse.json();
           if (newData.radar && newData.radar.past && newData.radar.past.length > 0) {
             const newLatestFrame = newData.radar.past[newData.radar.past.length - 1];
-            radarLayer.setUrl(`https://tilecache.rainviewer.com${newLatestFrame.path}/256/{z}/{x}/{y}/2/1_1.png`);
+            radarLayer.setUrl(radarTileUrl(newLatestFrame));
           }
         } catch (e) {
           console.error('Error updating radar:', e);
@@ -0,0 +1,215 @@
+"""Offline load test for the dashboard and JSON API.
+
+Starts stand-in ICS and OpenWeather servers, points the app at them through
+the regular settings (``CALENDAR_ICAL_SOURCES``, ``WEATHER_API_BASE_URL``),
+runs the app under uvicorn on a local port and drives concurrent "display"
+clients (``GET /``) and "phone" clients (``GET /api/*``). It reports
+throughput, latency percentiles per endpoint and upstream call counts::
+
+    python -m benchmarks.loadtest --duration 20 --displays 4 --phones 8
+    python -m benchmarks.loadtest --ramp 1 2 4 8 16 32     # find max RPS
+    python -m benchmarks.loadtest --upstream-latency 0.5 --upstream-errors 0.1 -o load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import synthetic  # noqa: E402
+from benchmarks.standins import StandInServer, ics_routes, openweather_routes  # noqa: E402
+
+PHONE_PATHS = ["/api/events/today", "/api/weather", "/api/tasks/today", "/api/events", "/api/freebusy"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, max(0, int(round(pct / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[idx]
+
+
+def _summarize(samples: List[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": _percentile(samples, 50) * 1e3,
+        "p90_ms": _percentile(samples, 90) * 1e3,
+        "p99_ms": _percentile(samples, 99) * 1e3,
+        "max_ms": (samples[-1] if samples else 0.0) * 1e3,
+        "mean_ms": (statistics.fmean(samples) if samples else 0.0) * 1e3,
+    }
+
+
+def start_upstreams(args) -> StandInServer:
+    now = datetime.now(ZoneInfo("America/Chicago"))
+    feeds = {
+        f"feed{i}": synthetic.make_ics(args.feed_size, now, seed=i + 1) for i in range(args.feeds)
+    }
+    upstream = StandInServer(latency=args.upstream_latency, error_rate=args.upstream_errors)
+    ics_routes(upstream, feeds)
+    openweather_routes(upstream)
+    return upstream.start()
+
+
+def configure_app_env(upstream: StandInServer, args) -> None:
+    sources = {f"feed{i}": f"{upstream.base_url}/ics/feed{i}.ics" for i in range(args.feeds)}
+    os.environ.update(
+        {
+            "CALENDAR_SOURCE": "google_ics",
+            "CALENDAR_ICAL_SOURCES": json.dumps(sources),
+            "GOOGLE_CALENDAR_ICAL_URL": "",
+            "WEATHER_API_KEY": "loadtest",
+            "WEATHER_API_BASE_URL": upstream.base_url,
+            "CALENDAR_CACHE_DIR": tempfile.mkdtemp(prefix="homebrain-load-"),
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+
+
+def start_app(port: int):
+    import uvicorn
+
+    config = uvicorn.Config("app.main:app", host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+    return server, thread
+
+
+async def _client(client, paths: List[str], stop_at: float, latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    i = 0
+    while time.perf_counter() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            resp = await client.get(path)
+            ok = resp.status_code == 200
+        except Exception:
+            ok = False
+        latencies[path].append(time.perf_counter() - t0)
+        if not ok:
+            errors[path] += 1
+
+
+async def drive(base_url: str, displays: int, phones: int, duration: float) -> dict:
+    import httpx
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=displays + phones + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        # Warm caches (first request triggers the initial calendar fetch)
+        await client.get("/")
+        stop_at = time.perf_counter() + duration
+        started = time.perf_counter()
+        tasks = [_client(client, ["/"], stop_at, latencies, errors) for _ in range(displays)]
+        tasks += [
+            _client(client, PHONE_PATHS[i % len(PHONE_PATHS):] + PHONE_PATHS[: i % len(PHONE_PATHS)],
+                    stop_at, latencies, errors)
+            for i in range(phones)
+        ]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "displays": displays,
+        "phones": phones,
+        "duration_s": elapsed,
+        "requests": total,
+        "rps": total / elapsed if elapsed else 0.0,
+        "errors": sum(errors.values()),
+        "all": _summarize([x for v in latencies.values() for x in v]),
+        "endpoints": {path: {**_summarize(v), "errors": errors.get(path, 0)} for path, v in sorted(latencies.items())},
+    }
+
+
+def _print_run(run: dict) -> None:
+    a = run["all"]
+    print(
+        f"displays={run['displays']:<3} phones={run['phones']:<3} rps={run['rps']:8.1f} "
+        f"p50={a['p50_ms']:7.1f}ms p99={a['p99_ms']:8.1f}ms errors={run['errors']}",
+        file=sys.stderr,
+    )
+    for path, s in run["endpoints"].items():
+        print(f"    {path:22} n={s['count']:<6} p50={s['p50_ms']:7.1f}ms p99={s['p99_ms']:8.1f}ms", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--displays", type=int, default=2, help="concurrent GET / clients")
+    parser.add_argument("--phones", type=int, default=4, help="concurrent /api/* clients")
+    parser.add_argument("--ramp", type=int, nargs="*", help="total client counts to step through (split 1:2)")
+    parser.add_argument("--feeds", type=int, default=2, help="number of ICS feeds")
+    parser.add_argument("--feed-size", type=int, default=200, help="events per ICS feed")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="seconds added to every upstream call")
+    parser.add_argument("--upstream-errors", type=float, default=0.0, help="fraction of upstream calls failing with 500")
+    parser.add_argument("-o", "--output", help="write JSON report here")
+    args = parser.parse_args(argv)
+
+    upstream = start_upstreams(args)
+    configure_app_env(upstream, args)
+    port = _free_port()
+    server, thread = start_app(port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        steps = [(args.displays, args.phones)]
+        if args.ramp:
+            steps = [(max(1, n // 3), max(0, n - max(1, n // 3))) for n in args.ramp]
+        runs = []
+        for displays, phones in steps:
+            run = asyncio.run(drive(base_url, displays, phones, args.duration))
+            _print_run(run)
+            runs.append(run)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        upstream.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "feeds": args.feeds,
+            "feed_size": args.feed_size,
+            "upstream_latency_s": args.upstream_latency,
+            "upstream_error_rate": args.upstream_errors,
+        },
+        "runs": runs,
+        "max_rps": max(r["rps"] for r in runs),
+        "upstream_calls": dict(sorted(upstream.counts.items())),
+    }
+    print(f"max rps: {report['max_rps']:.1f}  upstream calls: {report['upstream_calls']}", file=sys.stderr)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
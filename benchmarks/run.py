@@ -0,0 +1,233 @@
+"""Offline benchmark suite for the calendar, recurring, menu and page-render paths.
+
+Usage::
+
+    python -m benchmarks.run                       # default profile, JSON to stdout
+    python -m benchmarks.run --quick -o out.json   # small sizes only
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.3
+    python -m benchmarks.run --save-baseline       # overwrite benchmarks/baseline.json
+
+No network access is needed. ICS feeds are generated in memory, recurring
+events are written to a temporary file, the menu comes from the checked-in
+``cache/weekly_menu_data.json`` fixture, the menu parsers run over the saved
+SchoolCafé pages in ``cache/*.html``, and weather falls back to the stub.
+The exit code is 1 when ``--compare`` finds a benchmark slower than baseline
+by more than ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+MENU_FIXTURE = ROOT / "cache" / "weekly_menu_data.json"
+# Saved menu pages; tests/fixtures/menu_golden/<name>.json holds the expected parse of each
+MENU_SNAPSHOTS = [ROOT / "cache" / name for name in ("weekly_menu.html", "menu_page.html", "quicktest_menu.html")]
+
+_TMP = tempfile.mkdtemp(prefix="homebrain-bench-")
+# Keep the app offline and away from real caches before anything imports settings
+os.environ.update(
+    {
+        "CALENDAR_SOURCE": "local_json",
+        "WEATHER_API_KEY": "",
+        "CALENDAR_CACHE_DIR": _TMP,
+        "LOG_LEVEL": "WARNING",
+    }
+)
+sys.path.insert(0, str(ROOT))
+
+from app.models import Event  # noqa: E402
+from app.services import calendar_service, menu_service, recurring_events_service  # noqa: E402
+from app.services.event_merge import EventMerger  # noqa: E402
+from benchmarks import synthetic  # noqa: E402
+
+
+def measure(fn: Callable[[], object], min_runs: int = 5, max_runs: int = 200, budget: float = 2.0) -> dict:
+    """Run ``fn`` (after one warm-up) until ``max_runs`` or ``budget`` seconds, at least ``min_runs``."""
+    fn()
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_s": statistics.median(samples),
+        "p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_s": samples[0],
+        "mean_s": statistics.fmean(samples),
+    }
+
+
+def load_calendar(events: List[Event]) -> None:
+    """Install ``events`` as the calendar cache without touching any source."""
+    calendar_service._MERGER = EventMerger()
+    calendar_service._merge_sources({"bench": events})
+    calendar_service._set_cache(calendar_service._MERGER.events(), presorted=True)
+    calendar_service._SEARCH.sync({"bench": events})
+    calendar_service._CACHE_LOADED_FROM_DISK = True
+    calendar_service._LAST_REFRESH = datetime.now(calendar_service.get_tzinfo())
+
+
+def bench_ics_parse(results: Dict[str, dict], sizes: List[int], now: datetime) -> None:
+    from ics import Calendar
+
+    for n in sizes:
+        text = synthetic.make_ics(n, now)
+        results[f"ics_parse[{n}]"] = measure(
+            lambda: calendar_service._convert_ics_events(Calendar(text)), min_runs=1, max_runs=5, budget=0
+        )
+
+
+def bench_calendar(results: Dict[str, dict], sizes: List[int], now: datetime) -> None:
+    for n in sizes:
+        events = synthetic.make_events(n, now)
+        results[f"calendar_merge_ingest[{n}]"] = measure(
+            lambda: EventMerger().apply_source("bench", events), min_runs=1, max_runs=10
+        )
+        load_calendar(events)
+        results[f"get_events[{n}]"] = measure(calendar_service.get_events)
+        results[f"events_today[{n}]"] = measure(lambda: calendar_service.events_today(now))
+        results[f"events_tomorrow[{n}]"] = measure(lambda: calendar_service.events_tomorrow(now))
+        results[f"events_this_week[{n}]"] = measure(lambda: calendar_service.events_this_week(now))
+        results[f"search_events[{n}]"] = measure(lambda: calendar_service.search_events("soccer fie"))
+
+
+def bench_recurring(results: Dict[str, dict], counts: List[int]) -> None:
+    start = date.today()
+    end = start + timedelta(days=90)
+    for n in counts:
+        recurring = synthetic.make_recurring(n)
+        results[f"generate_instances[{n}x90d]"] = measure(
+            lambda: [recurring_events_service.generate_instances(r, start, end) for r in recurring]
+        )
+
+
+def bench_menu(results: Dict[str, dict]) -> None:
+    if not MENU_FIXTURE.exists():
+        return
+    menu_service.MENU_FILE = MENU_FIXTURE
+    data = json.loads(MENU_FIXTURE.read_text(encoding="utf-8"))
+    days = []
+    for label in data.get("weekly_menus", {}):
+        try:
+            parsed = datetime.strptime(f"{label} {date.today().year}", "%a %d %b %Y").date()
+            days.append(parsed)
+        except ValueError:
+            continue
+    results["menu_weekly"] = measure(menu_service.get_weekly_menu)
+    results["menu_for_date"] = measure(lambda: [menu_service.get_menu_for_date(d) for d in days])
+
+
+def bench_menu_parse(results: Dict[str, dict]) -> None:
+    from bs4 import BeautifulSoup
+
+    from scripts import menu_parser
+
+    for path in MENU_SNAPSHOTS:
+        if not path.exists():
+            continue
+        source = path.read_text(encoding="utf-8")
+        results[f"menu_parse_text[{path.stem}]"] = measure(
+            lambda: menu_parser.extract_daily_menu_text(BeautifulSoup(source, "lxml")), max_runs=20
+        )
+        results[f"menu_parse_dom[{path.stem}]"] = measure(lambda: menu_parser.parse_menu(source), max_runs=50)
+
+
+def bench_page(results: Dict[str, dict], n_events: int, n_recurring: int, now: datetime) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    recurring_file = Path(_TMP) / "recurring_events.json"
+    recurring_events_service.DATA_FILE = recurring_file
+    recurring_events_service.save_recurring_events(synthetic.make_recurring(n_recurring))
+    load_calendar(synthetic.make_events(n_events, now))
+    client = TestClient(app)
+
+    def get_home():
+        resp = client.get("/")
+        assert resp.status_code == 200
+
+    results[f"page_home[{n_events}ev+{n_recurring}rec]"] = measure(get_home)
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions: List[str] = []
+    print(f"{'benchmark':44} {'baseline':>11} {'current':>11} {'ratio':>7}", file=sys.stderr)
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:44} {'-':>11} {cur['median_s'] * 1e3:9.3f}ms {'new':>7}", file=sys.stderr)
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        flag = " REGRESSION" if ratio > 1 + tolerance else ""
+        print(
+            f"{name:44} {base['median_s'] * 1e3:9.3f}ms {cur['median_s'] * 1e3:9.3f}ms {ratio:6.2f}x{flag}",
+            file=sys.stderr,
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small sizes only (CI smoke run)")
+    parser.add_argument("--sizes", type=int, nargs="*", help="calendar sizes (default 1000 10000 50000)")
+    parser.add_argument("--parse-sizes", type=int, nargs="*", help="ICS parse sizes (default 1000)")
+    parser.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown ratio (default 0.3)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE}")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or ([1000] if args.quick else [1000, 10000, 50000])
+    parse_sizes = args.parse_sizes if args.parse_sizes is not None else ([200] if args.quick else [1000])
+    now = datetime.now(calendar_service.get_tzinfo())
+
+    results: Dict[str, dict] = {}
+    bench_ics_parse(results, parse_sizes, now)
+    bench_calendar(results, sizes, now)
+    bench_recurring(results, [10, 100] if args.quick else [10, 100, 1000])
+    bench_menu(results)
+    bench_menu_parse(results)
+    bench_page(results, sizes[-1], 25, now)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "parse_sizes": parse_sizes,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.save_baseline:
+        BASELINE.write_text(text + "\n", encoding="utf-8")
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    elif not args.save_baseline:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")).get("results", {})
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Local stand-in HTTP servers for upstream dependencies.
+
+``StandInServer`` runs a threaded ``http.server`` on 127.0.0.1 with an
+ephemeral port and dispatches on URL path prefix. Latency and error rate can
+be configured, and every request path is counted, so load tests and unit
+tests can exercise the real HTTP code paths without internet access.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# handler(path, query) -> (status, content_type, body)
+Route = Callable[[str, Dict[str, list]], Tuple[int, str, bytes]]
+
+
+class StandInServer:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.counts: Counter = Counter()
+        self._routes: Dict[str, Route] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, prefix: str, handler: Route) -> None:
+        self._routes[prefix] = handler
+
+    @property
+    def base_url(self) -> str:
+        assert self._httpd is not None, "server not started"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _dispatch(self, raw_path: str) -> Tuple[int, str, bytes]:
+        parts = urlsplit(raw_path)
+        with self._lock:
+            self.counts[parts.path] += 1
+            fail = self.error_rate and self._rng.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            return 500, "text/plain", b"injected failure"
+        for prefix in sorted(self._routes, key=len, reverse=True):
+            if parts.path.startswith(prefix):
+                return self._routes[prefix](parts.path, parse_qs(parts.query))
+        return 404, "text/plain", b"not found"
+
+    def start(self) -> "StandInServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # noqa: N802 - http.server API
+                status, ctype, body = server._dispatch(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_POST = do_GET  # noqa: N815
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def json_body(obj) -> Tuple[int, str, bytes]:
+    return 200, "application/json", json.dumps(obj).encode("utf-8")
+
+
+def openweather_routes(server: StandInServer) -> None:
+    """Register canned OpenWeather current-weather and One Call responses."""
+
+    def current(path, query):
+        city = (query.get("q") or ["Stand-in City"])[0]
+        return json_body({
+            "name": city,
+            "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+            "main": {"temp": 71.5, "temp_min": 60.1, "temp_max": 78.9},
+        })
+
+    def onecall(path, query):
+        now = int(time.time())
+        return json_body({
+            "hourly": [
+                {"dt": now + 3600 * i, "temp": 70 + i % 5, "pop": 0.1 * (i % 3),
+                 "weather": [{"main": "Rain" if i % 4 == 0 else "Clear"}]}
+                for i in range(48)
+            ]
+        })
+
+    server.route("/data/2.5/weather", current)
+    server.route("/data/3.0/onecall", onecall)
+
+
+def ics_routes(server: StandInServer, feeds: Dict[str, str]) -> None:
+    """Serve each ICS document in ``feeds`` at ``/ics/<name>.ics``."""
+    payloads = {f"/ics/{name}.ics": text.encode("utf-8") for name, text in feeds.items()}
+
+    def handler(path, query):
+        body = payloads.get(path)
+        if body is None:
+            return 404, "text/plain", b"unknown feed"
+        return 200, "text/calendar", body
+
+    server.route("/ics/", handler)
+
+
+def rainviewer_routes(server: StandInServer, frames: int = 3) -> None:
+    """Serve RainViewer-style ``/public/weather-maps.json`` plus radar (``/v2/radar/``) and base-map (``/osm/``) tiles.
+
+    Tile bodies are a PNG signature followed by the request path, so callers can tell tiles apart.
+    """
+
+    def maps(path, query):
+        latest = int(time.time()) // 600 * 600
+        past = [{"time": latest - 600 * i, "path": f"/v2/radar/{latest - 600 * i}"} for i in reversed(range(frames))]
+        return json_body({
+            "version": "2.0",
+            "generated": int(time.time()),
+            "host": "https://tilecache.rainviewer.com",
+            "radar": {"past": past, "nowcast": []},
+        })
+
+    def tile(path, query):
+        return 200, "image/png", b"\x89PNG\r\n\x1a\n" + path.encode("utf-8")
+
+    server.route("/public/weather-maps.json", maps)
+    server.route("/v2/radar/", tile)
+    server.route("/osm/", tile)
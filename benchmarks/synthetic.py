@@ -0,0 +1,81 @@
+"""Deterministic synthetic data for benchmarks and load tests."""
+import random
+from datetime import date, datetime, time, timedelta
+from typing import List
+from zoneinfo import ZoneInfo
+
+from app.models import Event, RecurringEvent
+
+_TITLES = [
+    "Soccer practice", "Piano lesson", "Hip Hop Dance", "Dentist", "PTA meeting",
+    "Swim meet", "Book club", "Grocery run", "Science fair", "Birthday party",
+]
+_LOCATIONS = ["Field A", "Studio B", "School Gym", "Main Library", "Community Pool", None]
+
+
+def _rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def make_events(n: int, start: datetime, span_days: int = 365, seed: int = 1) -> List[Event]:
+    """``n`` events spread over ``span_days`` around ``start`` (some multi-day, some all-day)."""
+    rng = _rng(seed)
+    tz = start.tzinfo
+    base = start - timedelta(days=span_days // 2)
+    out: List[Event] = []
+    for i in range(n):
+        day = base + timedelta(days=rng.randrange(span_days))
+        if rng.random() < 0.05:
+            s = datetime.combine(day.date(), time.min, tzinfo=tz)
+            out.append(Event(
+                title=f"{rng.choice(_TITLES)} {i}", start=s,
+                end=s + timedelta(days=rng.randint(1, 4)), is_all_day=True,
+                category=f"feed{i % 3}", uid=f"bench-{i}@homebrain",
+            ))
+            continue
+        s = datetime.combine(day.date(), time(rng.randint(6, 21), rng.choice([0, 15, 30, 45])), tzinfo=tz)
+        out.append(Event(
+            title=f"{rng.choice(_TITLES)} {i}", start=s,
+            end=s + timedelta(minutes=rng.choice([30, 45, 60, 90, 120])),
+            location=rng.choice(_LOCATIONS), category=f"feed{i % 3}", uid=f"bench-{i}@homebrain",
+        ))
+    return out
+
+
+def make_ics(n: int, start: datetime, span_days: int = 365, rrule_ratio: float = 0.1, seed: int = 1) -> str:
+    """An ICS document with ``n`` VEVENTs; roughly ``rrule_ratio`` of them carry a weekly RRULE."""
+    rng = _rng(seed)
+    fmt = "%Y%m%dT%H%M%SZ"
+    utc = ZoneInfo("UTC")
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//HomeBrain//bench//EN"]
+    for ev in make_events(n, start, span_days, seed):
+        lines.append("BEGIN:VEVENT")
+        lines.append(f"UID:{ev.uid}")
+        if ev.is_all_day:
+            lines.append(f"DTSTART;VALUE=DATE:{ev.start:%Y%m%d}")
+            lines.append(f"DTEND;VALUE=DATE:{ev.end:%Y%m%d}")
+        else:
+            lines.append(f"DTSTART:{ev.start.astimezone(utc).strftime(fmt)}")
+            lines.append(f"DTEND:{ev.end.astimezone(utc).strftime(fmt)}")
+        lines.append(f"SUMMARY:{ev.title}")
+        if ev.location:
+            lines.append(f"LOCATION:{ev.location}")
+        if rng.random() < rrule_ratio:
+            lines.append(f"RRULE:FREQ=WEEKLY;COUNT={rng.randint(4, 20)}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def make_recurring(n: int, seed: int = 1, tz: str = "America/Chicago") -> List[RecurringEvent]:
+    rng = _rng(seed)
+    out: List[RecurringEvent] = []
+    for i in range(n):
+        hour = rng.randint(7, 19)
+        out.append(RecurringEvent(
+            id=i + 1, title=f"{rng.choice(_TITLES)} (weekly)", day_of_week=rng.randrange(7),
+            start_time=time(hour, 0), end_time=time(hour + 1, 0), timezone=tz,
+            location=rng.choice(_LOCATIONS),
+            start_date=date(2024, 1, 1) if rng.random() < 0.5 else None,
+        ))
+    return out
@@ -3,11 +3,7 @@ set -e
 
 echo "Setting up cron job for menu scraper..."
 
-# Install Python dependencies
-pip install --no-cache-dir -r /work/requirements.txt
-
-# Install cron
-apt-get update && apt-get install -y cron
+# Python dependencies and cron are installed in Dockerfile.scraper
 
 # Create cron.d file (system-wide format: includes user field)
 cat > /etc/cron.d/scraper-cron <<'EOF'
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Menu page parsers (no browser needed)
+
+``parse_menu`` reads the rendered SchoolCafé page with lxml and walks the
+relevant nodes once, in document order: ``mat-panel-title`` starts a category,
+``button.menu-item-name`` starts an item, and the ``<strong>`` labels
+"Calories" / "Allergens:" fill in the current item. Categories outside the
+weekly_menus schema (e.g. GRAIN) are skipped.
+
+``extract_daily_menu_text`` is the original line-based parser over the page's
+flattened text. It is kept as a fallback for pages without the expected
+nodes and as the reference the benchmark compares against.
+"""
+
+from lxml import html
+
+SKIP_LINES = ["Grain", "Protein", "Vegetable", "Fruit", "Milk", "Not yet rated", "Calories", "/", "Carbs",
+              "Allergens:", "Additional Allergens:", "None listed"]
+FOOD_TYPES = ["Grain", "Protein", "Vegetable", "Fruit", "Milk", "Calories"]
+
+# Panel titles -> keys of the weekly_menus schema ("LUNCH ENTREE", "BREAKFAST ENTREE", ...)
+CATEGORIES = {
+    "ENTREE": "entrees",
+    "VEGETABLE": "vegetables",
+    "FRUIT": "fruits",
+    "MILK": "milk",
+    "CONDIMENT": "condiments",
+}
+
+
+def empty_menu():
+    return {key: [] for key in CATEGORIES.values()}
+
+
+def _category(title):
+    title = title.upper()
+    if title.endswith("ENTREE"):
+        return "entrees"
+    return CATEGORIES.get(title)
+
+
+def _text(element):
+    return " ".join(element.text_content().split())
+
+
+def _allergens(text):
+    if not text or text == "None listed":
+        return []
+    return [a.strip() for a in text.split(",") if a.strip()]
+
+
+def parse_menu(source):
+    """Menu of the day shown in ``source`` (page HTML), in one pass over its nodes"""
+    root = html.fromstring(source)
+    menu = empty_menu()
+    category = None
+    item = None
+    panels = 0
+    for el in root.iter("mat-panel-title", "button", "strong"):
+        if el.tag == "mat-panel-title":
+            panels += 1
+            category = _category(_text(el))
+            item = None
+        elif el.tag == "button":
+            if category is None or "menu-item-name" not in (el.get("class") or "").split():
+                continue
+            item = {"name": _text(el), "calories": "", "allergens": []}
+            menu[category].append(item)
+        elif item is not None:
+            label = _text(el)
+            if label == "Calories":
+                item["calories"] = " ".join((el.tail or "").split())
+            elif label == "Allergens:":
+                value = el.getnext()
+                while value is not None and not isinstance(value.tag, str):  # skip <!----> comments
+                    value = value.getnext()
+                item["allergens"] = _allergens(_text(value)) if value is not None else []
+    if not panels and "ENTREE" in source:
+        # A menu without the expected nodes (layout change): fall back to the text parser
+        from bs4 import BeautifulSoup
+        return extract_daily_menu_text(BeautifulSoup(source, "lxml"))
+    return menu
+
+
+def week_dates(source):
+    """Labels of the date strip, e.g. ["Mon 10 NOV", ...]"""
+    root = html.fromstring(source)
+    return [
+        _text(button)
+        for button in root.iter("button")
+        if "date-button" in (button.get("class") or "").split()
+    ]
+
+
+def extract_daily_menu_text(soup):
+    """Extract menu items from the current day's view (line-based, over ``soup.get_text``)"""
+    menu = empty_menu()
+
+    # Get text line by line
+    text = soup.get_text("\n", strip=True)
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    current_category = None
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+
+        # Category headers ("LUNCH ENTREE", "BREAKFAST ENTREE", ...)
+        if line.endswith("ENTREE"):
+            current_category = "entrees"
+            i += 1
+            continue
+        elif line == "VEGETABLE":
+            current_category = "vegetables"
+            i += 1
+            continue
+        elif line == "FRUIT":
+            current_category = "fruits"
+            i += 1
+            continue
+        elif line == "MILK":
+            current_category = "milk"
+            i += 1
+            continue
+        elif line == "CONDIMENT":
+            current_category = "condiments"
+            i += 1
+            continue
+
+        # Skip known non-item lines
+        if line in SKIP_LINES:
+            i += 1
+            continue
+
+        # Look for pattern: ItemName -> FoodType/Calories sequence
+        if current_category and i + 3 < len(lines):
+            # Check if this starts a food item (followed by Grain/Protein/Vegetable/Fruit/Milk, then Calories)
+            if lines[i+1] in FOOD_TYPES:
+                # Find "Calories" line
+                calories_idx = None
+                for j in range(i+1, min(i+6, len(lines))):
+                    if lines[j] == "Calories":
+                        calories_idx = j
+                        break
+
+                if calories_idx and calories_idx + 1 < len(lines):
+                    item_name = line
+                    # Next line after "Calories" is the number
+                    calories_val = lines[calories_idx + 1]
+
+                    # Look for allergens
+                    allergens = []
+                    for j in range(calories_idx, min(calories_idx + 10, len(lines))):
+                        if lines[j] == "Allergens:" and j + 1 < len(lines):
+                            allergen_line = lines[j + 1]
+                            if allergen_line != "None listed":
+                                allergens = [a.strip() for a in allergen_line.split(",") if a.strip()]
+                            break
+
+                    menu[current_category].append({
+                        "name": item_name,
+                        "calories": calories_val,
+                        "allergens": allergens
+                    })
+
+        i += 1
+
+    return menu
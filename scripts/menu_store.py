@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Per-view, date-keyed menu store
+
+Each scrape job returns one week for one view, in the scraper's
+``weekly_menus`` shape keyed by page labels such as "Tue 16 DEC". This module
+converts those labels to ISO dates and merges the days into
+``<store_dir>/<view_id>.json``::
+
+    {"view_id": ..., "updated_at": ..., "days": {"2025-12-16": {"label": "Tue 16 DEC",
+     "menu": {...}, "scraped_at": ..., "source": "api"}}}
+
+Jobs for other weeks or views therefore add to the store instead of
+overwriting each other. Every day carries a content hash, so unchanged days
+are neither re-parsed by the scraper nor rewritten here, and all files are
+replaced atomically (temp file + rename) so readers never see a partial write.
+
+The menu history (``append_history``) keeps every scraped day of the
+dashboard's view, so past weeks stay available::
+
+    <history_dir>/2025-W51.jsonl   one JSON line per (day, version), append-only
+    <history_dir>/index.json       {"days": {"2025-12-16": ["2025-W51.jsonl", offset, length]}}
+
+Segments are per ISO week and are only ever appended to. The index points at
+the newest line for each date, so a reader needs one seek and one read per
+lookup (app/services/menu_service.py).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger("scraper.menu_store")
+
+STORE_DIR = Path(os.environ.get("SCRAPER_STORE_DIR", "/work/cache/menus"))
+HISTORY_INDEX = "index.json"
+
+MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], start=1)}
+_VIEW_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def day_hash(menu):
+    """Content hash of one day's menu (key order does not matter)"""
+    payload = json.dumps(menu, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def atomic_write_json(path, data):
+    """Write ``data`` to a temp file in the same directory, then rename it over ``path``"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; the dashboard container reads these files
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def manifest_path(output_file):
+    return Path(output_file).with_name("menu_manifest.json")
+
+
+def load_manifest(output_file):
+    try:
+        with open(manifest_path(output_file), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_if_changed(result, output_file):
+    """Atomically write ``result`` and bump the manifest, unless no day's hash changed
+
+    The manifest (``menu_manifest.json`` next to the output) holds a version,
+    the combined hash and per-day hashes; the dashboard reloads the menu only
+    when it changes. Returns True if anything was written.
+    """
+    days = {label: day_hash(menu) for label, menu in result.get("weekly_menus", {}).items()}
+    digest = hashlib.sha1(json.dumps(days, sort_keys=True).encode("utf-8")).hexdigest()
+    manifest = load_manifest(output_file)
+    if manifest.get("hash") == digest and Path(output_file).exists():
+        return False
+    atomic_write_json(output_file, result)
+    # Written after the data, so a reader that sees the new version finds the new file
+    atomic_write_json(manifest_path(output_file), {
+        "version": int(manifest.get("version", 0)) + 1,
+        "hash": digest,
+        "file": Path(output_file).name,
+        "updated_at": datetime.now().isoformat(),
+        "days": days,
+    })
+    return True
+
+
+def label_to_date(label, reference):
+    """ "Tue 16 DEC" -> the date with that day/month closest to ``reference`` (labels carry no year)"""
+    parts = label.split()
+    if len(parts) < 3:
+        return None
+    try:
+        day = int(parts[1])
+        month = MONTHS[parts[2].upper()[:3]]
+    except (ValueError, KeyError):
+        return None
+    candidates = []
+    for year in (reference.year - 1, reference.year, reference.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue
+    return min(candidates, key=lambda d: abs(d - reference), default=None)
+
+
+def week_start(offset=0, today=None):
+    """Monday of the week ``offset`` weeks ahead; on weekends week 0 is the coming week"""
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday())
+    if today.weekday() >= 5:
+        monday += timedelta(days=7)
+    return monday + timedelta(weeks=offset)
+
+
+def result_days(result):
+    """``{iso_date: entry}`` for one scrape result"""
+    scraped_at = result.get("scraped_at") or datetime.now().isoformat()
+    reference = datetime.fromisoformat(scraped_at).date()
+    page_hashes = result.get("page_hashes", {})
+    days = {}
+    for label, menu in result.get("weekly_menus", {}).items():
+        day = label_to_date(label, reference)
+        if day is None:
+            logger.warning("Unparseable day label", extra={"label": label, "view_id": result.get("view_id")})
+            continue
+        days[day.isoformat()] = {
+            "label": label,
+            "menu": menu,
+            "scraped_at": scraped_at,
+            "source": result.get("source", "browser"),
+            "hash": day_hash(menu),
+            "page_hash": page_hashes.get(label),
+        }
+    return days
+
+
+def view_path(view_id, store_dir=None):
+    if not _VIEW_ID.match(view_id):
+        raise ValueError(f"invalid view id {view_id!r}")
+    return Path(store_dir or STORE_DIR) / f"{view_id}.json"
+
+
+def load_view(view_id, store_dir=None):
+    path = view_path(view_id, store_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"view_id": view_id, "updated_at": None, "days": {}}
+
+
+def cached_days(view_id, store_dir=None):
+    """``{label: entry}`` of the stored days, for the scraper to skip unchanged ones"""
+    return {entry["label"]: entry for entry in load_view(view_id, store_dir)["days"].values()}
+
+
+def merge_results(results, store_dir=None):
+    """Merge scrape results into their views' stores; returns ``{view_id: days_changed}``
+
+    A view whose days all hash the same as before is not rewritten.
+    """
+    by_view = {}
+    for result in results:
+        by_view.setdefault(result["view_id"], []).append(result)
+    written = {}
+    for view_id, view_results in by_view.items():
+        store = load_view(view_id, store_dir)
+        count = 0
+        # Older scrapes first, so the newest copy of a day wins
+        for result in sorted(view_results, key=lambda r: r.get("scraped_at") or ""):
+            for iso, entry in result_days(result).items():
+                old = store["days"].get(iso)
+                if old is not None and old.get("hash") == entry["hash"]:
+                    continue
+                store["days"][iso] = entry
+                count += 1
+        written[view_id] = count
+        path = view_path(view_id, store_dir)
+        if not count:
+            logger.info("Menu store unchanged", extra={"view_id": view_id, "path": str(path)})
+            continue
+        store["days"] = dict(sorted(store["days"].items()))
+        store["updated_at"] = datetime.now().isoformat()
+        atomic_write_json(path, store)
+        logger.info("Merged menu store", extra={"view_id": view_id, "days": count, "path": str(path)})
+    return written
+
+
+def history_segment(day):
+    """Segment file for ``day``: its ISO week, e.g. "2025-W51.jsonl" """
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}.jsonl"
+
+
+def load_history_index(history_dir):
+    try:
+        with open(Path(history_dir) / HISTORY_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"days": {}}
+
+
+def append_history(results, history_dir):
+    """Append the days of ``results`` whose content changed to the history; returns days appended"""
+    history_dir = Path(history_dir)
+    index = load_history_index(history_dir)
+    hashes = index.setdefault("hashes", {})
+    by_segment = {}
+    for result in sorted(results, key=lambda r: r.get("scraped_at") or ""):
+        for iso, entry in result_days(result).items():
+            if hashes.get(iso) == entry["hash"]:
+                continue
+            hashes[iso] = entry["hash"]
+            record = {"date": iso, "view_id": result.get("view_id"), **entry}
+            by_segment.setdefault(history_segment(date.fromisoformat(iso)), []).append(record)
+    if not by_segment:
+        return 0
+    history_dir.mkdir(parents=True, exist_ok=True)
+    appended = 0
+    for segment, records in by_segment.items():
+        with open(history_dir / segment, "ab") as f:
+            offset = f.tell()
+            for record in records:
+                line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+                f.write(line)
+                index["days"][record["date"]] = [segment, offset, len(line)]
+                offset += len(line)
+                appended += 1
+            f.flush()
+            os.fsync(f.fileno())
+    # Segments are durable before the index points into them
+    index["days"] = dict(sorted(index["days"].items()))
+    index["updated_at"] = datetime.now().isoformat()
+    atomic_write_json(history_dir / HISTORY_INDEX, index)
+    logger.info("Appended menu history", extra={"days": appended, "path": str(history_dir)})
+    return appended
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Browser-free SchoolCafé menu fetch
+
+Calls the JSON endpoint the SchoolCafé menu page itself uses for a day's items
+(``CalendarView/GetDailyMenuitemsByGrade``) with httpx. The response is
+normalized into the ``weekly_menus`` schema written by scrape_weekly_menu.py,
+so no browser is needed.
+
+A viewID from the menu URL stands for a school, serving line, meal type and
+grade. The API wants those values directly, so they come from
+SCHOOLCAFE_VIEWS (JSON: ``{"<view_id>": {"SchoolId": ..., "ServingLine": ...,
+"MealType": "Lunch", "Grade": "01"}}``) or from the caller.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+
+logger = logging.getLogger("scraper.schoolcafe_api")
+
+API_BASE = os.environ.get("SCHOOLCAFE_API_BASE", "https://webapis.schoolcafe.com/api")
+DAILY_ITEMS_PATH = "/CalendarView/GetDailyMenuitemsByGrade"
+
+# API category names -> keys of the weekly_menus schema
+CATEGORIES = {
+    "ENTREE": "entrees",
+    "VEGETABLE": "vegetables",
+    "FRUIT": "fruits",
+    "MILK": "milk",
+    "CONDIMENT": "condiments",
+}
+NAME_KEYS = ("MenuItemDescription", "ItemName", "Name", "Description")
+CALORIE_KEYS = ("Calories", "CaloriesValue", "Kcal")
+ALLERGEN_KEYS = ("Allergens", "AllergenList", "AllergensText")
+
+
+class MenuApiError(RuntimeError):
+    """The data endpoint could not be used (missing view params, HTTP or schema error)"""
+
+
+def empty_menu():
+    return {key: [] for key in CATEGORIES.values()}
+
+
+def day_label(day):
+    """Label in the page's format, e.g. "Tue 16 DEC" """
+    return f"{day.strftime('%a')} {day.day} {day.strftime('%b').upper()}"
+
+
+def week_days(week_start):
+    monday = week_start - timedelta(days=week_start.weekday())
+    return [monday + timedelta(days=i) for i in range(5)]
+
+
+def view_params(view_id):
+    """Query parameters for ``view_id`` from SCHOOLCAFE_VIEWS, or None"""
+    raw = os.environ.get("SCHOOLCAFE_VIEWS")
+    if not raw:
+        return None
+    try:
+        return json.loads(raw).get(view_id)
+    except (ValueError, AttributeError):
+        logger.warning("SCHOOLCAFE_VIEWS is not a JSON object")
+        return None
+
+
+def _category(name):
+    upper = (name or "").upper()
+    for marker, key in CATEGORIES.items():
+        if marker in upper:
+            return key
+    return None
+
+
+def _first(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _calories(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _allergens(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [a.strip() for a in value.split(",") if a.strip()]
+    out = []
+    for a in value:
+        name = (a.get("Name") or a.get("AllergenName")) if isinstance(a, dict) else a
+        if name:
+            out.append(str(name).strip())
+    return out
+
+
+def normalize_daily(payload):
+    """Map a daily-items response onto ``{"entrees": [...], "vegetables": [...], ...}``
+
+    Accepts both shapes seen from the endpoint: an object keyed by category
+    name, and a flat list whose items carry their category.
+    """
+    menu = empty_menu()
+    if isinstance(payload, dict):
+        groups = payload.items()
+    elif isinstance(payload, list):
+        groups = [(_first(item, ("Category", "FoodCategory", "CategoryName")), [item]) for item in payload]
+    else:
+        raise MenuApiError(f"unexpected payload type {type(payload).__name__}")
+    for category, items in groups:
+        key = _category(category)
+        if key is None or not isinstance(items, list):
+            continue
+        for item in items:
+            name = _first(item, NAME_KEYS)
+            if not name:
+                continue
+            menu[key].append({
+                "name": str(name).strip(),
+                "calories": _calories(_first(item, CALORIE_KEYS)),
+                "allergens": _allergens(_first(item, ALLERGEN_KEYS)),
+            })
+    return menu
+
+
+async def _fetch_day(client, day, params):
+    query = {
+        "SchoolId": params["SchoolId"],
+        "ServingDate": day.strftime("%m/%d/%Y"),
+        "ServingLine": params.get("ServingLine", "Main Line"),
+        "MealType": params.get("MealType", "Lunch"),
+        "Grade": params.get("Grade", ""),
+        "PersonId": params.get("PersonId", "null"),
+    }
+    t0 = time.monotonic()
+    resp = await client.get(DAILY_ITEMS_PATH, params=query)
+    resp.raise_for_status()
+    menu = normalize_daily(resp.json())
+    step = {"step": "day", "day": day_label(day), "ok": True, "seconds": round(time.monotonic() - t0, 3),
+            "entrees": len(menu["entrees"])}
+    return menu, step
+
+
+async def fetch_week_async(view_id, week_start=None, params=None, base_url=None, timeout=15.0):
+    """Fetch Monday–Friday of the week containing ``week_start`` concurrently"""
+    params = params or view_params(view_id)
+    if not params or not params.get("SchoolId"):
+        raise MenuApiError(f"no SCHOOLCAFE_VIEWS entry with a SchoolId for view {view_id}")
+    started = time.monotonic()
+    days = week_days(week_start or date.today())
+    async with httpx.AsyncClient(base_url=base_url or API_BASE, timeout=timeout,
+                                 headers={"Accept": "application/json"}) as client:
+        try:
+            results = await asyncio.gather(*(_fetch_day(client, d, params) for d in days))
+        except (httpx.HTTPError, ValueError) as exc:
+            raise MenuApiError(str(exc)) from exc
+    labels = [day_label(d) for d in days]
+    return {
+        "view_id": view_id,
+        "scraped_at": datetime.now().isoformat(),
+        "source": "api",
+        "week_dates": labels,
+        "weekly_menus": {label: menu for label, (menu, _) in zip(labels, results)},
+        "timings": {
+            "total_seconds": round(time.monotonic() - started, 3),
+            "steps": [step for _, step in results],
+        },
+    }
+
+
+def fetch_week(view_id, week_start=None, params=None, base_url=None, timeout=15.0):
+    return asyncio.run(fetch_week_async(view_id, week_start, params, base_url, timeout))
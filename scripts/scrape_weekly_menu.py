@@ -1,99 +1,126 @@
 #!/usr/bin/env python3
 """
 SchoolCafé Weekly Menu Scraper with viewID
-Scrapes menus for the current week by navigating through days
+Scrapes menus for one or more views and weeks, via the JSON API or by
+navigating through days in a browser
+
+    python scripts/scrape_weekly_menu.py --view <lunch-view> --view <breakfast-view> --weeks 0 1 2
 """
 
 from selenium import webdriver
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+import argparse
+import hashlib
+import queue
+import threading
 import time
 import os
-import json
-from datetime import datetime
-
-def extract_daily_menu(soup):
-    """Extract menu items from the current day's view"""
-    menu = {
-        "entrees": [],
-        "vegetables": [],
-        "fruits": [],
-        "milk": [],
-        "condiments": []
-    }
-    
-    # Get text line by line
-    text = soup.get_text("\n", strip=True)
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    
-    current_category = None
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i]
-        
-        # Category headers
-        if line == "LUNCH ENTREE":
-            current_category = "entrees"
-            i += 1
-            continue
-        elif line == "VEGETABLE":
-            current_category = "vegetables"
-            i += 1
-            continue
-        elif line == "FRUIT":
-            current_category = "fruits"
-            i += 1
-            continue
-        elif line == "MILK":
-            current_category = "milk"
-            i += 1
-            continue
-        elif line == "CONDIMENT":
-            current_category = "condiments"
-            i += 1
-            continue
-        
-        # Skip known non-item lines
-        if line in ["Grain", "Protein", "Vegetable", "Fruit", "Milk", "Not yet rated", "Calories", "/", "Carbs", "Allergens:", "Additional Allergens:", "None listed"]:
-            i += 1
-            continue
-        
-        # Look for pattern: ItemName -> FoodType/Calories sequence
-        if current_category and i + 3 < len(lines):
-            # Check if this starts a food item (followed by Grain/Protein/Vegetable/Fruit/Milk, then Calories)
-            if lines[i+1] in ["Grain", "Protein", "Vegetable", "Fruit", "Milk", "Calories"]:
-                # Find "Calories" line
-                calories_idx = None
-                for j in range(i+1, min(i+6, len(lines))):
-                    if lines[j] == "Calories":
-                        calories_idx = j
-                        break
-                
-                if calories_idx and calories_idx + 1 < len(lines):
-                    item_name = line
-                    # Next line after "Calories" is the number
-                    calories_val = lines[calories_idx + 1]
-                    
-                    # Look for allergens
-                    allergens = []
-                    for j in range(calories_idx, min(calories_idx + 10, len(lines))):
-                        if lines[j] == "Allergens:" and j + 1 < len(lines):
-                            allergen_line = lines[j + 1]
-                            if allergen_line != "None listed":
-                                allergens = [a.strip() for a in allergen_line.split(",") if a.strip()]
-                            break
-                    
-                    menu[current_category].append({
-                        "name": item_name,
-                        "calories": calories_val,
-                        "allergens": allergens
-                    })
-        
-        i += 1
-    
-    return menu
+import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.log import configure_logging  # noqa: E402
+from scripts import menu_parser, menu_store, schoolcafe_api  # noqa: E402
+
+logger = logging.getLogger("scraper.weekly_menu")
+
+# Per-wait and whole-run limits (seconds)
+STEP_TIMEOUT = float(os.environ.get("SCRAPER_STEP_TIMEOUT", "15"))
+TOTAL_TIMEOUT = float(os.environ.get("SCRAPER_TIMEOUT", "120"))
+
+DEFAULT_VIEW_ID = "4322524b-1f7e-476a-9139-814c671143ef"
+OUTPUT_FILE = os.environ.get("SCRAPER_OUTPUT", "/work/cache/weekly_menu_data.json")
+# Append-only history of the dashboard's view (every week scraped), next to the output by default
+HISTORY_DIR = os.environ.get("SCRAPER_HISTORY_DIR", str(Path(OUTPUT_FILE).with_name("menu_history")))
+
+MENU_CONTAINER = (By.CSS_SELECTOR, ".menus.content")
+DATE_BUTTON = (By.CLASS_NAME, "date-button")
+
+
+class ScrapeTimeout(TimeoutException):
+    """The overall SCRAPER_TIMEOUT budget is used up"""
+
+
+class StepTimer:
+    """Overall deadline plus per-step timing recorded into the output JSON"""
+
+    def __init__(self, total_timeout=TOTAL_TIMEOUT, step_timeout=STEP_TIMEOUT):
+        self.started = time.monotonic()
+        self.deadline = self.started + total_timeout
+        self.step_timeout = step_timeout
+        self.steps = []
+
+    def timeout(self):
+        """Timeout for the next wait: the step timeout, capped by what is left overall"""
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise ScrapeTimeout("overall scrape timeout exceeded")
+        return min(self.step_timeout, remaining)
+
+    @contextmanager
+    def step(self, name, **info):
+        entry = {"step": name, **info}
+        t0 = time.monotonic()
+        try:
+            yield entry
+            entry.setdefault("ok", True)
+        except Exception:
+            entry["ok"] = False
+            raise
+        finally:
+            entry["seconds"] = round(time.monotonic() - t0, 3)
+            self.steps.append(entry)
+
+    def summary(self):
+        return {"total_seconds": round(time.monotonic() - self.started, 3), "steps": self.steps}
+
+
+def wait_for(driver, timer, condition):
+    """WebDriverWait for ``condition`` within the current step/overall budget"""
+    return WebDriverWait(
+        driver,
+        timer.timeout(),
+        poll_frequency=0.1,
+        ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+    ).until(condition)
+
+
+def menu_hash(driver):
+    """Hash of the rendered menu text, used to detect that a new day has loaded"""
+    try:
+        text = driver.find_element(*MENU_CONTAINER).text
+    except WebDriverException:
+        text = ""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def date_button_active(idx):
+    def condition(driver):
+        buttons = driver.find_elements(*DATE_BUTTON)
+        return idx < len(buttons) and "active" in (buttons[idx].get_attribute("class") or "").split()
+
+    return condition
+
+
+def content_changed(previous_hash):
+    def condition(driver):
+        current = menu_hash(driver)
+        return current if current != previous_hash else False
+
+    return condition
 
 
 def get_date_buttons(driver):
@@ -108,17 +135,23 @@ def get_date_buttons(driver):
                 dates.append(text)
         return dates
     except Exception as e:
-        print(f"Error finding date buttons: {e}")
+        logger.warning("Error finding date buttons", extra={"error": str(e)})
         return []
 
 
-def scrape_weekly_menu(view_id="4322524b-1f7e-476a-9139-814c671143ef"):
-    """
-    Scrape the weekly menu for the given viewID, navigating through each day
-    
-    Args:
-        view_id: The SchoolCafé viewID parameter
-    """
+NEXT_WEEK_SELECTORS = [
+    "button[aria-label*='next']",
+    "button[aria-label*='Next']",
+    "button[title*='next']",
+    "button[title*='Next']",
+    ".next-week-button",
+    "button.MuiIconButton-root:has(svg[data-testid='ArrowForwardIosIcon'])",
+    "//button[contains(@aria-label, 'next')]",
+    "//button[contains(@aria-label, 'Next')]",
+]
+
+
+def create_driver():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -126,178 +159,372 @@ def scrape_weekly_menu(view_id="4322524b-1f7e-476a-9139-814c671143ef"):
     
     remote_url = os.environ.get("SELENIUM_REMOTE_URL")
     if remote_url:
-        driver = webdriver.Remote(command_executor=remote_url, options=options)
-    else:
-        from selenium.webdriver.chrome.service import Service
-        from webdriver_manager.chrome import ChromeDriverManager
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        return webdriver.Remote(command_executor=remote_url, options=options)
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+    service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=options)
+
+
+class DriverPool:
+    """Up to ``size`` WebDriver sessions, created on first use and reused across jobs"""
+
+    def __init__(self, size):
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except BaseException:
+            # Broken or left mid-navigation: never hand it to the next job, and free its slot
+            self._discard(driver)
+            raise
+        else:
+            self._idle.put(driver)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return create_driver()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, driver):
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                break
+            except Exception:
+                pass
+
+
+def get_week_dates(driver):
+    """Labels of the week shown in the date strip, e.g. ["Mon 15 DEC", ...]"""
+    return menu_parser.week_dates(driver.page_source)
+
+
+def click_next_week(driver, timer, week_dates):
+    """Advance the date strip one week; returns the new labels, or None if no button worked"""
+    for selector in NEXT_WEEK_SELECTORS:
+        try:
+            if selector.startswith("//"):
+                button = driver.find_element(By.XPATH, selector)
+            else:
+                button = driver.find_element(By.CSS_SELECTOR, selector)
+            logger.debug("Found next button", extra={"selector": selector})
+            with timer.step("next_week", selector=selector):
+                button.click()
+                # Wait until the date strip shows a different week
+                wait_for(driver, timer, lambda d: get_week_dates(d) != week_dates)
+            return get_week_dates(driver)
+        except ScrapeTimeout:
+            raise
+        except Exception:
+            continue
+    return None
+
+
+def scrape_weekly_menu(view_id=DEFAULT_VIEW_ID, week_offset=0, driver=None, cached=None):
+    """
+    Scrape one week of menus for the given viewID, navigating through each day
+    
+    Args:
+        view_id: The SchoolCafé viewID parameter
+        week_offset: 0 for this week (the coming week on weekends), 1 for next, ...
+        driver: WebDriver session to reuse; a private one is created (and quit) if None
+        cached: ``{label: store entry}`` from menu_store.cached_days(); past days
+            found there are not loaded again, and a day whose page hash is
+            unchanged is not re-parsed
+    """
+    timer = StepTimer()
+    cached = cached or {}
+    today = date.today()
+    own_driver = driver is None
+    if own_driver:
+        driver = create_driver()
     
     try:
         url = f"https://www.schoolcafe.com/CFISD/menus?viewID={view_id}"
-        print(f"Loading: {url}")
-        driver.get(url)
+        logger.info("Loading menu page", extra={"view_id": view_id, "week_offset": week_offset})
+        driver.set_page_load_timeout(timer.timeout())
+        with timer.step("load"):
+            driver.get(url)
+            # The Angular app renders the menu container and date strip once data arrives
+            wait_for(driver, timer, EC.presence_of_element_located(MENU_CONTAINER))
+            wait_for(driver, timer, EC.presence_of_all_elements_located(DATE_BUTTON))
         
-        # Wait for page to load
-        time.sleep(8)
+        week_dates = get_week_dates(driver)
+        logger.debug("Initial week dates", extra={"week_dates": week_dates})
         
-        # Function to extract week dates from current page
-        def get_week_dates():
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            text = soup.get_text("\n", strip=True)
-            lines = text.split("\n")
-            
-            dates = []
-            days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
-            for i, line in enumerate(lines):
-                if line.strip() in days:
-                    if i+2 < len(lines):
-                        date_num = lines[i+1].strip()
-                        month = lines[i+2].strip()
-                        dates.append(f"{line} {date_num} {month}")
-            return dates
-        
-        # Get initial week dates
-        week_dates = get_week_dates()
-        print(f"\nInitial week dates found: {week_dates}")
-        
-        # Check if we need to navigate to current week
-        # Parse the first date to check if it's in the past
-        if week_dates:
-            try:
-                # Parse "Mon 10 NOV" format
-                first_date_parts = week_dates[0].split()
-                if len(first_date_parts) >= 3:
-                    day_num = int(first_date_parts[1])
-                    month_abbr = first_date_parts[2].upper()
-                    
-                    # Convert month abbreviation to number
-                    month_map = {'JAN':1,'FEB':2,'MAR':3,'APR':4,'MAY':5,'JUN':6,
-                                'JUL':7,'AUG':8,'SEP':9,'OCT':10,'NOV':11,'DEC':12}
-                    month_num = month_map.get(month_abbr[:3], datetime.now().month)
-                    
-                    # Create date object for comparison
-                    current_year = datetime.now().year
-                    first_menu_date = datetime(current_year, month_num, day_num).date()
-                    today = datetime.now().date()
-                    
-                    print(f"First menu date: {first_menu_date}, Today: {today}")
-                    
-                    # If the menu week is in the past, try clicking "next week" button
-                    if first_menu_date < today:
-                        print("Menu is for a past week, attempting to navigate forward...")
-                        
-                        # Look for next/forward navigation buttons
-                        # Common selectors: arrow buttons, next buttons, etc.
-                        next_button_selectors = [
-                            "button[aria-label*='next']",
-                            "button[aria-label*='Next']",
-                            "button[title*='next']",
-                            "button[title*='Next']",
-                            ".next-week-button",
-                            "button.MuiIconButton-root:has(svg[data-testid='ArrowForwardIosIcon'])",
-                            "//button[contains(@aria-label, 'next')]",
-                            "//button[contains(@aria-label, 'Next')]",
-                        ]
-                        
-                        clicked = False
-                        for selector in next_button_selectors:
-                            try:
-                                if selector.startswith("//"):
-                                    # XPath selector
-                                    button = driver.find_element(By.XPATH, selector)
-                                else:
-                                    # CSS selector
-                                    button = driver.find_element(By.CSS_SELECTOR, selector)
-                                
-                                print(f"Found next button with selector: {selector}")
-                                button.click()
-                                time.sleep(3)
-                                
-                                # Check if we moved forward
-                                new_week_dates = get_week_dates()
-                                if new_week_dates != week_dates:
-                                    week_dates = new_week_dates
-                                    print(f"Successfully navigated to: {week_dates}")
-                                    clicked = True
-                                    break
-                            except Exception as e:
-                                continue
-                        
-                        if not clicked:
-                            print("Could not find next week button, using current week shown")
-            except Exception as e:
-                print(f"Error checking week navigation: {e}")
+        # Move forward until the strip shows the target week
+        target = menu_store.week_start(week_offset)
+        for _ in range(week_offset + 2):
+            first = menu_store.label_to_date(week_dates[0], target) if week_dates else None
+            if first is None or first >= target:
+                break
+            new_dates = click_next_week(driver, timer, week_dates)
+            if new_dates is None:
+                logger.warning("Could not find next week button, using current week shown")
+                break
+            week_dates = new_dates
+            logger.info("Navigated to next week", extra={"week_dates": week_dates})
         
-        print(f"\nFinal week dates: {week_dates}")
+        logger.info("Scraping week", extra={"week_dates": week_dates})
         
         # Now navigate through each day and extract menus
         weekly_menus = {}
+        page_hashes = {}
         
         # Find all date buttons
         try:
-            date_buttons = driver.find_elements(By.CLASS_NAME, "date-button")
-            print(f"Found {len(date_buttons)} date buttons")
+            date_buttons = driver.find_elements(*DATE_BUTTON)
+            logger.debug("Found date buttons", extra={"count": len(date_buttons)})
+            # Day 0 must at least differ from an empty container
+            previous_hash = hashlib.sha1(b"").hexdigest()
             
             for idx, date_label in enumerate(week_dates):
-                print(f"\nExtracting menu for {date_label}...")
+                entry = cached.get(date_label)
+                day = menu_store.label_to_date(date_label, today)
+                if entry and day is not None and day < today:
+                    # Past menus do not change; keep the stored copy without loading the day
+                    weekly_menus[date_label] = entry["menu"]
+                    page_hashes[date_label] = entry.get("page_hash")
+                    timer.steps.append({"step": "day", "day": date_label, "cached": True, "ok": True, "seconds": 0.0})
+                    continue
+                logger.debug("Extracting menu", extra={"day": date_label})
                 
                 # Click the corresponding date button
                 if idx < len(date_buttons):
                     try:
-                        date_buttons[idx].click()
-                        time.sleep(3)  # Wait for menu to load
-                        
-                        # Extract menu for this day
-                        soup = BeautifulSoup(driver.page_source, "lxml")
-                        daily_menu = extract_daily_menu(soup)
-                        weekly_menus[date_label] = daily_menu
+                        with timer.step("day", day=date_label) as step:
+                            if not date_button_active(idx)(driver):
+                                date_buttons[idx].click()
+                            wait_for(driver, timer, date_button_active(idx))
+                            try:
+                                wait_for(driver, timer, content_changed(previous_hash))
+                            except ScrapeTimeout:
+                                raise
+                            except TimeoutException:
+                                # Same text as the previous day (e.g. a repeated or empty menu)
+                                step["content_changed"] = False
+                            previous_hash = menu_hash(driver)
+                            page_hashes[date_label] = previous_hash
+                            
+                            if entry and entry.get("page_hash") == previous_hash:
+                                # Same rendered text as the stored copy: skip parsing
+                                daily_menu = entry["menu"]
+                                step["cached"] = True
+                            else:
+                                daily_menu = menu_parser.parse_menu(driver.page_source)
+                            weekly_menus[date_label] = daily_menu
+                            step["entrees"] = len(daily_menu["entrees"])
                         
                         # Print entrees for this day
-                        print(f"  Entrees ({len(daily_menu['entrees'])}): {[e['name'] for e in daily_menu['entrees']]}")
+                        logger.info("Extracted day", extra={"day": date_label, "entrees": len(daily_menu['entrees'])})
                         
                         # Re-find date buttons after page update
-                        date_buttons = driver.find_elements(By.CLASS_NAME, "date-button")
+                        date_buttons = driver.find_elements(*DATE_BUTTON)
+                    except ScrapeTimeout:
+                        raise
                     except Exception as e:
-                        print(f"  Error clicking button: {e}")
+                        logger.warning("Error clicking date button", extra={"day": date_label, "error": str(e)})
                         # If first day failed, use already loaded page
                         if idx == 0:
-                            soup = BeautifulSoup(driver.page_source, "lxml")
-                            daily_menu = extract_daily_menu(soup)
+                            daily_menu = menu_parser.parse_menu(driver.page_source)
                             weekly_menus[date_label] = daily_menu
-                            print(f"  Using initially loaded page")
-                            print(f"  Entrees ({len(daily_menu['entrees'])}): {[e['name'] for e in daily_menu['entrees']]}")
+                            logger.info("Using initially loaded page", extra={"day": date_label})
+                            logger.info("Extracted day", extra={"day": date_label, "entrees": len(daily_menu['entrees'])})
+        except ScrapeTimeout:
+            logger.warning("Scrape timed out; saving the days collected so far", extra={"days": len(weekly_menus)})
         except Exception as e:
-            print(f"Error navigating days: {e}")
+            logger.warning("Error navigating days", extra={"error": str(e)})
             # Fall back to current day only
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            daily_menu = extract_daily_menu(soup)
+            daily_menu = menu_parser.parse_menu(driver.page_source)
             weekly_menus[week_dates[0] if week_dates else "Current Day"] = daily_menu
         
         result = {
             "view_id": view_id,
             "scraped_at": datetime.now().isoformat(),
+            "source": "browser",
+            "week_offset": week_offset,
             "week_dates": week_dates,
-            "weekly_menus": weekly_menus
+            "weekly_menus": weekly_menus,
+            "page_hashes": page_hashes,
+            "timings": timer.summary(),
         }
         
-        print("\n=== WEEKLY ENTREES SUMMARY ===")
-        for day, menu in weekly_menus.items():
-            print(f"\n{day}:")
-            for entree in menu['entrees']:
-                print(f"  - {entree['name']} ({entree['calories']} cal)")
-        
-        # Save to file
-        output_file = "/work/cache/weekly_menu_data.json"
-        with open(output_file, "w") as f:
-            json.dump(result, f, indent=2)
-        print(f"\n\nSaved complete data to {output_file}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for day, menu in weekly_menus.items():
+                logger.debug("Entrees", extra={"day": day, "entrees": [e['name'] for e in menu['entrees']]})
         
         return result
         
     finally:
-        driver.quit()
+        if own_driver:
+            driver.quit()
+
+
+def save_result(result, output_file=OUTPUT_FILE):
+    """Atomically replace ``output_file`` (and bump its manifest) if any day changed"""
+    changed = menu_store.write_if_changed(result, output_file)
+    logger.info(
+        "Saved menu data" if changed else "Menu data unchanged; not rewritten",
+        extra={
+            "path": output_file,
+            "days": len(result["weekly_menus"]),
+            "source": result.get("source", "browser"),
+            "seconds": result["timings"]["total_seconds"],
+        },
+    )
+    return changed
+
+
+def scrape_mode(mode=None):
+    """``mode`` if given, else SCRAPER_MODE ("auto" by default)"""
+    return mode or os.environ.get("SCRAPER_MODE", "auto")
+
+
+def fetch_menu(view_id=DEFAULT_VIEW_ID, mode=None, week_offset=0, driver=None, cached=None, **api_options):
+    """
+    Fetch one week's menu, preferring the JSON data endpoint over the browser
+    
+    Args:
+        view_id: The SchoolCafé viewID parameter
+        mode: "auto" (API, falling back to Selenium), "api" or "browser";
+            defaults to SCRAPER_MODE
+        week_offset: weeks ahead of the current (or, on weekends, coming) week
+        driver: WebDriver session for the browser fallback, or a callable
+            returning a context manager that yields one (DriverPool.session)
+        cached: stored days for the browser scraper to skip (see scrape_weekly_menu)
+    """
+    mode = scrape_mode(mode)
+    if mode in ("auto", "api"):
+        try:
+            result = schoolcafe_api.fetch_week(view_id, menu_store.week_start(week_offset), **api_options)
+            result["week_offset"] = week_offset
+            if mode == "api" or any(day["entrees"] for day in result["weekly_menus"].values()):
+                return result
+            logger.warning("Menu API returned no entrees; falling back to browser", extra={"view_id": view_id})
+        except schoolcafe_api.MenuApiError as e:
+            if mode == "api":
+                raise
+            logger.warning("Menu API unavailable; falling back to browser", extra={"error": str(e)})
+    if callable(driver):
+        with driver() as session:
+            return scrape_weekly_menu(view_id, week_offset, session, cached)
+    return scrape_weekly_menu(view_id, week_offset, driver, cached)
+
+
+def run_jobs(jobs, workers=2, mode=None, cached=None):
+    """
+    Fetch every (view_id, week_offset) job, ``workers`` at a time
+    
+    Browser fallbacks share a pool of ``workers`` WebDriver sessions, so the
+    (slow) browser start-up is paid once per session rather than once per job.
+    Failed jobs are logged and left out of the returned results. ``cached``
+    maps view IDs to their stored days (menu_store.cached_days).
+    """
+    cached = cached or {}
+    pool = DriverPool(workers)
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {
+                executor.submit(fetch_menu, view_id, mode, offset, pool.session, cached.get(view_id)): (view_id, offset)
+                for view_id, offset in jobs
+            }
+            for future in as_completed(futures):
+                view_id, offset = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.warning("Menu job failed", extra={"view_id": view_id, "week_offset": offset, "error": str(e)})
+    finally:
+        pool.close()
+    return results
+
+
+def parse_jobs(views, weeks):
+    """Every view crossed with every week offset, e.g. (["a", "b"], [0, 1]) -> 4 jobs"""
+    return [(view_id, offset) for view_id in views for offset in weeks]
+
+
+def apply_memory_limit(megabytes, mode=None):
+    """Cap this process's address space (and its children's); SCRAPER_MEMORY_MB, POSIX only.
+
+    Chrome reserves far more address space than it uses and will not start under
+    the cap, so the limit is only applied when no local browser is launched: with
+    SELENIUM_REMOTE_URL (Chrome runs in the selenium container) or in API mode.
+    """
+    if not megabytes:
+        return
+    if mode != "api" and not os.environ.get("SELENIUM_REMOTE_URL"):
+        logger.info("SCRAPER_MEMORY_MB not applied: Chrome is launched locally")
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = int(megabytes) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape SchoolCafé menus")
+    parser.add_argument("--view", dest="views", action="append",
+                        help="viewID to scrape (repeatable; default SCRAPER_VIEWS or the built-in view)")
+    parser.add_argument("--weeks", type=int, nargs="+",
+                        help="week offsets to scrape, e.g. 0 1 2 (default SCRAPER_WEEKS or 0)")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SCRAPER_WORKERS", "2")),
+                        help="parallel jobs / WebDriver sessions")
+    parser.add_argument("--mode", choices=("auto", "api", "browser"), default=None)
+    args = parser.parse_args(argv)
+    mode = scrape_mode(args.mode)
+    apply_memory_limit(os.environ.get("SCRAPER_MEMORY_MB"), mode)
+
+    views = args.views or [v.strip() for v in os.environ.get("SCRAPER_VIEWS", "").split(",") if v.strip()]
+    weeks = args.weeks or [int(w) for w in os.environ.get("SCRAPER_WEEKS", "0").split(",") if w.strip()]
+    views = views or [DEFAULT_VIEW_ID]
+    jobs = parse_jobs(views, weeks)
+
+    cached = {view_id: menu_store.cached_days(view_id) for view_id in views}
+    results = run_jobs(jobs, workers=args.workers, mode=mode, cached=cached)
+    if results:
+        menu_store.merge_results(results)
+        menu_store.append_history([r for r in results if r["view_id"] == views[0]], HISTORY_DIR)
+    # The dashboard still reads the single-view file for the current week
+    for result in results:
+        if result["view_id"] == views[0] and result.get("week_offset", 0) == weeks[0]:
+            save_result(result)
+            break
+    return 0 if len(results) == len(jobs) else 1
 
 
 if __name__ == "__main__":
-    scrape_weekly_menu()
+    configure_logging(os.environ.get("LOG_LEVEL", "INFO"), os.environ.get("LOG_FORMAT", "text"))
+    sys.exit(main())
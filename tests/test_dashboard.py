@@ -8,3 +8,140 @@ def test_homepage_renders():
     assert resp.status_code == 200
     assert "HomeBrain" in resp.text
     assert "radar-map" in resp.text
+
+
+def test_metrics_endpoint_exposes_instrumentation():
+    client = TestClient(app)
+    client.get("/")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert "homebrain_dashboard_render_seconds_count" in resp.text
+    assert "# TYPE homebrain_cache_requests_total counter" in resp.text
+
+
+def test_server_timing_header_breaks_down_stages():
+    client = TestClient(app)
+    header = client.get("/").headers.get("server-timing", "")
+    for stage in ("calendar", "recurring", "weather", "menu", "render", "total"):
+        assert f"{stage};dur=" in header
+    assert "weather;dur=" in client.get("/api/weather").headers.get("server-timing", "")
+    assert "server-timing" not in client.get("/metrics").headers
+
+
+def test_admin_profile_attributes_service_work(monkeypatch):
+    import threading
+    import time
+    from app.config import get_settings
+    from app.services import calendar_service
+
+    client = TestClient(app)
+    # Admin actions are off until ADMIN_TOKEN is set, and then need it
+    assert client.get("/admin/profile?seconds=0.1").status_code == 403
+    assert client.post("/admin/jobs/weather/run").status_code == 403
+    monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+    assert client.post("/admin/jobs/weather/run", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    def busy():
+        deadline = time.time() + 0.5
+        while time.time() < deadline:
+            calendar_service.get_tzinfo()
+
+    worker = threading.Thread(target=busy)
+    worker.start()
+    resp = client.get("/admin/profile?seconds=0.3&interval_ms=2&token=s3cret")
+    worker.join()
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["samples"] > 0
+    assert "calendar" in report["by_service"]
+    assert "app.services.calendar_service:get_tzinfo" in report["collapsed"]
+
+
+def test_slow_source_degrades_to_cached_value(monkeypatch):
+    import time
+    from datetime import datetime
+    from app.config import get_settings
+    from app.routers.dashboard import DASHBOARD_DEGRADED
+    from app.services import weather_service
+
+    settings = get_settings()
+    city = settings.location_city
+    cached = weather_service.get_weather_stub(city).model_copy(update={"description": "Cached Drizzle"})
+    monkeypatch.setitem(weather_service._CACHE, city, {"value": cached, "fetched_at": datetime(2000, 1, 1)})
+    monkeypatch.setattr(settings, "dashboard_source_deadline_ms", 200)
+
+    def slow_weather(city=None):
+        time.sleep(1.5)
+        return weather_service.get_weather_stub(city)
+
+    monkeypatch.setattr(weather_service, "get_weather", slow_weather)
+    before = DASHBOARD_DEGRADED.value(source="weather", reason="timeout")
+    resp = TestClient(app).get("/")
+    assert resp.status_code == 200
+    total_ms = float(resp.headers["server-timing"].split("total;dur=")[1])
+    assert total_ms < 1000
+    assert "Cached Drizzle" in resp.text
+    assert DASHBOARD_DEGRADED.value(source="weather", reason="timeout") == before + 1
+
+
+def test_menu_api_flags_and_filters_allergens(monkeypatch, tmp_path):
+    import json
+    from app.config import get_settings
+    from app.services import menu_service
+
+    menu_file = tmp_path / "weekly_menu_data.json"
+    menu_file.write_text(json.dumps({"weekly_menus": {"Tue 16 DEC": {"entrees": [
+        {"name": "Cheeseburger", "calories": "301", "allergens": ["Milk", "Wheat"]},
+        {"name": "Chef Salad", "calories": "250", "allergens": ["Egg"]},
+        {"name": "Fruit Plate", "calories": "90", "allergens": []},
+    ]}}}))
+    monkeypatch.setattr(get_settings(), "allergen_profiles", "Emma:milk;Noah:Egg,Peanuts")
+    monkeypatch.setattr(menu_service, "MENU_FILE", menu_file)
+    monkeypatch.setattr(menu_service, "MANIFEST_FILE", tmp_path / "menu_manifest.json")
+    monkeypatch.setattr(menu_service, "HISTORY_DIR", tmp_path / "menu_history")
+    for name in ("_MENU_DATA", "_MENU_MTIME", "_MENU_VERSION", "_MANIFEST"):
+        monkeypatch.setattr(menu_service, name, None)
+    client = TestClient(app)
+
+    entrees = client.get("/api/menu", params={"date": "2025-12-16"}).json()["menu"]["entrees"]
+    assert [(e["name"], e["unsafe_for"]) for e in entrees] == [
+        ("Cheeseburger", ["Emma"]), ("Chef Salad", ["Noah"]), ("Fruit Plate", []),
+    ]
+    assert "allergen_mask" not in entrees[0]
+    safe = client.get("/api/menu", params={"date": "2025-12-16", "safe_for": "Emma,Noah"}).json()
+    assert [e["name"] for e in safe["menu"]["entrees"]] == ["Fruit Plate"]
+    # Allergen names work as well as member names
+    safe = client.get("/api/menu", params={"date": "2025-12-16", "safe_for": "wheat"}).json()
+    assert [e["name"] for e in safe["menu"]["entrees"]] == ["Chef Salad", "Fruit Plate"]
+    assert client.get("/api/menu", params={"date": "2025-12-17"}).json()["menu"] is None
+
+
+def test_tasks_store_range_queries_and_reload(monkeypatch, tmp_path):
+    import json
+    import os
+    from datetime import date
+    from app.services import tasks_service
+
+    data = tmp_path / "tasks.json"
+    data.write_text(json.dumps([
+        {"title": "Pay rent", "due_date": "2025-12-20", "importance": "high"},
+        {"title": "Library books", "due_date": "2025-12-10", "importance": "low"},
+        {"title": "Permission slip", "due_date": "2025-12-15", "importance": "med"},
+        {"title": "Dentist form", "due_date": "2025-12-15", "importance": "high"},
+    ]))
+    monkeypatch.setattr(tasks_service, "DATA_FILE", data)
+    today = date(2025, 12, 15)
+    assert [t.due_date.day for t in tasks_service.load_tasks()] == [10, 15, 15, 20]
+    assert [t.title for t in tasks_service.tasks_overdue(today)] == ["Library books"]
+    assert [t.title for t in tasks_service.tasks_due_today(today)] == ["Permission slip", "Dentist form"]
+    assert tasks_service.dashboard_tasks(today)["week_tasks"][0].title == "Pay rent"
+    snap = tasks_service.snapshot()
+    assert tasks_service.snapshot() is snap  # unchanged file: no re-read
+
+    client = TestClient(app)
+    resp = client.get("/api/tasks", params={"start": "2025-12-11", "end": "2025-12-20", "importance": "high"})
+    assert [t["title"] for t in resp.json()] == ["Dentist form", "Pay rent"]
+
+    data.write_text(json.dumps([{"title": "New", "due_date": "2025-12-12"}]))
+    os.utime(data, ns=(1, 1))
+    assert [t.title for t in tasks_service.tasks_between(date(2025, 12, 1), today)] == ["New"]
@@ -25,3 +25,743 @@ def test_weather_stub_without_key():
     info = weather_service.get_weather()
     assert info.city
     assert isinstance(info.temperature_f, float)
+
+
+def test_multi_day_event_appears_on_every_day(monkeypatch):
+    from datetime import datetime, timedelta
+    from app.models import Event
+
+    tz = calendar_service.get_tzinfo()
+    monkeypatch.setattr(calendar_service, "refresh_events", lambda force=False: None)
+    monkeypatch.setattr(calendar_service, "_CACHE_LOADED_FROM_DISK", True)
+    day = datetime(2025, 11, 24, tzinfo=tz)
+    calendar_service._set_cache([
+        Event(title="Break", start=day, end=day + timedelta(days=3), is_all_day=True),
+        Event(title="Late", start=day - timedelta(hours=2), end=day + timedelta(hours=1)),
+        Event(title="Later", start=day + timedelta(days=5)),
+    ])
+    try:
+        noon = day + timedelta(hours=12)
+        assert [e.title for e in calendar_service.events_today(noon - timedelta(days=1))] == ["Late"]
+        assert [e.title for e in calendar_service.events_today(noon)] == ["Late", "Break"]
+        assert [e.title for e in calendar_service.events_tomorrow(noon + timedelta(days=1))] == ["Break"]
+        assert [e.title for e in calendar_service.events_today(noon + timedelta(days=3))] == []
+    finally:
+        calendar_service._set_cache([])
+
+
+def test_search_index_prefix_and_incremental_sync():
+    from datetime import datetime, timedelta
+    from app.models import Event
+    from app.services.event_search import SearchIndex
+
+    tz = calendar_service.get_tzinfo()
+    base = datetime(2025, 11, 1, tzinfo=tz)
+    school = [Event(title="Hip Hop Dance", start=base, location="Studio B")]
+    sports = [Event(title="Soccer practice", start=base + timedelta(days=1), location="Field A")]
+    index = SearchIndex()
+    assert sorted(index.sync({"school": school, "sports": sports})) == ["school", "sports"]
+    assert [e.title for e in index.search("danc")] == ["Hip Hop Dance"]
+    assert [e.title for e in index.search("field")] == ["Soccer practice"]
+    assert index.search("hip soccer") == []
+    # unchanged sources are not re-indexed; dropped sources are removed
+    assert index.sync({"school": school}) == ["sports"]
+    assert index.search("soccer") == []
+
+
+def test_search_index_respects_posting_budget():
+    from datetime import datetime, timedelta
+    from app.models import Event
+    from app.services.event_search import SearchIndex
+
+    tz = calendar_service.get_tzinfo()
+    base = datetime(2020, 1, 1, tzinfo=tz)
+    events = [Event(title=f"Game {i}", start=base + timedelta(days=i)) for i in range(100)]
+    index = SearchIndex(max_postings=20)
+    index.sync({"sports": events})
+    assert index.posting_count <= 20
+    assert [e.title for e in index.search("game")][-1] == "Game 99"
+
+
+def test_sweep_line_busy_merge_and_conflicts():
+    from datetime import datetime, timedelta
+    from app.models import Event
+    from app.services import availability_service
+
+    tz = calendar_service.get_tzinfo()
+    day = datetime(2025, 11, 24, tzinfo=tz)
+    h = lambda n: day + timedelta(hours=n)
+    events = [
+        Event(title="A", start=h(9), end=h(11)),
+        Event(title="B", start=h(10), end=h(12)),
+        Event(title="C", start=h(11), end=h(13)),
+        Event(title="D", start=h(18), end=h(19)),
+    ]
+    busy = availability_service.merge_busy(events, day, h(24))
+    assert busy == [(h(9), h(13)), (h(18), h(19))]
+    pairs = [(a.title, b.title) for a, b in availability_service.find_conflicts(events)]
+    assert pairs == [("A", "B"), ("B", "C")]
+
+
+def test_retention_window_applied_at_ingest_and_history_on_demand(monkeypatch):
+    from datetime import datetime, timedelta
+    from app.models import Event
+    from app.services.event_merge import EventMerger
+    from app.services.event_search import SearchIndex
+
+    tz = calendar_service.get_tzinfo()
+    now = datetime.now(tz)
+    old = Event(title="Last year", start=now - timedelta(days=365), uid="recital@x")
+    soon = Event(title="Soon", start=now + timedelta(days=1))
+    far = Event(title="Far future", start=now + timedelta(days=900))
+    # The same event shared into a second feed is returned once, in history too
+    copy = old.model_copy()
+    fetches = []
+
+    def collect(record=True):
+        fetches.append(record)
+        return {"family": [old, soon, far], "dad": [copy]}
+
+    monkeypatch.setattr(calendar_service, "_collect_sources", collect)
+    monkeypatch.setattr(calendar_service, "_cache_file", lambda: calendar_service.Path("/nonexistent/x.json"))
+    monkeypatch.setattr(calendar_service, "_HISTORY", None)
+    monkeypatch.setattr(calendar_service, "_MERGER", EventMerger())
+    monkeypatch.setattr(calendar_service, "_SEARCH", SearchIndex())
+    try:
+        calendar_service.refresh_events(force=True)
+        assert [e.title for e in calendar_service._CACHE] == ["Soon"]
+        history = calendar_service.events_in_range(now - timedelta(days=400), now - timedelta(days=300))
+        assert [e.title for e in history] == ["Last year"]
+        # Any other out-of-horizon range is served from the same fetch; live refresh stats are left alone
+        wide = calendar_service.events_in_range(now - timedelta(days=366), now + timedelta(days=1000))
+        assert [e.title for e in wide] == ["Last year", "Soon", "Far future"]
+        assert fetches == [True, False]
+    finally:
+        calendar_service._set_cache([])
+        monkeypatch.setattr(calendar_service, "_LAST_REFRESH", None)
+
+
+def test_failed_feed_reports_no_events(monkeypatch):
+    from datetime import datetime
+    from app.models import Event
+
+    responses = [[Event(title="Practice", start=datetime(2025, 11, 24, tzinfo=calendar_service.get_tzinfo()))], []]
+    monkeypatch.setattr(calendar_service, "_fetch_google_ics", lambda url, source: responses.pop(0))
+    monkeypatch.setattr(calendar_service, "_SOURCE_STATS", {})
+    calendar_service._fetch_sources([("soccer", "https://example.invalid/a.ics")])
+    assert calendar_service._SOURCE_STATS["soccer"]["events"] == 1
+    calendar_service._fetch_sources([("soccer", "https://example.invalid/a.ics")])
+    stats = calendar_service._SOURCE_STATS["soccer"]
+    assert stats["events"] == 0 and not stats["ok"] and stats["fetched_at"] is not None
+
+
+def test_event_merger_dedupes_by_uid_with_precedence():
+    from datetime import datetime, timedelta
+    from app.models import Event
+    from app.services.event_merge import EventMerger
+
+    tz = calendar_service.get_tzinfo()
+    base = datetime(2025, 11, 24, 18, tzinfo=tz)
+    mom = [
+        Event(title="Recital", start=base, uid="r1", category="mom"),
+        Event(title="Dentist", start=base - timedelta(days=1), uid="d1", category="mom"),
+    ]
+    dad = [Event(title="Recital (dad)", start=base, uid="r1", category="dad")]
+    merger = EventMerger(precedence=["dad"])
+    merger.apply_source("mom", mom)
+    merger.apply_source("dad", dad)
+    assert [e.title for e in merger.events()] == ["Dentist", "Recital (dad)"]
+
+    moved = [Event(title="Recital (dad)", start=base - timedelta(days=2), uid="r1", category="dad")]
+    diff = merger.apply_source("dad", moved)
+    assert diff.changed == ["r1|"] and not diff.added and not diff.removed
+    assert [e.title for e in merger.events()] == ["Recital (dad)", "Dentist"]
+
+    merger.remove_source("dad")
+    assert [e.title for e in merger.events()] == ["Dentist", "Recital"]
+
+
+def test_log_helpers_redact_urls_and_sample():
+    import logging
+    from app.log import log_sampled, redact_url
+
+    assert redact_url("https://calendar.google.com/calendar/ical/secret/basic.ics") == (
+        "https://calendar.google.com/<redacted>"
+    )
+
+    records = []
+
+    class _Capture(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    logger = logging.getLogger("app.tests.sampled")
+    logger.addHandler(_Capture())
+    logger.setLevel(logging.DEBUG)
+    for _ in range(5):
+        log_sampled(logger, logging.DEBUG, "k", "hello", interval=3600)
+    assert len(records) == 1
+    logger.setLevel(logging.INFO)
+    log_sampled(logger, logging.DEBUG, "other", "skipped")
+    assert len(records) == 1
+
+
+def test_synthetic_ics_round_trips_through_parser():
+    from datetime import datetime
+    from ics import Calendar
+    from benchmarks import synthetic
+
+    now = datetime(2025, 11, 24, 12, tzinfo=calendar_service.get_tzinfo())
+    events = calendar_service._convert_ics_events(Calendar(synthetic.make_ics(25, now)))
+    assert len(events) == 25
+    assert all(e.uid and e.uid.startswith("bench-") for e in events)
+
+
+def test_weather_fetch_against_stand_in_server(monkeypatch):
+    from app.config import get_settings
+    from benchmarks.standins import StandInServer, openweather_routes
+
+    with StandInServer() as upstream:
+        openweather_routes(upstream)
+        monkeypatch.setattr(get_settings(), "weather_api_base_url", upstream.base_url)
+        info = weather_service._fetch_openweather("Springfield", "test-key")
+    assert info is not None and info.city == "Springfield"
+    assert info.temperature_f == 71.5
+    assert upstream.counts["/data/2.5/weather"] == 1
+
+
+def test_weather_refresh_keeps_last_reading_until_replaced(monkeypatch):
+    from datetime import datetime, timedelta
+    from app.config import get_settings
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "weather_api_key", "test-key")
+    monkeypatch.setattr(settings, "weather_lat", None)
+    monkeypatch.setattr(settings, "location_city", "Springfield")
+    monkeypatch.setattr(weather_service, "_CACHE", {})
+    monkeypatch.setattr(weather_service, "_FAILED", set())
+    live = weather_service.get_weather_stub("Springfield").model_copy(update={"temperature_f": 99.0})
+    weather_service._CACHE["Springfield"] = {"value": live, "fetched_at": datetime.now()}
+    seen = []
+
+    def fetch(city, key):
+        seen.append(weather_service.cached_weather(city).temperature_f)  # what the dashboard serves meanwhile
+        return None if len(seen) == 1 else live.model_copy(update={"temperature_f": 101.0})
+
+    monkeypatch.setattr(weather_service, "_fetch_openweather", fetch)
+    weather_service.refresh_all()  # upstream down: last reading stays
+    assert weather_service.cached_weather().temperature_f == 99.0
+    # Later requests past the TTL, while the failure is still recorded, keep the reading too
+    for _ in range(2):
+        weather_service._CACHE["Springfield"]["fetched_at"] = datetime.now() - timedelta(days=1)
+        assert weather_service.get_weather().temperature_f == 99.0
+    weather_service.refresh_all()
+    assert seen == [99.0, 99.0]
+    assert weather_service.cached_weather().temperature_f == 101.0
+
+
+def test_loop_monitor_reports_blocking_callback(monkeypatch):
+    import asyncio
+    import logging
+    import time
+    from app.config import get_settings
+    from app.services import loop_monitor, metrics
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "loop_monitor_enabled", True)
+    monkeypatch.setattr(settings, "loop_monitor_interval_ms", 20)
+    monkeypatch.setattr(settings, "loop_block_threshold_ms", 50)
+    records = []
+
+    class _Capture(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    handler = _Capture()
+    loop_monitor.logger.addHandler(handler)
+    loop_monitor.logger.setLevel(logging.WARNING)
+
+    def _blocking_callback():
+        time.sleep(0.3)
+
+    async def scenario():
+        assert loop_monitor.start()
+        await asyncio.sleep(0.1)
+        _blocking_callback()
+        await asyncio.sleep(0.1)
+        await loop_monitor.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        loop_monitor.logger.removeHandler(handler)
+    blocked = [r for r in records if r.getMessage() == "Event loop blocked"]
+    assert blocked and "_blocking_callback" in blocked[0].stack
+    assert blocked[0].blocked_ms >= 50
+    assert "homebrain_event_loop_lag_max_seconds" in metrics.render()
+
+
+def test_scheduler_runs_jobs_off_loop_without_overlap():
+    import asyncio
+    import threading
+    import time
+    from app.services import scheduler
+
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(threading.current_thread().name)
+        release.wait(2)
+
+    async def scenario():
+        scheduler.register("test-slow", slow, interval=1, timeout=0.1)
+        scheduler.register("test-fast", lambda: None, interval=60, priority=-1)
+        scheduler.start()
+        try:
+            await asyncio.sleep(0.3)
+            slow_job = scheduler._JOBS["test-slow"]
+            assert slow_job.last_status == "timeout" and slow_job.running
+            assert scheduler.run_now("test-slow") is False
+            assert slow_job.skipped == 1
+            release.set()
+            await asyncio.sleep(0.1)
+            assert not slow_job.running
+            assert scheduler.run_now("test-slow") is True
+            await asyncio.sleep(0.1)
+            assert slow_job.last_status == "ok"
+            assert scheduler._JOBS["test-fast"].status()["last_status"] == "ok"
+        finally:
+            await scheduler.stop()
+            scheduler.unregister("test-slow")
+            scheduler.unregister("test-fast")
+
+    t0 = time.perf_counter()
+    asyncio.run(scenario())
+    assert time.perf_counter() - t0 < 2
+    assert len(calls) == 2 and all(name.startswith("homebrain-job") for name in calls)
+
+
+def test_shared_cache_lease_and_calendar_follower(monkeypatch, tmp_path):
+    from datetime import datetime, timedelta
+    from app.config import get_settings
+    from app.models import Event
+    from app.services import shared_cache
+    from app.services.event_merge import EventMerger
+    from app.services.event_search import SearchIndex
+
+    settings = get_settings()
+    monkeypatch.setattr(calendar_service, "_MERGER", EventMerger())
+    monkeypatch.setattr(calendar_service, "_SEARCH", SearchIndex())
+    monkeypatch.setattr(settings, "shared_cache_path", str(tmp_path / "shared.sqlite3"))
+    monkeypatch.setattr(settings, "shared_cache_poll_seconds", 0)
+    assert shared_cache.acquire_lease("job", 60, owner="a")
+    assert not shared_cache.acquire_lease("job", 60, owner="b")
+    assert shared_cache.acquire_lease("job", -1, owner="a")  # renew with an already-expired lease
+    assert shared_cache.acquire_lease("job", 60, owner="b")
+
+    tz = calendar_service.get_tzinfo()
+    now = datetime.now(tz)
+    trip = Event(title="Trip", start=now - timedelta(days=3), end=now + timedelta(days=2), uid="t")
+    soon = Event(title="Soon", start=now + timedelta(days=1), uid="s")
+    monkeypatch.setattr(calendar_service, "_collect_sources", lambda: {"family": [soon, trip]})
+    monkeypatch.setattr(calendar_service, "_cache_file", lambda: calendar_service.Path("/nonexistent/x.json"))
+    monkeypatch.setattr(calendar_service, "_SHARED_VERSION", None)
+    try:
+        calendar_service.refresh_events(force=True)  # leader: fetch and publish
+        # The start index is bounded by the longest span, so long events still match
+        rows = shared_cache.events_overlapping(now.timestamp(), (now + timedelta(hours=1)).timestamp())
+        assert len(rows) == 1 and '"Trip"' in rows[0]
+
+        # A second worker: empty memory, lease held elsewhere, upstream must not be touched
+        calendar_service._set_cache([])
+        monkeypatch.setattr(calendar_service, "_MERGER", EventMerger())
+        monkeypatch.setattr(calendar_service, "_SHARED_VERSION", None)
+        monkeypatch.setattr(calendar_service, "_LAST_REFRESH", None)
+        monkeypatch.setattr(shared_cache, "acquire_lease", lambda name, ttl, owner=None: False)
+        monkeypatch.setattr(calendar_service, "_collect_sources", lambda: 1 / 0)
+        calendar_service.refresh_events()
+        assert [e.title for e in calendar_service._CACHE] == ["Trip", "Soon"]
+        assert calendar_service._LAST_REFRESH is not None
+    finally:
+        calendar_service._set_cache([])
+        monkeypatch.setattr(calendar_service, "_LAST_REFRESH", None)
+
+
+def test_schoolcafe_api_mode_against_stand_in_server():
+    import json
+    from pathlib import Path
+    from benchmarks.standins import StandInServer, json_body
+    from scripts import schoolcafe_api
+
+    recorded = json.loads((Path(__file__).parent / "fixtures" / "schoolcafe_daily_items.json").read_text())
+    seen = []
+
+    def daily(path, query):
+        seen.append(query["ServingDate"][0])
+        if query["ServingDate"][0] == "12/15/2025":
+            return json_body({})  # no school that day
+        return json_body(recorded)
+
+    with StandInServer() as upstream:
+        upstream.route(schoolcafe_api.DAILY_ITEMS_PATH, daily)
+        result = schoolcafe_api.fetch_week(
+            "view-1", date(2025, 12, 17), params={"SchoolId": "abc", "Grade": "01"}, base_url=upstream.base_url
+        )
+    assert sorted(seen) == ["12/15/2025", "12/16/2025", "12/17/2025", "12/18/2025", "12/19/2025"]
+    assert result["week_dates"][0] == "Mon 15 DEC" and result["source"] == "api"
+    assert result["weekly_menus"]["Mon 15 DEC"]["entrees"] == []
+    # Same shape the browser scraper writes
+    tuesday = result["weekly_menus"]["Tue 16 DEC"]
+    assert sorted(tuesday) == ["condiments", "entrees", "fruits", "milk", "vegetables"]
+    assert tuesday["entrees"][0] == {
+        "name": "Cheeseburger", "calories": "301", "allergens": ["Milk", "Wheat", "Soy", "Gluten", "Sesame"],
+    }
+    assert len(result["timings"]["steps"]) == 5
+
+
+def test_menu_store_merges_weeks_and_views(tmp_path):
+    from scripts import menu_store
+
+    # Labels carry no year: the nearest date to the scrape wins
+    assert menu_store.label_to_date("Fri 2 JAN", date(2025, 12, 29)) == date(2026, 1, 2)
+    assert menu_store.week_start(0, date(2025, 12, 20)) == date(2025, 12, 22)
+
+    def result(view_id, labels, entree, scraped_at="2025-12-29T22:00:00"):
+        menu = {"entrees": [{"name": entree, "calories": "1", "allergens": []}]}
+        return {"view_id": view_id, "scraped_at": scraped_at, "weekly_menus": {l: menu for l in labels}}
+
+    written = menu_store.merge_results([
+        result("lunch", ["Mon 29 DEC", "Tue 30 DEC"], "Pizza"),
+        result("lunch", ["Mon 5 JAN", "Tue 6 JAN"], "Tacos"),
+        result("breakfast", ["Mon 29 DEC"], "Waffles"),
+    ], store_dir=tmp_path)
+    assert written == {"lunch": 4, "breakfast": 1}
+    # A later run for one week leaves the other week in place
+    menu_store.merge_results([result("lunch", ["Mon 5 JAN"], "Soup", "2025-12-30T22:00:00")], store_dir=tmp_path)
+    lunch = menu_store.load_view("lunch", tmp_path)["days"]
+    assert list(lunch) == ["2025-12-29", "2025-12-30", "2026-01-05", "2026-01-06"]
+    assert lunch["2026-01-05"]["menu"]["entrees"][0]["name"] == "Soup"
+    # Re-merging identical days leaves the file alone
+    assert menu_store.merge_results([result("breakfast", ["Mon 29 DEC"], "Waffles")], store_dir=tmp_path) == {
+        "breakfast": 0}
+    assert menu_store.load_view("breakfast", tmp_path)["days"]["2025-12-29"]["label"] == "Mon 29 DEC"
+
+
+def test_menu_output_is_atomic_and_reloaded_on_manifest_change(monkeypatch, tmp_path):
+    from app.services import menu_service
+    from scripts import menu_store
+
+    output = tmp_path / "weekly_menu_data.json"
+    monkeypatch.setattr(menu_service, "MENU_FILE", output)
+    monkeypatch.setattr(menu_service, "MANIFEST_FILE", menu_store.manifest_path(output))
+    for name in ("_MENU_DATA", "_MENU_MTIME", "_MENU_VERSION", "_MANIFEST"):
+        monkeypatch.setattr(menu_service, name, None)
+
+    def result(entree):
+        item = {"name": entree, "calories": "300", "allergens": []}
+        return {"view_id": "v", "scraped_at": "2025-12-15T22:00:00", "weekly_menus": {"Tue 16 DEC": {"entrees": [item]}}}
+
+    assert menu_store.write_if_changed(result("Pizza"), output)
+    assert menu_service.get_menu_for_date(date(2025, 12, 16))["entrees"][0].name == "Pizza"
+    # Same content: neither the data file nor the manifest is rewritten
+    assert not menu_store.write_if_changed(result("Pizza"), output)
+    assert menu_store.load_manifest(output)["version"] == 1
+    assert menu_store.write_if_changed(result("Tacos"), output)
+    assert menu_store.load_manifest(output)["version"] == 2
+    assert menu_service.get_menu_for_date(date(2025, 12, 16))["entrees"][0].name == "Tacos"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["menu_manifest.json", "weekly_menu_data.json"]
+
+
+def test_menu_parser_matches_golden_files():
+    import json
+    from pathlib import Path
+    from bs4 import BeautifulSoup
+    from scripts import menu_parser
+
+    golden_dir = Path(__file__).parent / "fixtures" / "menu_golden"
+    cache_dir = Path(__file__).parent.parent / "cache"
+
+    # Checked by hand against the page: the day's four entrees with their allergens, and
+    # per-category counts (the GRAIN panel's breadsticks are outside the schema and skipped)
+    menu = menu_parser.parse_menu((cache_dir / "weekly_menu.html").read_text(encoding="utf-8"))
+    assert [(item["name"], item["calories"], item["allergens"]) for item in menu["entrees"]] == [
+        ("CHICKEN & VEGETABLE POT STICKER/DUMPLING", "299", ["Wheat", "Soy", "Gluten"]),
+        ("Chicken Caesar Salad", "358", ["Milk", "Wheat", "Soy", "Gluten"]),
+        ("Hot Dog", "290", ["Milk", "Wheat", "Gluten"]),
+        ("Sunbutter & Jelly Crustless Sandwich, Crackers, & String Cheese", "490", ["Milk", "Wheat", "Soy", "Gluten"]),
+    ]
+    assert {key: len(items) for key, items in menu.items()} == {
+        "entrees": 4, "vegetables": 3, "fruits": 5, "milk": 3, "condiments": 6,
+    }
+    assert menu["vegetables"][0] == {"name": "Baby Carrots", "calories": "30", "allergens": []}  # "None listed"
+    assert menu["condiments"][0]["allergens"] == ["Wheat", "Soy", "Gluten", "Sesame"]
+
+    for path in (cache_dir / "weekly_menu.html", cache_dir / "quicktest_menu.html"):
+        source = path.read_text(encoding="utf-8")
+        golden = json.loads((golden_dir / f"{path.stem}.json").read_text())
+        assert menu_parser.parse_menu(source) == golden["menu"], path.name
+        assert menu_parser.week_dates(source) == golden["week_dates"], path.name
+        # The text parser agrees, except that it files GRAIN items under the preceding category
+        legacy = menu_parser.extract_daily_menu_text(BeautifulSoup(source, "lxml"))
+        assert legacy["entrees"] == golden["menu"]["entrees"], path.name
+
+    # menu_page.html is the page before a menu has rendered (date strip only): no items, no fallback
+    empty = (cache_dir / "menu_page.html").read_text(encoding="utf-8")
+    assert menu_parser.parse_menu(empty) == menu_parser.empty_menu()
+    assert len(menu_parser.week_dates(empty)) == 5
+
+
+def test_menu_scrape_job_runs_subprocess_with_timeout(monkeypatch, tmp_path):
+    import pytest
+    from app.config import get_settings
+    from app.services import menu_refresh, menu_service
+
+    fake = tmp_path / "fake_scraper.py"
+    fake.write_text(
+        "import json, os, sys, time\n"
+        "if '--hang' in sys.argv:\n"
+        "    time.sleep(60)\n"
+        "print(json.dumps({'msg': 'Extracted day', 'day': 'Tue 16 DEC', 'entrees': 2}))\n"
+        "open(os.environ['SCRAPER_OUTPUT'], 'w').write(json.dumps({'weekly_menus': {'Tue 16 DEC': {}}}))\n"
+    )
+    settings = get_settings()
+    monkeypatch.setattr(menu_refresh, "SCRAPER_SCRIPT", fake)
+    monkeypatch.setattr(menu_service, "MENU_FILE", tmp_path / "weekly_menu_data.json")
+    monkeypatch.setattr(menu_service, "MANIFEST_FILE", tmp_path / "menu_manifest.json")
+    for name in ("_MENU_DATA", "_MENU_MTIME", "_MENU_VERSION", "_MANIFEST"):
+        monkeypatch.setattr(menu_service, name, None)
+    monkeypatch.setattr(settings, "menu_scrape_timeout_seconds", 1)
+    monkeypatch.setattr(settings, "menu_scrape_args", "")
+
+    assert menu_refresh.run_scrape()
+    status = menu_refresh.status()
+    assert status["state"] == "ok" and status["days"] == 1 and status["last_success"]
+    # Reloaded right away
+    assert menu_service._MENU_DATA == {"weekly_menus": {"Tue 16 DEC": {}}}
+
+    monkeypatch.setattr(settings, "menu_scrape_args", "--hang")
+    with pytest.raises(RuntimeError, match="exceeded 1s"):
+        menu_refresh.run_scrape()
+    status = menu_refresh.status()
+    assert status["state"] == "timeout" and status["duration_s"] < 10
+
+
+def test_menu_history_appends_and_resolves_any_week(monkeypatch, tmp_path):
+    from app.services import menu_service
+    from scripts import menu_store
+
+    def result(labels, entree, scraped_at):
+        menu = {"entrees": [{"name": entree, "calories": "1", "allergens": []}]}
+        return {"view_id": "lunch", "scraped_at": scraped_at, "weekly_menus": {l: menu for l in labels}}
+
+    history = tmp_path / "menu_history"
+    assert menu_store.append_history([
+        result(["Mon 8 DEC", "Tue 9 DEC"], "Pizza", "2025-12-07T22:00:00"),
+        result(["Mon 15 DEC", "Tue 16 DEC"], "Tacos", "2025-12-07T22:00:00"),
+    ], history) == 4
+    # Unchanged days are skipped; a changed day is appended, never rewritten
+    assert menu_store.append_history([result(["Mon 15 DEC", "Tue 16 DEC"], "Tacos", "2025-12-14T22:00:00")], history) == 0
+    assert menu_store.append_history([result(["Tue 16 DEC"], "Soup", "2025-12-15T22:00:00")], history) == 1
+    assert sorted(p.name for p in history.iterdir()) == ["2025-W50.jsonl", "2025-W51.jsonl", "index.json"]
+    assert len((history / "2025-W51.jsonl").read_text().splitlines()) == 3
+
+    monkeypatch.setattr(menu_service, "MENU_FILE", tmp_path / "weekly_menu_data.json")  # no current week
+    monkeypatch.setattr(menu_service, "MANIFEST_FILE", tmp_path / "menu_manifest.json")
+    monkeypatch.setattr(menu_service, "HISTORY_DIR", history)
+    monkeypatch.setattr(menu_service, "_HISTORY_STAT", None)
+    monkeypatch.setattr(menu_service, "_MENU_DATA", None)
+    assert menu_service.get_menu_for_date(date(2025, 12, 8))["entrees"][0].name == "Pizza"
+    assert menu_service.get_menu_for_date(date(2025, 12, 15))["entrees"][0].name == "Tacos"
+    assert menu_service.get_menu_for_date(date(2025, 12, 16))["entrees"][0].name == "Soup"
+    assert menu_service.get_menu_for_date(date(2025, 12, 17)) is None
+
+
+def test_radar_proxy_caches_and_coalesces_tiles(monkeypatch, tmp_path):
+    import asyncio
+    from fastapi.testclient import TestClient
+    from app.config import get_settings
+    from app.main import app
+    from app.services import radar_service
+    from benchmarks.standins import StandInServer, rainviewer_routes
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "radar_cache_dir", str(tmp_path / "radar"))
+    monkeypatch.setattr(radar_service, "_CACHE", None)
+    monkeypatch.setattr(radar_service, "_MAPS", None)
+    with StandInServer(latency=0.1) as upstream:
+        rainviewer_routes(upstream)
+        monkeypatch.setattr(settings, "radar_api_base_url", upstream.base_url)
+        monkeypatch.setattr(settings, "radar_tile_base_url", upstream.base_url)
+        monkeypatch.setattr(settings, "radar_basemap_url", upstream.base_url + "/osm")
+        client = TestClient(app)
+
+        maps = client.get("/radar/maps.json").json()
+        assert maps["host"] == "/radar/tiles"
+        assert client.get("/radar/maps.json").json() == maps
+        assert upstream.counts["/public/weather-maps.json"] == 1
+
+        # Eight displays asking for the same new frame tile at once: one upstream fetch
+        frame = maps["radar"]["past"][-1]["path"]
+        path = f"{frame[1:]}/256/7/32/50/2/1_1.png"
+
+        async def burst():
+            return await asyncio.gather(*(radar_service.get_tile(path) for _ in range(8)))
+
+        tiles = asyncio.run(burst())
+        assert {t.body for t in tiles} == {b"\x89PNG\r\n\x1a\n/" + path.encode()}
+        assert upstream.counts["/" + path] == 1
+        resp = client.get(f"/radar/tiles/{path}")
+        assert resp.status_code == 200 and resp.headers["content-type"] == "image/png"
+        assert upstream.counts["/" + path] == 1
+
+        assert client.get("/radar/tiles/osm/7/32/50.png").status_code == 200
+        assert client.get("/radar/tiles/../../etc/passwd").status_code == 404
+
+        # A fresh process finds the tiles on disk
+        monkeypatch.setattr(radar_service, "_CACHE", None)
+        assert client.get(f"/radar/tiles/{path}").content == tiles[0].body
+        assert upstream.counts["/" + path] == 1
+        assert upstream.counts["/osm/7/32/50.png"] == 1
+
+    # The disk tier stays within its size bound, dropping least recently used tiles first
+    small = radar_service.TileCache(tmp_path / "small", memory_bytes=10, disk_bytes=25)
+    for name in ("a", "b", "c"):
+        small.put(name, radar_service.Entry(name.encode() * 10, "image/png", 4e9))
+    assert small.stats()["disk_entries"] == 2 and small.get("a") is None and small.get("c").body == b"c" * 10
+
+
+class _FakeElement:
+    def __init__(self, text="", classes=""):
+        self.text = text
+        self.classes = classes
+
+    def get_attribute(self, name):
+        return self.classes if name == "class" else None
+
+
+class _FakeDriver:
+    """Just enough of a WebDriver for the scraper's wait conditions"""
+
+    def __init__(self, buttons=(), menu=None):
+        self.buttons = list(buttons)
+        self.menu = menu
+
+    def find_elements(self, by, value):
+        return self.buttons
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+
+        if self.menu is None:
+            raise NoSuchElementException(value)
+        return _FakeElement(self.menu)
+
+
+def test_scraper_wait_conditions_and_step_timer(monkeypatch):
+    import pytest
+
+    pytest.importorskip("selenium")
+    from scripts import scrape_weekly_menu as scraper
+
+    driver = _FakeDriver([_FakeElement("Mon 15 DEC", "date-button active"), _FakeElement("Tue 16 DEC", "date-button")])
+    assert scraper.date_button_active(0)(driver)
+    assert not scraper.date_button_active(1)(driver)
+    assert not scraper.date_button_active(5)(driver)  # strip not rendered that far yet
+    driver.buttons[1].classes = "date-button active"
+    assert scraper.date_button_active(1)(driver)
+
+    driver.menu = "LUNCH ENTREE\nPizza"
+    before = scraper.menu_hash(driver)
+    assert scraper.content_changed(before)(driver) is False
+    driver.menu = "LUNCH ENTREE\nTacos"
+    assert scraper.content_changed(before)(driver) == scraper.menu_hash(driver) != before
+    driver.menu = None  # container gone (page reloading): hashes as empty, still counts as a change
+    assert scraper.content_changed(before)(driver)
+
+    clock = iter([100.0, 100.0, 101.5, 102.0, 104.0, 140.0, 200.0, 200.0])
+    monkeypatch.setattr(scraper.time, "monotonic", lambda: next(clock))
+    timer = scraper.StepTimer(total_timeout=50, step_timeout=15)  # started at 100
+    with timer.step("load_page", view="lunch"):
+        pass  # 100.0 -> 101.5
+    with pytest.raises(ValueError):
+        with timer.step("click_day", day=1):  # 102.0 -> 104.0
+            raise ValueError("boom")
+    assert timer.steps == [
+        {"step": "load_page", "view": "lunch", "ok": True, "seconds": 1.5},
+        {"step": "click_day", "day": 1, "ok": False, "seconds": 2.0},
+    ]
+    assert timer.timeout() == 10.0  # 140.0: the step timeout, capped by what is left overall
+    with pytest.raises(scraper.ScrapeTimeout):
+        timer.timeout()  # 200.0: past the 150.0 deadline
+    assert timer.summary()["total_seconds"] == 100.0
+
+
+def test_driver_pool_discards_session_on_any_error(monkeypatch):
+    import pytest
+
+    pytest.importorskip("selenium")
+    from scripts import scrape_weekly_menu as scraper
+
+    class Driver:
+        quit_calls = 0
+
+        def quit(self):
+            Driver.quit_calls += 1
+
+    monkeypatch.setattr(scraper, "create_driver", Driver)
+    pool = scraper.DriverPool(1)
+    with pytest.raises(ValueError):
+        with pool.session():
+            raise ValueError("parse error")
+    assert Driver.quit_calls == 1 and pool._created == 0
+    # The slot was freed, so the next job gets a fresh driver instead of blocking
+    with pool.session() as driver:
+        first = driver
+    with pool.session() as driver:
+        assert driver is first
+    pool.close()
+    assert Driver.quit_calls == 2
+
+
+def test_scraper_memory_limit_skipped_for_local_chrome(monkeypatch):
+    import pytest
+
+    pytest.importorskip("selenium")
+    resource = pytest.importorskip("resource")
+    from scripts import scrape_weekly_menu as scraper
+
+    calls = []
+    monkeypatch.setattr(resource, "setrlimit", lambda kind, limits: calls.append((kind, limits)))
+    monkeypatch.delenv("SELENIUM_REMOTE_URL", raising=False)
+    scraper.apply_memory_limit("1024")
+    assert calls == []
+    scraper.apply_memory_limit("1024", mode="api")
+    monkeypatch.setenv("SCRAPER_MODE", "api")  # API mode chosen through the environment
+    scraper.apply_memory_limit("1024", scraper.scrape_mode(None))
+    monkeypatch.delenv("SCRAPER_MODE")
+    monkeypatch.setenv("SELENIUM_REMOTE_URL", "http://selenium:4444/wd/hub")
+    scraper.apply_memory_limit("1024", scraper.scrape_mode(None))
+    assert calls == [(resource.RLIMIT_AS, (1024 ** 3, 1024 ** 3))] * 3
+
+
+def test_stage_timings_from_concurrent_threads():
+    import threading
+    from app.services import timing
+
+    rec = timing.Timings()
+
+    def work(name):
+        for _ in range(2000):
+            with timing._Stage(rec, name):
+                pass
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in ("calendar", "weather", "menu") * 3]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(rec._active.values()) == {0}
+    assert sorted(rec.durations) == ["calendar", "menu", "weather"]
+    assert all(value > 0 for value in rec.durations.values())
+    assert rec.header_value().count(";dur=") == 4